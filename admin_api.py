@@ -0,0 +1,80 @@
+"""
+Служебные эндпоинты /api/admin/... для диагностики производительности.
+
+Доступ по токену из переменной окружения ADMIN_TOKEN, который передается
+в заголовке X-Admin-Token. Если ADMIN_TOKEN не задан, эндпоинты отключены.
+"""
+
+import hmac
+import os
+from functools import wraps
+from flask import jsonify, request, send_file, Response
+import profiling
+import slow_queries
+import write_queue
+
+
+def is_admin_request():
+    """Передан ли в запросе правильный админ-токен"""
+    admin_token = os.getenv('ADMIN_TOKEN')
+    supplied = request.headers.get('X-Admin-Token', '')
+    return bool(admin_token) and hmac.compare_digest(supplied, admin_token)
+
+
+def admin_required(view):
+    """Декоратор: эндпоинт доступен только с правильным X-Admin-Token"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not os.getenv('ADMIN_TOKEN'):
+            return jsonify({'error': 'Служебные эндпоинты отключены: не задан ADMIN_TOKEN'}), 403
+        if not is_admin_request():
+            return jsonify({'error': 'Неверный или отсутствующий X-Admin-Token'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def register_admin_routes(app):
+    """Регистрирует служебные эндпоинты"""
+
+    @app.route('/api/admin/slow-queries', methods=['GET'])
+    @admin_required
+    def get_slow_queries():
+        """Медленные SQL-запросы, сгруппированные по форме запроса"""
+        try:
+            limit = min(max(request.args.get('limit', 50, type=int), 1), 1000)
+            return jsonify(slow_queries.summarize(limit))
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/admin/write-queue', methods=['GET'])
+    @admin_required
+    def get_write_queue():
+        """Статистика очереди записи (WRITE_QUEUE=1): группы, операции, ошибки"""
+        return jsonify(write_queue.info())
+
+    @app.route('/api/admin/profiles', methods=['GET'])
+    @admin_required
+    def get_profiles():
+        """Сохраненные профили запросов (?__profile=1 и выборка PROFILE_SAMPLE_RATE)"""
+        profiles = profiling.list_profiles()
+        return jsonify({
+            'profile_dir': profiling.PROFILE_DIR,
+            'sample_rate': profiling.SAMPLE_RATE,
+            'total': len(profiles),
+            'profiles': profiles
+        })
+
+    @app.route('/api/admin/profiles/<name>', methods=['GET'])
+    @admin_required
+    def download_profile(name):
+        """Скачать профиль (.prof) или получить отчет pstats (?format=text&sort=cumulative)"""
+        path = profiling.profile_path(name)
+        if path is None:
+            return jsonify({'error': 'Профиль не найден'}), 404
+        if request.args.get('format') == 'text':
+            sort = request.args.get('sort', 'cumulative')
+            if sort not in ['cumulative', 'tottime', 'calls']:
+                return jsonify({'error': 'sort должен быть cumulative, tottime или calls'}), 400
+            limit = min(max(request.args.get('limit', 50, type=int), 1), 1000)
+            return Response(profiling.profile_text(path, sort, limit), content_type='text/plain; charset=utf-8')
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=name)
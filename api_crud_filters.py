@@ -1,212 +1,87 @@
 from flask import jsonify, request
 from data import db_session
 from data.organization import Organization
-from data.FinancialIndicator import FinancialIndicator
-from data.Tax import Tax
-from data.adresses import Address
-from data.Okved import Okved
-from data.Contact import Contact
-from data.Industry import Industry
-from data.CompanySize import CompanySize
-from data.Support import Support
-from data.InvestmentExport import InvestmentExport
-from data.PropertyLand import PropertyLand
-from data.Production import Production
-from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy import or_, func, cast
 from datetime import datetime
-import json
-
-# Словарь всех моделей для динамической работы
-MODELS = {
-    'organizations': Organization,
-    'financial-indicators': FinancialIndicator,
-    'taxes': Tax,
-    'addresses': Address,
-    'okveds': Okved,
-    'contacts': Contact,
-    'industries': Industry,
-    'company-sizes': CompanySize,
-    'support': Support,
-    'investment-export': InvestmentExport,
-    'property-land': PropertyLand,
-    'production': Production
-}
-
-def get_column_metadata(model_class):
-    """Получает метаданные о столбцах модели"""
-    metadata = []
-    for column in model_class.__table__.columns:
-        if column.name == 'id':
-            continue
-            
-        column_info = {
-            'name': column.name,
-            'type': str(column.type),
-            'python_type': column.type.python_type.__name__,
-            'nullable': column.nullable,
-            'max_length': getattr(column.type, 'length', None)
-        }
-        
-        # Определяем тип фильтрации
-        if column.type.python_type in [int, float]:
-            column_info['filter_type'] = 'numeric'
-            column_info['supports_range'] = True
-            column_info['supports_exact'] = True
-            column_info['supports_like'] = False
-        elif column.type.python_type == str:
-            column_info['filter_type'] = 'text'
-            column_info['supports_range'] = False
-            column_info['supports_exact'] = True
-            column_info['supports_like'] = True
-        elif 'date' in column.name.lower() or 'Date' in str(column.type):
-            column_info['filter_type'] = 'date'
-            column_info['supports_range'] = True
-            column_info['supports_exact'] = True
-            column_info['supports_like'] = False
-        elif column.type.python_type == bool:
-            column_info['filter_type'] = 'boolean'
-            column_info['supports_range'] = False
-            column_info['supports_exact'] = True
-            column_info['supports_like'] = False
-        else:
-            column_info['filter_type'] = 'other'
-            column_info['supports_range'] = False
-            column_info['supports_exact'] = True
-            column_info['supports_like'] = False
-            
-        metadata.append(column_info)
-    
-    return metadata
-
-def apply_filters_to_query(query, model_class, args):
-    """Применяет фильтры к запросу с учетом типов данных"""
-    for column in model_class.__table__.columns:
-        if column.name == 'id':
-            continue
-            
-        column_name = column.name
-        
-        # Точное значение
-        if args.get(column_name) is not None:
-            value = args[column_name]
-            if value != '' and value is not None:
-                query = query.filter(getattr(model_class, column_name) == value)
-        
-        # Диапазон для числовых полей
-        if column.type.python_type in [int, float]:
-            if args.get(f'{column_name}_min') is not None:
-                min_val = args[f'{column_name}_min']
-                if min_val != '' and min_val is not None:
-                    query = query.filter(getattr(model_class, column_name) >= float(min_val))
-            if args.get(f'{column_name}_max') is not None:
-                max_val = args[f'{column_name}_max']
-                if max_val != '' and max_val is not None:
-                    query = query.filter(getattr(model_class, column_name) <= float(max_val))
-        
-        # Поиск по подстроке для строковых полей
-        elif column.type.python_type == str:
-            if args.get(f'{column_name}_like') is not None:
-                like_val = args[f'{column_name}_like']
-                if like_val != '' and like_val is not None:
-                    query = query.filter(getattr(model_class, column_name).like(f"%{like_val}%"))
-        
-        # Фильтрация по датам
-        elif 'date' in column_name.lower():
-            if args.get(f'{column_name}_from') is not None:
-                from_val = args[f'{column_name}_from']
-                if from_val != '' and from_val is not None:
-                    try:
-                        from_date = datetime.strptime(from_val, '%Y-%m-%d')
-                        query = query.filter(getattr(model_class, column_name) >= from_date)
-                    except ValueError:
-                        pass
-            if args.get(f'{column_name}_to') is not None:
-                to_val = args[f'{column_name}_to']
-                if to_val != '' and to_val is not None:
-                    try:
-                        to_date = datetime.strptime(to_val, '%Y-%m-%d')
-                        query = query.filter(getattr(model_class, column_name) <= to_date)
-                    except ValueError:
-                        pass
-    
-    # Общий поиск по всем текстовым полям
-    if args.get('search'):
-        search_term = f"%{args['search']}%"
-        search_conditions = []
-        for column in model_class.__table__.columns:
-            if column.type.python_type == str:
-                search_conditions.append(getattr(model_class, column.name).like(search_term))
-        if search_conditions:
-            query = query.filter(or_(*search_conditions))
-    
-    return query
-
-def apply_sorting_to_query(query, model_class, args):
-    """Применяет сортировку к запросу"""
-    if args.get('sort_by'):
-        sort_field = args['sort_by']
-        if hasattr(model_class, sort_field):
-            sort_column = getattr(model_class, sort_field)
-            if args.get('sort_order') == 'desc':
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(asc(sort_column))
-    return query
+import rollups
+import organization_summary
+import query_dsl
+import maintenance
+import change_log
+import response_cache
+import query_engine
+import column_registry
+import query_explain
+import profiling
+import write_queue
+from query_engine import (
+    MODELS, COLUMN_REGISTRY, NON_FILTER_ARGS, get_column_metadata, get_related_model,
+    apply_filters_to_query, serialize_item
+)
 
-def serialize_item(item, model_class):
-    """Сериализует объект модели в словарь"""
-    item_dict = {}
-    for column in model_class.__table__.columns:
-        value = getattr(item, column.name)
-        if isinstance(value, datetime):
-            value = value.isoformat()
-        elif value is not None and 'date' in column.name.lower():
-            # Обработка строковых дат
-            try:
-                if isinstance(value, str) and value.strip():
-                    parsed_date = datetime.strptime(value, '%Y-%m-%d')
-                    value = parsed_date.isoformat()
-            except:
-                pass
-        item_dict[column.name] = value
-    return item_dict
+# Производные таблицы: заполняются автоматически, изменение через API запрещено
+READ_ONLY_TABLES = {'organization-summary'}
+
+# Ограничения пакетных операций
+BATCH_GET_MAX_KEYS = 10000
+
+MAX_BATCH_OPERATIONS = 1000
+
+CHANGES_MAX_LIMIT = 10000
+
+IN_CHUNK_SIZE = 500  # SQLite ограничивает количество параметров в одном запросе
+
+def table_dependencies(table_name, *args, **kwargs):
+    """Таблицы БД, от которых зависит ответ GET-эндпоинта таблицы (для кеша ответов)"""
+    model_class = MODELS.get(table_name)
+    if model_class is None:
+        return []
+    tables = [model_class.__tablename__]
+    if model_class is Organization:
+        for key in request.args:
+            related_model = get_related_model(key.split('.', 1)[0]) if '.' in key else None
+            if related_model is not None:
+                tables.append(related_model.__tablename__)
+    return tables
+
+def aggregate_dependencies(table_name):
+    """Агрегаты читаются из таблиц rollup"""
+    spec = rollups.ROLLUPS.get(table_name)
+    return [spec['rollup'].__tablename__] if spec else []
 
 def validate_required_fields(data, model_class):
     """Проверяет обязательные поля"""
-    required_fields = []
-    for column in model_class.__table__.columns:
-        if not column.nullable and column.name != 'id':
-            required_fields.append(column.name)
-    
     missing_fields = []
-    for field in required_fields:
+    for field in COLUMN_REGISTRY[model_class].required_fields:
         if field not in data or data[field] is None or data[field] == '':
             missing_fields.append(field)
     
     return missing_fields
 
+def convert_column_value(column, value):
+    """Приводит значение из JSON к типу столбца"""
+    # Обработка дат
+    if 'date' in column.name.lower() and isinstance(value, str):
+        try:
+            if 'T' in value:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            else:
+                value = datetime.strptime(value, '%Y-%m-%d')
+        except:
+            pass
+    
+    # Обработка булевых значений
+    elif column.type.python_type == bool and isinstance(value, str):
+        value = value.lower() in ['true', '1', 'yes', 'да']
+    
+    return value
+
 def create_item_from_data(model_class, data):
     """Создает объект модели из данных"""
     item_data = {}
     for column in model_class.__table__.columns:
         if column.name in data and data[column.name] is not None:
-            value = data[column.name]
-            
-            # Обработка дат
-            if 'date' in column.name.lower() and isinstance(value, str):
-                try:
-                    if 'T' in value:
-                        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                    else:
-                        value = datetime.strptime(value, '%Y-%m-%d')
-                except:
-                    pass
-            
-            # Обработка булевых значений
-            elif column.type.python_type == bool and isinstance(value, str):
-                value = value.lower() in ['true', '1', 'yes', 'да']
-            
-            item_data[column.name] = value
+            item_data[column.name] = convert_column_value(column, data[column.name])
     
     return model_class(**item_data)
 
@@ -214,26 +89,236 @@ def update_item_from_data(item, data):
     """Обновляет объект модели данными"""
     for column in item.__table__.columns:
         if column.name in data and column.name != 'id':
-            value = data[column.name]
-            
-            # Обработка дат
-            if 'date' in column.name.lower() and isinstance(value, str):
-                try:
-                    if 'T' in value:
-                        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                    else:
-                        value = datetime.strptime(value, '%Y-%m-%d')
-                except:
-                    pass
-            
-            # Обработка булевых значений
-            elif column.type.python_type == bool and isinstance(value, str):
-                value = value.lower() in ['true', '1', 'yes', 'да']
-            
-            setattr(item, column.name, value)
+            setattr(item, column.name, convert_column_value(column, data[column.name]))
+
+def prepare_bulk_values(model_class, data):
+    """Готовит словарь значений для массового UPDATE"""
+    values = {}
+    for column in model_class.__table__.columns:
+        if column.name in data and column.name != 'id':
+            values[column.name] = convert_column_value(column, data[column.name])
+    return values
+
+def get_affected_organization_ids(model_class, item=None, data=None):
+    """Возвращает id организаций, данные которых затрагивает запись"""
+    organization_ids = set()
+    if model_class is Organization:
+        if item is not None and item.id is not None:
+            organization_ids.add(item.id)
+        return organization_ids
+
+    if item is not None and getattr(item, 'organization_id', None) is not None:
+        organization_ids.add(item.organization_id)
+    if data and data.get('organization_id') not in (None, ''):
+        try:
+            organization_ids.add(int(data['organization_id']))
+        except (TypeError, ValueError):
+            pass
+    return organization_ids
+
+def get_matched_organization_ids(query, model_class):
+    """id организаций, затронутых строками запроса (для массовых операций)"""
+    key_column = model_class.id if model_class is Organization else model_class.organization_id
+    return {row[0] for row in query.with_entities(key_column).distinct()}
+
+def before_write(session, model_class, organization_ids):
+    """Вызывается до изменения данных: убирает вклад организаций из агрегатов"""
+    if model_class.__tablename__ in rollups.ROLLUP_SOURCE_TABLES:
+        rollups.retract_organizations(session, organization_ids)
+
+def after_write(session, model_class, organization_ids, item=None):
+    """Вызывается после изменения данных (до commit): пересчитывает агрегаты и сводную таблицу"""
+    session.flush()
+    if item is not None:
+        # у новой организации id появляется только после flush
+        organization_ids = organization_ids | get_affected_organization_ids(model_class, item)
+    if model_class.__tablename__ in rollups.ROLLUP_SOURCE_TABLES:
+        rollups.apply_organizations(session, organization_ids)
+    if model_class.__tablename__ in organization_summary.SUMMARY_SOURCE_TABLES:
+        organization_summary.refresh_organizations(session, organization_ids)
+
+class OperationError(Exception):
+    """Ошибка операции записи с HTTP-статусом для ответа"""
+
+    def __init__(self, message, status_code=400, **details):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+
+    def to_dict(self):
+        return {'error': str(self), **self.details}
+
+def get_writable_model(table_name):
+    """Возвращает модель таблицы, доступной для записи"""
+    if table_name not in MODELS:
+        raise OperationError('Таблица не найдена', 404)
+    if table_name in READ_ONLY_TABLES:
+        raise OperationError('Таблица доступна только для чтения', 405)
+    return MODELS[table_name]
+
+def create_record(session, model_class, data):
+    """Создает запись в текущей транзакции (commit делает вызывающий код)"""
+    if not data:
+        raise OperationError('Данные не предоставлены')
+    
+    # Проверяем обязательные поля
+    missing_fields = validate_required_fields(data, model_class)
+    if missing_fields:
+        raise OperationError('Отсутствуют обязательные поля', missing_fields=missing_fields)
+    
+    organization_ids = get_affected_organization_ids(model_class, data=data)
+    before_write(session, model_class, organization_ids)
+    new_item = create_item_from_data(model_class, data)
+    session.add(new_item)
+    after_write(session, model_class, organization_ids, new_item)
+    change_log.record_changes(session, model_class, [new_item.id], 'create')
+    return new_item
+
+def update_record(session, model_class, item_id, data):
+    """Обновляет запись в текущей транзакции"""
+    if not data:
+        raise OperationError('Данные не предоставлены')
+    
+    item = session.query(model_class).filter(model_class.id == item_id).first()
+    if not item:
+        raise OperationError('Запись не найдена', 404)
+    
+    organization_ids = get_affected_organization_ids(model_class, item, data)
+    before_write(session, model_class, organization_ids)
+    update_item_from_data(item, data)
+    after_write(session, model_class, organization_ids)
+    change_log.record_changes(session, model_class, [item.id], 'update')
+    return item
+
+def delete_record(session, model_class, item_id):
+    """Удаляет запись в текущей транзакции.
+
+    Возвращает (удаленная запись, количество удаленных дочерних строк по таблицам).
+    """
+    item = session.query(model_class).filter(model_class.id == item_id).first()
+    if not item:
+        raise OperationError('Запись не найдена', 404)
+    
+    # Сохраняем данные для ответа
+    deleted_item = serialize_item(item, model_class)
+    
+    deleted_related = {}
+    if model_class is Organization:
+        # Организация удаляется вместе со всеми дочерними записями
+        deleted_related = maintenance.delete_organizations_cascade(session, [item_id])
+        deleted_related.pop(Organization.__tablename__)
+    else:
+        organization_ids = get_affected_organization_ids(model_class, item)
+        before_write(session, model_class, organization_ids)
+        session.delete(item)
+        after_write(session, model_class, organization_ids)
+        change_log.record_changes(session, model_class, [item_id], 'delete')
+    return deleted_item, deleted_related
+
+def resolve_batch_references(value, key, references):
+    """Подставляет id, созданные ранее в пакете: "$имя" в полях id и *_id"""
+    if isinstance(value, str) and value.startswith('$') and (key == 'id' or key.endswith('_id')):
+        reference = value[1:]
+        if reference not in references:
+            raise OperationError(f"Неизвестная ссылка '{value}'")
+        return references[reference]
+    return value
+
+def run_batch_operation(session, operation, references):
+    """Выполняет одну операцию пакета и возвращает ее результат"""
+    if not isinstance(operation, dict):
+        raise OperationError('Операция должна быть объектом')
+    
+    op = operation.get('op')
+    table_name = operation.get('table')
+    model_class = get_writable_model(table_name)
+    data = operation.get('data') or {}
+    if not isinstance(data, dict):
+        raise OperationError('data должно быть объектом')
+    data = {k: resolve_batch_references(v, k, references) for k, v in data.items()}
+    item_id = resolve_batch_references(operation.get('id'), 'id', references)
+    
+    if op == 'create':
+        item = create_record(session, model_class, data)
+        if operation.get('ref'):
+            references[operation['ref']] = item.id
+        return {'status': 201, 'item': serialize_item(item, model_class)}
+    
+    if item_id is None:
+        raise OperationError(f"Для операции '{op}' нужен id")
+    try:
+        item_id = int(item_id)
+    except (TypeError, ValueError):
+        raise OperationError(f"Некорректный id '{item_id}'")
+    
+    if op == 'update':
+        item = update_record(session, model_class, item_id, data)
+        return {'status': 200, 'item': serialize_item(item, model_class)}
+    if op == 'delete':
+        deleted_item, deleted_related = delete_record(session, model_class, item_id)
+        return {'status': 200, 'deleted_item': deleted_item, 'deleted_related': deleted_related}
+    
+    raise OperationError(f"Неизвестная операция '{op}' (create, update, delete)")
+
+def grain_filter_args(rollup_model):
+    """Параметры фильтрации rollup-таблицы по колонкам зерна (фильтры по суммам ячеек не допускаются)"""
+    return frozenset(
+        name + suffix
+        for name, _, filter_type in COLUMN_REGISTRY[rollup_model].filter_columns if name in rollups.ROLLUP_GRAIN
+        for suffix in ('',) + column_registry.FILTER_SUFFIXES.get(filter_type, ())
+    ) | {'search'}
+
+# Фильтры, с которыми агрегаты читаются из rollup-таблиц
+ROLLUP_GRAIN_FILTERS = {table_name: grain_filter_args(spec['rollup']) for table_name, spec in rollups.ROLLUPS.items()}
+
+def aggregate_table(session, table_name, args):
+    """Агрегирует financial-indicators / taxes.
+
+    Если группировка и фильтры укладываются в зерно агрегата
+    (district, main_industry, size_final, year), данные читаются из rollup-таблиц,
+    иначе считаются по исходной таблице. Неизвестные поля и фильтры - ValueError.
+    """
+    spec = rollups.ROLLUPS[table_name]
+    measures = spec['measures']
+    group_by = [g.strip() for g in args.get('group_by', 'year').split(',') if g.strip()]
+    filter_keys = {k for k, v in args.items() if k not in ['group_by'] and v not in (None, '')}
+
+    if set(group_by) <= set(rollups.ROLLUP_GRAIN) and filter_keys <= ROLLUP_GRAIN_FILTERS[table_name]:
+        model_class = spec['rollup']
+        source = 'rollup'
+        count_column = func.sum(model_class.records_count)
+    else:
+        model_class = spec['source']
+        source = 'table'
+        unknown = [k for k in group_by if k not in model_class.__table__.columns]
+        unknown += query_engine.unknown_filter_args(model_class, filter_keys)
+        if unknown:
+            raise ValueError(f'Поля {sorted(set(unknown))} неизвестны или их нельзя сочетать '
+                             f'с фильтрами по показателям таблицы {table_name}')
+        count_column = func.count()
+    # Суммы приводятся к типу столбца исходной таблицы, чтобы ответы из rollup и из таблицы совпадали по типам
+    sum_columns = [
+        cast(func.coalesce(func.sum(getattr(model_class, m)), 0), getattr(spec['source'], m).type).label(m)
+        for m in measures
+    ]
+
+    group_columns = [getattr(model_class, g) for g in group_by]
+    query = session.query(*group_columns, count_column.label('records_count'), *sum_columns)
+    query = apply_filters_to_query(query, model_class, {k: args[k] for k in filter_keys})
+    query = query.group_by(*group_columns).order_by(*group_columns)
+
+    groups = [dict(row._mapping) for row in query]
+    return {
+        'table_name': table_name,
+        'group_by': group_by,
+        'source': source,
+        'groups': groups,
+        'total_groups': len(groups)
+    }
 
 def register_crud_api_routes(app):
     """Регистрирует CRUD API маршруты с поддержкой всех таблиц"""
+    existing_endpoints = set(app.view_functions)
     
     @app.route('/api/tables', methods=['GET'])
     def get_available_tables():
@@ -254,6 +339,7 @@ def register_crud_api_routes(app):
         })
     
     @app.route('/api/tables/<table_name>/columns', methods=['GET'])
+    @response_cache.cached_response(table_dependencies)
     def get_table_columns(table_name):
         """Получить метаданные столбцов для конкретной таблицы"""
         if table_name not in MODELS:
@@ -270,6 +356,7 @@ def register_crud_api_routes(app):
         })
     
     @app.route('/api/tables/<table_name>/data', methods=['GET'])
+    @response_cache.cached_response(table_dependencies)
     def get_table_data(table_name):
         """Получить данные из таблицы с фильтрацией"""
         if table_name not in MODELS:
@@ -278,95 +365,312 @@ def register_crud_api_routes(app):
         try:
             model_class = MODELS[table_name]
             session = db_session.create_session()
+            args = request.args.to_dict()
             
-            # Параметры пагинации
-            page = request.args.get('page', 1, type=int)
-            per_page = min(request.args.get('per_page', 50, type=int), 1000)
+            result = {
+                'table_name': table_name,
+                'model_name': model_class.__name__,
+                **query_engine.query_table(session, model_class, args),
+                'filters_applied': query_engine.applied_filters(args)
+            }
+            # Метаданные столбцов отдаются только по запросу, обычно их берут из /columns
+            if request.args.get('include_metadata', 'false').lower() in ['true', '1', 'yes']:
+                result['columns_metadata'] = get_column_metadata(model_class)
+            
+            return jsonify(result)
             
-            # Параметры фильтрации и сортировки
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        finally:
+            session.close()
+    
+    @app.route('/api/tables/<table_name>/explain', methods=['GET'])
+    def explain_table_data(table_name):
+        """SQL, план SQLite и время запросов, которые выполнит GET /data с теми же параметрами"""
+        if table_name not in MODELS:
+            return jsonify({'error': 'Таблица не найдена'}), 404
+        
+        session = None
+        try:
+            model_class = MODELS[table_name]
+            session = db_session.create_session()
             args = request.args.to_dict()
             
-            # Запрос с фильтрацией
-            query = session.query(model_class)
-            query = apply_filters_to_query(query, model_class, args)
-            query = apply_sorting_to_query(query, model_class, args)
+            return jsonify({
+                'table_name': table_name,
+                'model_name': model_class.__name__,
+                **query_explain.explain_table_query(session, model_class, args),
+                'filters_applied': query_engine.applied_filters(args)
+            })
             
-            # Получаем общее количество записей
-            total = query.count()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        finally:
+            if session:
+                session.close()
+    
+    @app.route('/api/tables/<table_name>/data', methods=['POST'])
+    def create_table_item(table_name):
+        """Создать новую запись в таблице"""
+        try:
+            model_class = get_writable_model(table_name)
+            data = request.get_json()
             
-            # Вычисляем пагинацию
-            offset = (page - 1) * per_page
-            items_query = query.offset(offset).limit(per_page)
+            # Создаем объект (через очередь записи, если она включена)
+            created_item = write_queue.execute_write(
+                lambda session: serialize_item(create_record(session, model_class, data), model_class)
+            )
             
-            # Преобразуем в словари
-            items = [serialize_item(item, model_class) for item in items_query]
+            return jsonify({
+                'message': 'Запись успешно создана',
+                'item': created_item
+            }), 201
             
-            # Вычисляем метаданные пагинации
-            pages = (total + per_page - 1) // per_page
-            has_next = page < pages
-            has_prev = page > 1
+        except OperationError as e:
+            return jsonify(e.to_dict()), e.status_code
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/tables/<table_name>/query', methods=['POST'])
+    def query_table_data(table_name):
+        """Получить данные из таблицы по JSON-фильтру (and/or/not, eq, in, between, like, is_null)"""
+        if table_name not in MODELS:
+            return jsonify({'error': 'Таблица не найдена'}), 404
+        
+        session = None
+        try:
+            model_class = MODELS[table_name]
+            body = request.get_json(silent=True)
+            if body is None:
+                return jsonify({'error': 'Данные не предоставлены'}), 400
             
-            # Получаем метаданные столбцов
-            columns_metadata = get_column_metadata(model_class)
+            plan, values, cached = query_dsl.prepare_query(
+                table_name, model_class, COLUMN_REGISTRY[model_class].by_name, body
+            )
+            
+            # Параметры пагинации
+            page = max(int(body.get('page', 1)), 1)
+            per_page = min(max(int(body.get('per_page', 50)), 1), 1000)
+            
+            session = db_session.create_session()
+            query = plan.apply(session.query(model_class), values)
             
             return jsonify({
                 'table_name': table_name,
                 'model_name': model_class.__name__,
-                'items': items,
-                'total': total,
-                'pages': pages,
-                'current_page': page,
-                'per_page': per_page,
-                'has_next': has_next,
-                'has_prev': has_prev,
-                'columns_metadata': columns_metadata,
-                'filters_applied': {k: v for k, v in args.items() if k not in ['page', 'per_page', 'sort_by', 'sort_order']}
+                **query_engine.paginate(query, model_class, page, per_page),
+                'plan_cached': cached
             })
             
+        except (query_dsl.QueryDSLError, ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         finally:
-            session.close()
+            if session:
+                session.close()
     
-    @app.route('/api/tables/<table_name>/data', methods=['POST'])
-    def create_table_item(table_name):
-        """Создать новую запись в таблице"""
+    @app.route('/api/tables/query/plan-cache', methods=['GET'])
+    def get_query_plan_cache():
+        """Статистика кеша скомпилированных JSON-фильтров"""
+        return jsonify(query_dsl.plan_cache.info())
+    
+    @app.route('/api/cache', methods=['GET'])
+    def get_response_cache_info():
+        """Статистика кеша ответов GET-эндпоинтов и объединения запросов"""
+        return jsonify(response_cache.info())
+    
+    @app.route('/api/cache', methods=['DELETE'])
+    def clear_response_cache():
+        """Очистить кеш ответов (например, после записи в БД другим процессом)"""
+        response_cache.get_backend().clear()
+        return jsonify({'message': 'Кеш ответов очищен'})
+    
+    @app.route('/api/tables/<table_name>/batch-get', methods=['POST'])
+    def batch_get_table_items(table_name):
+        """Получить много записей по списку id (или ИНН для организаций)"""
         if table_name not in MODELS:
             return jsonify({'error': 'Таблица не найдена'}), 404
         
         session = None
         try:
             model_class = MODELS[table_name]
-            data = request.get_json()
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return jsonify({'error': 'Передайте список ids или inns'}), 400
+            
+            if data.get('inns') is not None:
+                if model_class is not Organization:
+                    return jsonify({'error': 'Поиск по ИНН доступен только для организаций'}), 400
+                key_name, values = 'inn', data['inns']
+            elif data.get('ids') is not None:
+                key_name, values = 'id', data['ids']
+            else:
+                return jsonify({'error': 'Передайте список ids или inns'}), 400
+            
+            # Строка тоже итерируема: "123" не должна превращаться в три идентификатора
+            if not isinstance(values, list):
+                return jsonify({'error': f'{key_name}s должен быть списком'}), 400
+            # Лимит проверяется до преобразования, чтобы не разбирать огромные списки
+            if len(values) > BATCH_GET_MAX_KEYS:
+                return jsonify({'error': f'Максимум {BATCH_GET_MAX_KEYS} идентификаторов за запрос'}), 400
+            if key_name == 'inn':
+                keys = [str(v).strip() for v in values]
+            else:
+                keys = [int(v) for v in values]
+            
+            # Убираем дубликаты, сохраняя порядок
+            keys = list(dict.fromkeys(keys))
+            
+            session = db_session.create_session()
+            key_column = getattr(model_class, key_name)
+            found = {}
+            for start in range(0, len(keys), IN_CHUNK_SIZE):
+                chunk = keys[start:start + IN_CHUNK_SIZE]
+                for item in session.query(model_class).filter(key_column.in_(chunk)):
+                    found[getattr(item, key_name)] = serialize_item(item, model_class)
+            
+            return jsonify({
+                'table_name': table_name,
+                'key': key_name,
+                'items': {str(key): found[key] for key in keys if key in found},
+                'missing': [key for key in keys if key not in found],
+                'requested': len(keys),
+                'found': len(found)
+            })
             
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Некорректный список идентификаторов: {e}'}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        finally:
+            if session:
+                session.close()
+    
+    def get_bulk_filters(model_class):
+        """Фильтры массовой операции.
+
+        Неизвестный ключ фильтра - ValueError: иначе он не применится и операция затронет всю таблицу.
+        Если фильтры не дают ни одного условия, операция разрешена только с all=true (иначе None).
+        """
+        args = request.args.to_dict()
+        filters = {k: v for k, v in args.items() if k not in NON_FILTER_ARGS and v != ''}
+        unknown = query_engine.unknown_filter_args(model_class, filters)
+        if unknown:
+            raise ValueError(f'Неизвестные фильтры: {sorted(unknown)}')
+        if not query_engine.build_query_conditions(model_class, filters) and args.get('all', '').lower() != 'true':
+            return None
+        return filters
+    
+    @app.route('/api/tables/<table_name>/data', methods=['PATCH'])
+    def bulk_update_table_items(table_name):
+        """Массово обновить записи, подходящие под фильтры (одним UPDATE)"""
+        if table_name not in MODELS:
+            return jsonify({'error': 'Таблица не найдена'}), 404
+        if table_name in READ_ONLY_TABLES:
+            return jsonify({'error': 'Таблица доступна только для чтения'}), 405
+        
+        session = None
+        try:
+            model_class = MODELS[table_name]
+            data = request.get_json(silent=True)
             if not data:
                 return jsonify({'error': 'Данные не предоставлены'}), 400
             
-            # Проверяем обязательные поля
-            missing_fields = validate_required_fields(data, model_class)
-            if missing_fields:
-                return jsonify({
-                    'error': 'Отсутствуют обязательные поля',
-                    'missing_fields': missing_fields
-                }), 400
+            values = prepare_bulk_values(model_class, data)
+            if not values:
+                return jsonify({'error': 'Нет полей для обновления'}), 400
             
-            # Создаем объект
-            session = db_session.create_session()
-            new_item = create_item_from_data(model_class, data)
-            session.add(new_item)
-            session.commit()
+            filters = get_bulk_filters(model_class)
+            if filters is None:
+                return jsonify({'error': 'Укажите фильтры или all=true для обновления всей таблицы'}), 400
+            
+            dry_run = request.args.get('dry_run', '').lower() == 'true'
             
-            # Возвращаем созданный объект
-            created_item = serialize_item(new_item, model_class)
+            def update_matching(session):
+                query = apply_filters_to_query(session.query(model_class), model_class, filters)
+                organization_ids = get_matched_organization_ids(query, model_class)
+                organization_ids |= get_affected_organization_ids(model_class, data=data)
+                before_write(session, model_class, organization_ids)
+                change_log.record_changes_for_query(session, model_class, query.with_entities(model_class.id), 'update')
+                affected = query.update(values, synchronize_session=False)
+                after_write(session, model_class, organization_ids)
+                return affected
+            
+            if dry_run:
+                session = db_session.create_session()
+                affected = apply_filters_to_query(session.query(model_class), model_class, filters).count()
+            else:
+                affected = write_queue.execute_write(update_matching)
             
             return jsonify({
-                'message': 'Запись успешно создана',
-                'item': created_item
-            }), 201
+                'message': 'Проверка без изменений' if dry_run else 'Записи успешно обновлены',
+                'dry_run': dry_run,
+                'affected': affected,
+                'values': {k: data[k] for k in values},
+                'filters_applied': filters
+            })
             
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        finally:
             if session:
-                session.rollback()
+                session.close()
+    
+    @app.route('/api/tables/<table_name>/data', methods=['DELETE'])
+    def bulk_delete_table_items(table_name):
+        """Массово удалить записи, подходящие под фильтры (одним DELETE)"""
+        if table_name not in MODELS:
+            return jsonify({'error': 'Таблица не найдена'}), 404
+        if table_name in READ_ONLY_TABLES:
+            return jsonify({'error': 'Таблица доступна только для чтения'}), 405
+        
+        session = None
+        try:
+            model_class = MODELS[table_name]
+            filters = get_bulk_filters(model_class)
+            if filters is None:
+                return jsonify({'error': 'Укажите фильтры или all=true для удаления всей таблицы'}), 400
+            
+            dry_run = request.args.get('dry_run', '').lower() == 'true'
+            
+            def delete_matching(session):
+                query = apply_filters_to_query(session.query(model_class), model_class, filters)
+                organization_ids = get_matched_organization_ids(query, model_class)
+                if model_class is Organization:
+                    # Организации удаляются вместе со всеми дочерними записями
+                    deleted_related = maintenance.delete_organizations_cascade(session, organization_ids)
+                    return deleted_related.pop(Organization.__tablename__), deleted_related
+                before_write(session, model_class, organization_ids)
+                change_log.record_changes_for_query(session, model_class, query.with_entities(model_class.id), 'delete')
+                affected = query.delete(synchronize_session=False)
+                after_write(session, model_class, organization_ids)
+                return affected, {}
+            
+            deleted_related = {}
+            if dry_run:
+                session = db_session.create_session()
+                affected = apply_filters_to_query(session.query(model_class), model_class, filters).count()
+            else:
+                affected, deleted_related = write_queue.execute_write(delete_matching)
+            
+            return jsonify({
+                'message': 'Проверка без изменений' if dry_run else 'Записи успешно удалены',
+                'dry_run': dry_run,
+                'affected': affected,
+                'deleted_related': deleted_related,
+                'filters_applied': filters
+            })
+            
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
             return jsonify({'error': str(e)}), 500
         finally:
             if session:
@@ -399,80 +703,160 @@ def register_crud_api_routes(app):
     @app.route('/api/tables/<table_name>/data/<int:item_id>', methods=['PUT'])
     def update_table_item(table_name, item_id):
         """Обновить запись в таблице"""
-        if table_name not in MODELS:
-            return jsonify({'error': 'Таблица не найдена'}), 404
-        
-        session = None
         try:
-            model_class = MODELS[table_name]
+            model_class = get_writable_model(table_name)
             data = request.get_json()
             
-            if not data:
-                return jsonify({'error': 'Данные не предоставлены'}), 400
-            
-            session = db_session.create_session()
-            item = session.query(model_class).filter(model_class.id == item_id).first()
-            
-            if not item:
-                return jsonify({'error': 'Запись не найдена'}), 404
-            
-            # Обновляем объект
-            update_item_from_data(item, data)
-            session.commit()
-            
             # Возвращаем обновленный объект
-            updated_item = serialize_item(item, model_class)
+            updated_item = write_queue.execute_write(
+                lambda session: serialize_item(update_record(session, model_class, item_id, data), model_class)
+            )
             
             return jsonify({
                 'message': 'Запись успешно обновлена',
                 'item': updated_item
             })
             
+        except OperationError as e:
+            return jsonify(e.to_dict()), e.status_code
         except Exception as e:
-            if session:
-                session.rollback()
             return jsonify({'error': str(e)}), 500
-        finally:
-            if session:
-                session.close()
     
     @app.route('/api/tables/<table_name>/data/<int:item_id>', methods=['DELETE'])
     def delete_table_item(table_name, item_id):
         """Удалить запись из таблицы"""
-        if table_name not in MODELS:
-            return jsonify({'error': 'Таблица не найдена'}), 404
-        
+        try:
+            model_class = get_writable_model(table_name)
+            deleted_item, deleted_related = write_queue.execute_write(
+                lambda session: delete_record(session, model_class, item_id)
+            )
+            
+            return jsonify({
+                'message': 'Запись успешно удалена',
+                'deleted_item': deleted_item,
+                'deleted_related': deleted_related
+            })
+            
+        except OperationError as e:
+            return jsonify(e.to_dict()), e.status_code
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/batch', methods=['POST'])
+    def run_batch():
+        """Выполнить список операций create/update/delete в одной транзакции"""
+        index = None
+        try:
+            data = request.get_json(silent=True) or {}
+            operations = data.get('operations')
+            if not isinstance(operations, list) or not operations:
+                return jsonify({'error': 'Передайте непустой список operations'}), 400
+            if len(operations) > MAX_BATCH_OPERATIONS:
+                return jsonify({'error': f'Максимум {MAX_BATCH_OPERATIONS} операций в пакете'}), 400
+            
+            def run_operations(session):
+                nonlocal index
+                references = {}
+                results = []
+                for index, operation in enumerate(operations):
+                    result = run_batch_operation(session, operation, references)
+                    result.update({'index': index, 'op': operation['op'], 'table': operation['table']})
+                    results.append(result)
+                return results, references
+            
+            results, references = write_queue.execute_write(run_operations)
+            
+            return jsonify({
+                'message': 'Пакет успешно выполнен',
+                'results': results,
+                'references': references,
+                'total': len(results)
+            })
+            
+        except OperationError as e:
+            return jsonify({**e.to_dict(), 'failed_index': index}), e.status_code
+        except Exception as e:
+            return jsonify({'error': str(e), 'failed_index': index}), 500
+    
+    @app.route('/api/changes', methods=['GET'])
+    def get_changes():
+        """Изменения после версии since (для инкрементальной синхронизации)"""
         session = None
         try:
-            model_class = MODELS[table_name]
-            session = db_session.create_session()
+            since = request.args.get('since', 0, type=int)
+            limit = min(max(request.args.get('limit', 1000, type=int), 1), CHANGES_MAX_LIMIT)
             
-            item = session.query(model_class).filter(model_class.id == item_id).first()
+            # Таблицы можно указывать как в API (financial-indicators), так и как в БД (financial_indicators)
+            models_by_table = {model_class.__tablename__: model_class for model_class in MODELS.values()}
+            table_keys = {model_class.__tablename__: key for key, model_class in MODELS.items()}
+            table_names = []
+            for name in filter(None, request.args.get('tables', '').split(',')):
+                name = name.strip()
+                if name in MODELS:
+                    table_names.append(MODELS[name].__tablename__)
+                elif name in models_by_table:
+                    table_names.append(name)
+                else:
+                    return jsonify({'error': f'Таблица {name} не найдена'}), 404
             
-            if not item:
-                return jsonify({'error': 'Запись не найдена'}), 404
+            session = db_session.create_session()
+            entries, has_more = change_log.fetch_changes(session, since, table_names, limit)
+            min_version, current_version = change_log.version_bounds(session)
+            
+            # Оставляем последнее изменение каждой строки; отметка очистки журнала означает полную выгрузку
+            latest = {}
+            reset = False
+            for entry in entries:
+                if entry.operation == change_log.RESET_OPERATION:
+                    reset = True
+                    continue
+                latest[(entry.table_name, entry.row_id)] = entry
             
-            # Сохраняем данные для ответа
-            deleted_item = serialize_item(item, model_class)
+            # Загружаем текущие значения строк пачками по таблицам
+            rows = {}
+            ids_by_table = {}
+            for (table_name, row_id), entry in latest.items():
+                if entry.operation != 'delete' and table_name in models_by_table:
+                    ids_by_table.setdefault(table_name, []).append(row_id)
+            for table_name, ids in ids_by_table.items():
+                model_class = models_by_table[table_name]
+                for start in range(0, len(ids), IN_CHUNK_SIZE):
+                    chunk = ids[start:start + IN_CHUNK_SIZE]
+                    for item in session.query(model_class).filter(model_class.id.in_(chunk)):
+                        rows[(table_name, item.id)] = serialize_item(item, model_class)
             
-            # Удаляем объект
-            session.delete(item)
-            session.commit()
+            changes = []
+            for key, entry in sorted(latest.items(), key=lambda pair: pair[1].id):
+                item = rows.get(key)
+                changes.append({
+                    'version': entry.id,
+                    'table': table_keys.get(entry.table_name, entry.table_name),
+                    'id': entry.row_id,
+                    # строка могла быть удалена позже в пределах еще не прочитанных изменений
+                    'operation': entry.operation if entry.operation == 'delete' or item else 'delete',
+                    'changed_at': entry.changed_at.isoformat(),
+                    'item': item
+                })
             
             return jsonify({
-                'message': 'Запись успешно удалена',
-                'deleted_item': deleted_item
+                'changes': changes,
+                'since': since,
+                'next_since': entries[-1].id if entries else max(since, current_version or 0),
+                'has_more': has_more,
+                'current_version': current_version,
+                # изменения между since и min_version уже удалены из журнала
+                # или данные заменены целиком после since: нужна полная выгрузка
+                'resync_required': reset or (min_version is not None and since < min_version - 1)
             })
             
         except Exception as e:
-            if session:
-                session.rollback()
             return jsonify({'error': str(e)}), 500
         finally:
             if session:
                 session.close()
     
     @app.route('/api/tables/<table_name>/stats', methods=['GET'])
+    @response_cache.cached_response(table_dependencies, coalesce=True)
     def get_table_stats(table_name):
         """Получить статистику по таблице"""
         if table_name not in MODELS:
@@ -482,48 +866,9 @@ def register_crud_api_routes(app):
             model_class = MODELS[table_name]
             session = db_session.create_session()
             
-            # Общее количество записей
-            total_records = session.query(model_class).count()
-            
-            # Статистика по числовым полям
-            numeric_stats = {}
-            for column in model_class.__table__.columns:
-                if column.type.python_type in [int, float]:
-                    try:
-                        min_val = session.query(getattr(model_class, column.name)).filter(
-                            getattr(model_class, column.name).isnot(None)
-                        ).order_by(asc(getattr(model_class, column.name))).first()[0]
-                        
-                        max_val = session.query(getattr(model_class, column.name)).filter(
-                            getattr(model_class, column.name).isnot(None)
-                        ).order_by(desc(getattr(model_class, column.name))).first()[0]
-                        
-                        numeric_stats[column.name] = {
-                            'min': min_val,
-                            'max': max_val,
-                            'type': column.type.python_type.__name__
-                        }
-                    except:
-                        pass
-            
-            # Уникальные значения для строковых полей (первые 100)
-            text_values = {}
-            for column in model_class.__table__.columns:
-                if column.type.python_type == str and column.name != 'id':
-                    try:
-                        unique_values = session.query(getattr(model_class, column.name)).filter(
-                            getattr(model_class, column.name).isnot(None),
-                            getattr(model_class, column.name) != ''
-                        ).distinct().limit(100).all()
-                        text_values[column.name] = [v[0] for v in unique_values]
-                    except:
-                        pass
-            
             return jsonify({
                 'table_name': table_name,
-                'total_records': total_records,
-                'numeric_stats': numeric_stats,
-                'text_values': text_values
+                **query_engine.table_stats(session, model_class)
             })
             
         except Exception as e:
@@ -531,6 +876,25 @@ def register_crud_api_routes(app):
         finally:
             session.close()
     
+    @app.route('/api/tables/<table_name>/aggregate', methods=['GET'])
+    @response_cache.cached_response(aggregate_dependencies, coalesce=True)
+    def get_table_aggregate(table_name):
+        """Суммы и количества по районам/отраслям/размерам/годам"""
+        if table_name not in rollups.ROLLUPS:
+            return jsonify({'error': 'Агрегация не поддерживается для этой таблицы'}), 404
+
+        session = None
+        try:
+            session = db_session.create_session()
+            return jsonify(aggregate_table(session, table_name, request.args.to_dict()))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        finally:
+            if session:
+                session.close()
+    
     # Обратная совместимость - старые эндпоинты с CRUD
     @app.route('/api/organizations', methods=['GET', 'POST'])
     def organizations_crud():
@@ -727,6 +1091,7 @@ def register_crud_api_routes(app):
     
     # Новые эндпоинты для сравнения компаний
     @app.route('/api/companies/search', methods=['GET'])
+    @response_cache.cached_response(lambda: [Organization.__tablename__])
     def search_companies():
         """Поиск компаний по названию или ИНН"""
         query = request.args.get('q', '').strip()
@@ -862,12 +1227,21 @@ def register_crud_api_routes(app):
             if session:
                 session.close()
     
+    # Профилирование запросов (?__profile=1 с админ-токеном или выборка PROFILE_SAMPLE_RATE)
+    profiling.profile_endpoints(app, set(app.view_functions) - existing_endpoints)
+    
     print("CRUD API маршруты зарегистрированы:")
     print("- /api/tables - список всех таблиц")
     print("- /api/tables/<name>/columns - метаданные столбцов")
-    print("- /api/tables/<name>/data - GET (список), POST (создание)")
+    print("- /api/tables/<name>/data - GET (список), POST (создание), PATCH/DELETE (массово по фильтрам)")
     print("- /api/tables/<name>/data/<id> - GET, PUT, DELETE (конкретная запись)")
+    print("- /api/tables/<name>/query - POST, JSON-фильтр (and/or/not, in, between, ...)")
+    print("- /api/tables/<name>/batch-get - POST, записи по списку id или ИНН")
     print("- /api/tables/<name>/stats - статистика по таблице")
+    print("- /api/tables/<name>/aggregate - агрегаты (financial-indicators, taxes)")
+    print("- /api/batch - POST, пакет операций в одной транзакции")
+    print("- /api/changes?since=<version> - журнал изменений для синхронизации")
+    print("- /api/cache - статистика (GET) и очистка (DELETE) кеша ответов")
     print("- /api/companies/search - поиск компаний")
     print("- /api/compare/companies - сравнение компаний")
     print("\nПоддерживаемые HTTP методы:")
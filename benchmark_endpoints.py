@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный бенчмарк эндпоинтов через тестовый клиент Flask (без запущенного сервера).
+
+Для каждого размера БД генерируется (или берется из --data-dir) набор данных
+generate_random_data --bulk, затем по каждому сценарию выполняются --iterations запросов.
+Отчет: p50/p95/p99 задержки, пропускная способность (последовательные запросы в секунду),
+пиковый объем памяти, выделенной за один запрос (tracemalloc), и пиковый RSS процесса.
+
+Запуск:
+    python benchmark_endpoints.py --sizes 1000,10000 [--iterations 50]
+        [--save-baseline bench_baseline.json] [--baseline bench_baseline.json --threshold 0.2]
+
+С --baseline сценарии, у которых p95 выросла больше чем на threshold, считаются регрессией
+и скрипт завершается с кодом 1. Каждый размер БД измеряется в отдельном процессе,
+потому что db_session инициализирует одну БД на процесс.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = '1000,10000'
+DEFAULT_ITERATIONS = 50
+DEFAULT_THRESHOLD = 0.2
+EXCEL_ROWS = 10
+EXCEL_YEARS = 2
+
+# Сценарии: имя -> (метод, путь, JSON-тело)
+CASES = {
+    'data_plain': ('GET', '/api/tables/organizations/data?per_page=50', None),
+    'data_exact': ('GET', '/api/tables/taxes/data?year=2022', None),
+    'data_range': ('GET', '/api/tables/financial-indicators/data?revenue_min=1000000&revenue_max=5000000', None),
+    'data_like': ('GET', '/api/tables/organizations/data?name_like=Тех', None),
+    'data_search': ('GET', '/api/tables/organizations/data?search=Групп', None),
+    'data_sort': ('GET', '/api/tables/financial-indicators/data?sort_by=revenue&sort_order=desc', None),
+    'data_related': ('GET', '/api/tables/organizations/data?taxes.year=2022&addresses.district=Южный', None),
+    'data_fields': ('GET', '/api/tables/organizations/data?fields=name,inn&per_page=1000', None),
+    'data_deep_page': ('GET', '/api/tables/contacts/data?page=200&per_page=50', None),
+    'stats': ('GET', '/api/tables/taxes/stats', None),
+    'companies_search': ('GET', '/api/companies/search?q=Тех&limit=20', None),
+    'compare_companies': ('POST', '/api/compare/companies', {
+        'company_ids': [1, 2, 3],
+        'selected_fields': {
+            'organizations': ['name', 'inn'],
+            'financial-indicators': ['revenue', 'net_profit'],
+            'taxes': ['moscow_taxes']
+        }
+    }),
+}
+
+
+def percentile(values, percent):
+    """Перцентиль с линейной интерполяцией"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(timings, statuses, peak_alloc_kb):
+    timings_ms = [t * 1000 for t in timings]
+    return {
+        'iterations': len(timings),
+        'p50_ms': round(percentile(timings_ms, 50), 3),
+        'p95_ms': round(percentile(timings_ms, 95), 3),
+        'p99_ms': round(percentile(timings_ms, 99), 3),
+        'mean_ms': round(statistics.mean(timings_ms), 3),
+        'throughput_rps': round(len(timings) / sum(timings), 1),
+        'peak_alloc_kb': peak_alloc_kb,
+        'errors': sum(1 for status in statuses if status >= 400),
+        'statuses': sorted(set(statuses))
+    }
+
+
+def max_rss_kb():
+    """Пиковый RSS процесса в КБ (ru_maxrss: КБ в Linux, байты в macOS)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def measure(run, iterations, warmup):
+    """Прогрев, замеры времени и отдельный прогон под tracemalloc для пиковой памяти"""
+    for _ in range(warmup):
+        run()
+    timings, statuses = [], []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        statuses.append(run())
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    run()
+    peak_alloc_kb = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+    return summarize(timings, statuses, peak_alloc_kb)
+
+
+# Загрузка Excel: excel_api отправляет строки POST-запросами через requests,
+# адаптер направляет их в тестовый клиент Flask того же процесса
+
+def make_test_client_adapter(client):
+    import requests
+
+    class TestClientAdapter(requests.adapters.BaseAdapter):
+        def send(self, prepared, **kwargs):
+            url = requests.utils.urlparse(prepared.url)
+            path = url.path + (f'?{url.query}' if url.query else '')
+            result = client.open(path, method=prepared.method, data=prepared.body,
+                                 headers=dict(prepared.headers))
+            response = requests.Response()
+            response.status_code = result.status_code
+            response._content = result.data
+            response.headers.update(result.headers)
+            response.url = prepared.url
+            response.request = prepared
+            return response
+
+        def close(self):
+            pass
+
+    return TestClientAdapter()
+
+
+def excel_case(client, work_dir, iterations, warmup):
+    import excel_api
+    import registry_workbook
+    excel_api.session.mount(excel_api.API_BASE, make_test_client_adapter(client))
+
+    # Книги готовятся заранее, чтобы в замер попадала только загрузка
+    pools = registry_workbook.build_pools(registry_workbook.BULK_SEED)
+    paths = []
+    for number in range(iterations + warmup + 1):
+        paths.append(os.path.join(work_dir, f'bench_{number}.xlsx'))
+        registry_workbook.write_registry_workbook(
+            paths[-1], EXCEL_ROWS, EXCEL_YEARS, seed=number,
+            first_inn=registry_workbook.DEFAULT_FIRST_INN + number * EXCEL_ROWS, pools=pools)
+    workbooks = iter(paths)
+
+    def run():
+        path = next(workbooks)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processed = excel_api.excel_to_api(path)
+        return 200 if processed == EXCEL_ROWS else 500
+
+    result = measure(run, iterations, warmup)
+    result['rows_per_workbook'] = EXCEL_ROWS
+    result['rows_per_second'] = round(EXCEL_ROWS * result['throughput_rps'], 1)
+    return result
+
+
+def ensure_dataset(size, seed, data_dir):
+    """Файл БД с size организациями (генерируется один раз и переиспользуется)"""
+    path = os.path.join(data_dir, f'bench_{size}_seed{seed}.db')
+    if not os.path.exists(path):
+        subprocess.run([sys.executable, os.path.join(BASE_DIR, 'generate_random_data.py'), '--bulk',
+                        '--organizations', str(size), '--seed', str(seed), '--db', path],
+                       check=True, stdout=subprocess.DEVNULL)
+    return path
+
+
+def run_size(options):
+    """Измерения для одной БД (выполняется в отдельном процессе)"""
+    work_dir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        db_path = os.path.join(work_dir, 'db.sqlite')
+        shutil.copy(ensure_dataset(options.run_size, options.seed, options.data_dir), db_path)
+
+        os.chdir(BASE_DIR)
+        with contextlib.redirect_stdout(io.StringIO()):
+            from main import create_app
+            app = create_app(db_path)
+        if not options.with_cache:
+            import response_cache
+            response_cache.set_backend(response_cache.MemoryCache(max_size=0))
+        client = app.test_client()
+
+        results = {}
+        for name, (method, path, body) in CASES.items():
+            results[name] = measure(lambda: client.open(path, method=method, json=body).status_code,
+                                    options.iterations, options.warmup)
+        # Загрузка Excel меняет БД, поэтому выполняется последней
+        results['excel_ingest'] = excel_case(client, work_dir, max(options.iterations // 10, 3), 1)
+        with open(options.result_file, 'w', encoding='utf-8') as result_file:
+            json.dump({'cases': results, 'max_rss_kb': max_rss_kb()}, result_file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare(results, baseline, threshold):
+    """Список регрессий p95 относительно базовой линии"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base and result['p95_ms'] > base['p95_ms'] * (1 + threshold):
+            regressions.append((key, base['p95_ms'], result['p95_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='размеры БД (организаций) через запятую')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'moscow_industry_bench'),
+                        help='каталог для сгенерированных БД')
+    parser.add_argument('--with-cache', action='store_true', help='не отключать кеш ответов')
+    parser.add_argument('--baseline', help='JSON с базовыми результатами для сравнения')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='допустимый рост p95 относительно базовой линии (0.2 = 20%%)')
+    parser.add_argument('--save-baseline', help='сохранить результаты как базовую линию')
+    parser.add_argument('--run-size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    os.makedirs(options.data_dir, exist_ok=True)
+    if options.run_size:
+        run_size(options)
+        return
+
+    results = {}
+    for size in [int(size) for size in options.sizes.split(',') if size.strip()]:
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as result_file:
+            result_path = result_file.name
+        try:
+            subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:],
+                            '--run-size', str(size), '--result-file', result_path], check=True)
+            with open(result_path, encoding='utf-8') as result_file:
+                size_results = json.load(result_file)
+        finally:
+            os.remove(result_path)
+
+        print(f"\nБД: {size} организаций, пиковый RSS процесса {size_results['max_rss_kb'] // 1024} МБ")
+        print(f"{'сценарий':<20} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} {'запр/с':>8} "
+              f"{'память, КБ':>11} {'ошибки':>7}")
+        for name, result in size_results['cases'].items():
+            results[f'{size}:{name}'] = result
+            print(f"{name:<20} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['throughput_rps']:>8.1f} {result['peak_alloc_kb']:>11} {result['errors']:>7}")
+
+    if options.save_baseline:
+        with open(options.save_baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\nБазовая линия сохранена: {options.save_baseline}")
+
+    if options.baseline:
+        with open(options.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), options.threshold)
+        if regressions:
+            print(f"\nРегрессии (p95 выросла больше чем на {options.threshold:.0%}):")
+            for key, before, after in regressions:
+                print(f"  {key}: {before:.2f} -> {after:.2f} мс")
+            sys.exit(1)
+        print(f"\nРегрессий относительно {options.baseline} нет")
+
+
+if __name__ == "__main__":
+    main()
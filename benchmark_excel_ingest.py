@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк загрузки Excel (excel_api.excel_to_api) по этапам на книгах в формате реестра.
+
+Книга генерируется registry_workbook (--rows строк, --years лет в годовых колонках)
+или берется готовая (--workbook). Этапы замеряются отдельно:
+  read      - чтение книги (excel_api.read_excel_frame, pandas + openpyxl);
+  transform - построение payload всех строк (excel_api.build_row_payloads);
+  insert    - POST-запросы (excel_api.insert_row_payloads) в приложение того же процесса
+              через тестовый клиент Flask, без запущенного сервера.
+Для каждого этапа выводятся время, строки в секунду и пиковый RSS процесса после этапа.
+
+Запуск:
+    python benchmark_excel_ingest.py --rows 1000 --years 5 [--repeat 3] [--db base.db] [--output result.json]
+
+По умолчанию запись идет в пустую временную БД; с --db - во временную копию указанной БД.
+При --repeat > 1 каждый прогон загружает новую книгу (с другими ИНН),
+время этапа - медиана по прогонам.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from benchmark_endpoints import make_test_client_adapter, max_rss_kb
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STAGES = ['read', 'transform', 'insert']
+
+
+def start_app(db_path):
+    """Приложение Flask на БД db_path и excel_api, направленный в его тестовый клиент"""
+    os.chdir(BASE_DIR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        from main import create_app
+        app = create_app(db_path)
+    import excel_api
+    excel_api.session.mount(excel_api.API_BASE, make_test_client_adapter(app.test_client()))
+    return excel_api
+
+
+def ingest_by_stages(excel_api, path):
+    """Загрузка одной книги: время и пиковый RSS каждого этапа, количество строк и запросов"""
+    timings, rss = {}, {}
+
+    started = time.perf_counter()
+    frame = excel_api.read_excel_frame(path)
+    timings['read'] = time.perf_counter() - started
+    rss['read'] = max_rss_kb()
+
+    started = time.perf_counter()
+    payloads = [excel_api.build_row_payloads(row) for _, row in frame.iterrows()]
+    timings['transform'] = time.perf_counter() - started
+    rss['transform'] = max_rss_kb()
+
+    statuses = []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for org, children in payloads:
+            statuses.extend(excel_api.insert_row_payloads(org, children))
+    timings['insert'] = time.perf_counter() - started
+    rss['insert'] = max_rss_kb()
+
+    return {
+        'rows': len(frame),
+        'columns': len(frame.columns),
+        'requests': len(statuses),
+        'errors': sum(1 for status in statuses if status not in (200, 201)),
+        'timings': timings,
+        'rss_kb': rss
+    }
+
+
+def summarize(runs):
+    rows = runs[0]['rows']
+    stages = {}
+    for stage in STAGES:
+        seconds = statistics.median(run['timings'][stage] for run in runs)
+        stages[stage] = {
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(rows / seconds, 1) if seconds else None,
+            'peak_rss_kb': max(run['rss_kb'][stage] for run in runs)
+        }
+    total = sum(stage['seconds'] for stage in stages.values())
+    return {
+        'rows': rows,
+        'columns': runs[0]['columns'],
+        'runs': len(runs),
+        'requests_per_run': runs[0]['requests'],
+        'errors': sum(run['errors'] for run in runs),
+        'stages': stages,
+        'total': {'seconds': round(total, 3), 'rows_per_second': round(rows / total, 1) if total else None},
+        'max_rss_kb': max_rss_kb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000, help='строк в сгенерированной книге')
+    parser.add_argument('--years', type=int, default=3, help='лет в годовых колонках')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=1, help='количество прогонов')
+    parser.add_argument('--workbook', help='готовая книга вместо сгенерированной (только один прогон)')
+    parser.add_argument('--db', help='БД, копия которой используется для записи (по умолчанию пустая)')
+    parser.add_argument('--output', help='сохранить результат в JSON')
+    options = parser.parse_args()
+    if options.workbook and options.repeat > 1:
+        parser.error('--repeat несовместим с --workbook: повторная загрузка тех же ИНН завершится ошибками')
+
+    work_dir = tempfile.mkdtemp(prefix='bench_excel_')
+    try:
+        db_path = os.path.join(work_dir, 'db.sqlite')
+        if options.db:
+            shutil.copy(options.db, db_path)
+
+        if options.workbook:
+            paths = [os.path.abspath(options.workbook)]
+        else:
+            import registry_workbook
+            from generate_random_data import build_pools
+            pools = build_pools(options.seed)
+            paths = []
+            # Книги готовятся до замеров; у каждого прогона свой диапазон ИНН
+            for run in range(options.repeat):
+                paths.append(os.path.join(work_dir, f'registry_{run}.xlsx'))
+                registry_workbook.write_registry_workbook(
+                    paths[-1], options.rows, options.years, seed=options.seed + run,
+                    first_inn=registry_workbook.DEFAULT_FIRST_INN + run * options.rows, pools=pools)
+
+        excel_api = start_app(db_path)
+        result = summarize([ingest_by_stages(excel_api, path) for path in paths])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\nКнига: {result['rows']} строк, {result['columns']} колонок, "
+          f"{result['requests_per_run']} POST-запросов, прогонов: {result['runs']}, ошибок: {result['errors']}")
+    print(f"{'этап':<10} {'время, с':>9} {'строк/с':>9} {'пиковый RSS, МБ':>16}")
+    for stage, info in result['stages'].items():
+        print(f"{stage:<10} {info['seconds']:>9.3f} {info['rows_per_second']:>9.1f} "
+              f"{info['peak_rss_kb'] // 1024:>16}")
+    print(f"{'всего':<10} {result['total']['seconds']:>9.3f} {result['total']['rows_per_second']:>9.1f} "
+          f"{result['max_rss_kb'] // 1024:>16}")
+
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as output_file:
+            json.dump(result, output_file, ensure_ascii=False, indent=2)
+        print(f"\nРезультат сохранен: {options.output}")
+    if result['errors']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Сравнение общего движка запросов (query_engine) с прежней реализацией маршрутов.
+
+Прежняя версия api_crud_filters.py берется из git (по умолчанию - коммит до появления
+query_engine.py), текущая - из рабочей копии. Для каждого запроса проверяется,
+что ответы совпадают, и измеряется медианная задержка.
+
+Запуск: python benchmark_query_engine.py [--repeat 20] [--legacy-rev <коммит>] [--db путь]
+Выполняются только GET-запросы, данные в БД не меняются.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+import types
+from flask import Flask
+from data import db_session
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# модуль -> (функция регистрации маршрутов, проверяемые запросы)
+CASES = {
+    'api_crud_filters': ('register_crud_api_routes', [
+        '/api/tables/taxes/data?year=2017&per_page=100',
+        '/api/tables/organizations/data?search=ООО&sort_by=name',
+        '/api/tables/organizations/data?taxes.year=2017&addresses.district_like=А',
+        '/api/tables/taxes/stats',
+    ]),
+}
+
+
+def git(*args):
+    return subprocess.run(['git', *args], cwd=BASE_DIR, capture_output=True,
+                          text=True, check=True).stdout.strip()
+
+
+def default_legacy_rev():
+    """Коммит перед тем, в котором появился query_engine.py (или HEAD, если он еще не закоммичен)"""
+    added = git('log', '--diff-filter=A', '--format=%H', '--', 'query_engine.py')
+    return f'{added.splitlines()[-1]}^' if added else 'HEAD'
+
+
+def load_legacy_module(name, rev):
+    """Загружает модуль из указанной ревизии git под именем legacy_<name>"""
+    source = git('show', f'{rev}:{name}.py')
+    module = types.ModuleType(f'legacy_{name}')
+    module.__file__ = os.path.join(BASE_DIR, f'{name}.py')
+    exec(compile(source, f'{rev}:{name}.py', 'exec'), module.__dict__)
+    return module
+
+
+def make_client(module, register_name):
+    app = Flask(f'bench_{module.__name__}')
+    with contextlib.redirect_stdout(io.StringIO()):
+        getattr(module, register_name)(app)
+    return app.test_client()
+
+
+def measure(client, url, repeat):
+    """(статус, JSON ответа, медианная задержка в мс)"""
+    response = client.get(url)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+    return response.status_code, response.get_json(silent=True), statistics.median(timings)
+
+
+def comparable(payload):
+    """Ответ без полей, состав которых зависит от реализации, а не от данных"""
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items() if k != 'filters_applied'}
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--legacy-rev', default=None)
+    parser.add_argument('--db', default=os.path.join(BASE_DIR, 'db/database_test.db'))
+    options = parser.parse_args()
+
+    legacy_rev = options.legacy_rev or default_legacy_rev()
+    db_session.global_init(options.db)
+
+    # Кеш ответов отключается, чтобы измерять выполнение запросов, а не попадания в кеш
+    import response_cache
+    response_cache.set_backend(response_cache.MemoryCache(max_size=0))
+
+    print(f"Прежняя реализация: {legacy_rev} ({git('rev-parse', '--short', legacy_rev)})")
+    print(f"{'модуль':<22} {'запрос':<70} {'было, мс':>9} {'стало, мс':>9} {'x':>6}  результат")
+    mismatches = 0
+    for name, (register_name, urls) in CASES.items():
+        legacy_client = make_client(load_legacy_module(name, legacy_rev), register_name)
+        current_client = make_client(importlib.import_module(name), register_name)
+        for url in urls:
+            old_status, old_json, old_ms = measure(legacy_client, url, options.repeat)
+            new_status, new_json, new_ms = measure(current_client, url, options.repeat)
+            if old_status != 200:
+                verdict = f'прежняя версия вернула {old_status}, текущая {new_status}'
+            elif (new_status, comparable(new_json)) == (old_status, comparable(old_json)):
+                verdict = 'совпадает'
+            else:
+                verdict = 'РАЗЛИЧАЕТСЯ'
+                mismatches += 1
+            print(f"{name:<22} {url:<70} {old_ms:>9.2f} {new_ms:>9.2f} {old_ms / new_ms:>6.2f}  {verdict}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Журнал изменений (change data capture) для инкрементальной синхронизации.
+
+Каждая запись через API добавляет строку (table_name, row_id, operation, version, changed_at),
+где version - монотонно растущий id строки журнала. Клиенты запрашивают
+GET /api/changes?since=<version> и забирают только изменившиеся строки.
+
+Хранение ограничивается переменными окружения:
+CHANGE_LOG_RETENTION_DAYS - удалять записи старше N дней,
+CHANGE_LOG_MAX_ROWS - хранить не более N последних записей.
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, literal, func, or_, DateTime, String
+from data.ChangeLog import ChangeLog
+
+# Отметка очистки журнала: все данные заменены, изменения до нее не восстановить
+RESET_OPERATION = 'reset'
+
+# Очистка журнала по политике хранения запускается раз в PRUNE_INTERVAL записанных изменений
+PRUNE_INTERVAL = 1000
+
+_pending_prune = 0
+_prune_lock = threading.Lock()
+
+
+def _env_int(name):
+    value = os.getenv(name)
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _after_record(session, count):
+    global _pending_prune
+    with _prune_lock:
+        _pending_prune += count
+        if _pending_prune < PRUNE_INTERVAL:
+            return
+        _pending_prune = 0
+    prune_change_log(session)
+
+
+def record_changes(session, model_class, row_ids, operation):
+    """Записывает изменения строк с известными id"""
+    row_ids = [row_id for row_id in row_ids if row_id is not None]
+    if not row_ids:
+        return
+    now = datetime.utcnow()
+    session.execute(insert(ChangeLog), [
+        {'table_name': model_class.__tablename__, 'row_id': row_id,
+         'operation': operation, 'changed_at': now}
+        for row_id in row_ids
+    ])
+    _after_record(session, len(row_ids))
+
+
+def record_changes_for_query(session, model_class, id_query, operation):
+    """Записывает изменения для всех строк запроса одним INSERT ... SELECT.
+
+    id_query - Query или Select, возвращающий id строк model_class.
+    Для массовых UPDATE/DELETE вызывается до изменения данных.
+    """
+    ids = id_query.subquery()
+    source = select(
+        literal(model_class.__tablename__, String),
+        ids.c[0],
+        literal(operation, String),
+        literal(datetime.utcnow(), DateTime),
+    ).select_from(ids)
+    result = session.execute(insert(ChangeLog).from_select(
+        ['table_name', 'row_id', 'operation', 'changed_at'], source
+    ))
+    _after_record(session, result.rowcount or 0)
+
+
+def reset_change_log(session):
+    """Очищает журнал после замены всех данных в обход API (генерация данных).
+
+    Вместо удаленных записей остается одна отметка RESET_OPERATION: клиенты, синхронизированные
+    до нее, получают resync_required. Версии не переиспользуются (AUTOINCREMENT).
+    """
+    session.execute(delete(ChangeLog))
+    session.execute(insert(ChangeLog).values(
+        table_name='*', row_id=0, operation=RESET_OPERATION, changed_at=datetime.utcnow()
+    ))
+
+
+def prune_change_log(session, retention_days=None, max_rows=None):
+    """Удаляет старые записи журнала по политике хранения. Возвращает количество удаленных"""
+    retention_days = retention_days if retention_days is not None else _env_int('CHANGE_LOG_RETENTION_DAYS')
+    max_rows = max_rows if max_rows is not None else _env_int('CHANGE_LOG_MAX_ROWS')
+    removed = 0
+
+    if retention_days:
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        removed += session.execute(delete(ChangeLog).where(ChangeLog.changed_at < cutoff)).rowcount
+
+    if max_rows:
+        current_version = session.query(func.max(ChangeLog.id)).scalar()
+        if current_version is not None:
+            removed += session.execute(
+                delete(ChangeLog).where(ChangeLog.id <= current_version - max_rows)
+            ).rowcount
+
+    return removed
+
+
+def fetch_changes(session, since, table_names=None, limit=1000):
+    """Возвращает (записи журнала после версии since, есть ли еще записи)"""
+    query = session.query(ChangeLog).filter(ChangeLog.id > since)
+    if table_names:
+        query = query.filter(or_(ChangeLog.table_name.in_(table_names), ChangeLog.operation == RESET_OPERATION))
+    entries = query.order_by(ChangeLog.id).limit(limit + 1).all()
+    return entries[:limit], len(entries) > limit
+
+
+def version_bounds(session):
+    """(минимальная сохраненная версия, текущая версия) журнала"""
+    return session.query(func.min(ChangeLog.id), func.max(ChangeLog.id)).one()
@@ -0,0 +1,106 @@
+"""
+Реестр метаданных столбцов моделей.
+
+Метаданные (тип, вид фильтрации, обязательность) вычисляются один раз при старте
+для всех моделей API и больше не меняются. Реестр используют фильтры,
+JSON-язык запросов, сериализация и эндпоинт /columns.
+"""
+
+from types import MappingProxyType
+
+
+def _column_info(column):
+    """Метаданные одного столбца в формате ответа /columns"""
+    python_type = column.type.python_type
+    column_info = {
+        'name': column.name,
+        'type': str(column.type),
+        'python_type': python_type.__name__,
+        'nullable': column.nullable,
+        'max_length': getattr(column.type, 'length', None)
+    }
+
+    # Определяем тип фильтрации
+    if python_type in [int, float]:
+        filter_type, supports_range, supports_like = 'numeric', True, False
+    elif python_type == str:
+        filter_type, supports_range, supports_like = 'text', False, True
+    elif 'date' in column.name.lower() or 'Date' in str(column.type):
+        filter_type, supports_range, supports_like = 'date', True, False
+    elif python_type == bool:
+        filter_type, supports_range, supports_like = 'boolean', False, False
+    else:
+        filter_type, supports_range, supports_like = 'other', False, False
+
+    column_info.update({
+        'filter_type': filter_type,
+        'supports_range': supports_range,
+        'supports_exact': True,
+        'supports_like': supports_like
+    })
+    return column_info
+
+
+# Суффиксы параметров фильтрации по типу фильтра (кроме точного значения)
+FILTER_SUFFIXES = {
+    'numeric': ('_min', '_max'),
+    'text': ('_like',),
+    'date': ('_from', '_to'),
+}
+
+
+# Псевдостолбец id: не показывается в /columns, но доступен для фильтрации и сортировки
+ID_COLUMN = MappingProxyType({
+    'name': 'id', 'type': 'INTEGER', 'python_type': 'int', 'nullable': False, 'max_length': None,
+    'filter_type': 'numeric', 'supports_range': True, 'supports_exact': True, 'supports_like': False
+})
+
+
+class TableMetadata:
+    """Неизменяемые метаданные столбцов одной модели"""
+
+    __slots__ = ('model_class', 'columns', 'by_name', 'column_names', 'filter_columns',
+                 'filter_arg_names', 'text_columns', 'date_named_columns', 'required_fields', 'json')
+
+    def __init__(self, model_class):
+        table_columns = list(model_class.__table__.columns)
+        infos = [_column_info(column) for column in table_columns if column.name != 'id']
+
+        object.__setattr__(self, 'model_class', model_class)
+        # Метаданные столбцов без id, в порядке объявления
+        object.__setattr__(self, 'columns', tuple(MappingProxyType(info) for info in infos))
+        # Поиск по имени, включая id
+        object.__setattr__(self, 'by_name', MappingProxyType(
+            {'id': ID_COLUMN, **{info['name']: info for info in self.columns}}
+        ))
+        object.__setattr__(self, 'column_names', tuple(column.name for column in table_columns))
+        # (имя, атрибут модели, тип фильтрации) для построения условий WHERE
+        object.__setattr__(self, 'filter_columns', tuple(
+            (info['name'], getattr(model_class, info['name']), info['filter_type'])
+            for info in self.columns
+        ))
+        object.__setattr__(self, 'text_columns', tuple(
+            getattr(model_class, column.name) for column in table_columns
+            if column.type.python_type == str
+        ))
+        # Все параметры запроса, из которых строятся условия фильтрации (search - если есть текстовые столбцы)
+        object.__setattr__(self, 'filter_arg_names', frozenset(
+            [name + suffix for name, _, filter_type in self.filter_columns
+             for suffix in ('',) + FILTER_SUFFIXES.get(filter_type, ())] + (['search'] if self.text_columns else [])
+        ))
+        object.__setattr__(self, 'date_named_columns', frozenset(
+            column.name for column in table_columns if 'date' in column.name.lower()
+        ))
+        object.__setattr__(self, 'required_fields', tuple(
+            column.name for column in table_columns if not column.nullable and column.name != 'id'
+        ))
+        # Готовый для jsonify список (обычные dict, общие для всех ответов - не изменять)
+        object.__setattr__(self, 'json', tuple(dict(info) for info in infos))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Метаданные столбцов неизменяемы')
+
+
+def build_registry(model_classes):
+    """Строит реестр {модель: TableMetadata} для указанных моделей"""
+    return MappingProxyType({model_class: TableMetadata(model_class) for model_class in model_classes})
@@ -0,0 +1,48 @@
+"""
+Gzip-сжатие больших JSON-ответов.
+
+Сжимаются ответы application/json размером от GZIP_MIN_SIZE байт,
+если клиент прислал Accept-Encoding: gzip.
+"""
+
+import gzip
+from flask import request
+
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+
+def should_compress(response):
+    """Подходит ли ответ для сжатия в текущем запросе"""
+    return (response.status_code == 200
+            and response.mimetype == 'application/json'
+            and not response.direct_passthrough
+            and 'Content-Encoding' not in response.headers
+            and 'gzip' in request.accept_encodings
+            and (response.content_length or 0) >= GZIP_MIN_SIZE)
+
+
+def compress_body(body):
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def set_gzip_body(response, compressed):
+    """Подставляет уже сжатое тело и выставляет заголовки"""
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = 'gzip'
+    # ETag сжатого представления отличается от несжатого
+    etag, weak = response.get_etag()
+    if etag and not etag.endswith('-gzip'):
+        response.set_etag(etag + '-gzip', weak)
+
+
+def register_compression(app):
+    """Подключает сжатие ответов к приложению Flask"""
+
+    @app.after_request
+    def gzip_response(response):
+        if response.mimetype == 'application/json':
+            response.vary.add('Accept-Encoding')
+        if should_compress(response):
+            set_gzip_body(response, compress_body(response.get_data()))
+        return response
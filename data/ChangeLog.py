@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+import sqlalchemy
+from .db_session import SqlAlchemyBase
+
+
+class ChangeLog(SqlAlchemyBase):
+    __tablename__ = 'change_log'
+    # AUTOINCREMENT: версии не переиспользуются даже после очистки журнала
+    __table_args__ = (
+        Index('ix_change_log_table_version', 'table_name', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    id = Column(Integer, primary_key=True)  # Версия изменения
+    table_name = Column(String(100), nullable=False)  # Имя таблицы в БД (__tablename__)
+    row_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)  # 'create', 'update', 'delete'
+    changed_at = Column(DateTime, nullable=False)
@@ -7,7 +7,7 @@ class CompanySize(SqlAlchemyBase):
     __tablename__ = 'company_sizes'
     
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     year = Column(Integer, nullable=False)
     size_final = Column(String(100)) # Размер предприятия (итог)
     size_by_employees = Column(String(100))  # Размер предприятия (по численности)
@@ -6,7 +6,7 @@ from .db_session import SqlAlchemyBase
 class Contact(SqlAlchemyBase):
     __tablename__ = 'contacts'
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     contact_type = Column(String(100)) # 'Руководства', 'Сотрудника', 'Ответственного по ЧС'
     name = Column(String(255))
     phone = Column(String(50))
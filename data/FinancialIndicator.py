@@ -6,7 +6,7 @@ class FinancialIndicator(SqlAlchemyBase):
     __tablename__ = 'financial_indicators'
     
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     year = Column(Integer, nullable=False)
     revenue = Column(Float)  # Выручка предприятия, тыс. руб.
     net_profit = Column(Float)  # Чистая прибыль (убыток), тыс. руб.
@@ -7,7 +7,7 @@ class Industry(SqlAlchemyBase):
     __tablename__ = 'industries'
     
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     main_industry = Column(String(255))  # Основная отрасль
     main_subindustry = Column(String(255))  # Подотрасль (Основная)
     additional_industry = Column(String(255))  # Дополнительная отрасль
@@ -5,7 +5,7 @@ from .db_session import SqlAlchemyBase
 class Okved(SqlAlchemyBase):
     __tablename__ = 'okveds'
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     okved_type = Column(String(100)) # 'Основной', 'Производственный'
     code = Column(String(20))
     description = Column(Text)
\ No newline at end of file
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean
+import sqlalchemy
+from .db_session import SqlAlchemyBase
+
+
+# Одна строка на организацию, заполняется organization_summary.py (только чтение через API)
+class OrganizationSummary(SqlAlchemyBase):
+    __tablename__ = 'organization_summary'
+
+    id = Column(Integer, primary_key=True)
+    organization_id = Column(Integer, unique=True, nullable=False)
+    # organizations
+    inn = Column(String(12), index=True)
+    name = Column(String(255), index=True)
+    full_name = Column(String(500))
+    spark_status = Column(String(100))
+    internal_status = Column(String(100))
+    final_status = Column(String(100), index=True)
+    registration_date = Column(String(50))
+    manager_name = Column(String(255))
+    website = Column(String(255))
+    email = Column(String(255))
+    # addresses (первый адрес)
+    district = Column(String(100), index=True)
+    area = Column(String(100))
+    full_address = Column(String(500))
+    # industries (первая запись)
+    main_industry = Column(String(255), index=True)
+    main_subindustry = Column(String(255))
+    # company_sizes (последний год)
+    size_final = Column(String(100), index=True)
+    # supports (первая запись)
+    sme_status = Column(String(100))
+    special_status = Column(String(255))
+    moscow_support_received = Column(Boolean)
+    system_forming_enterprise = Column(Boolean)
+    # financial_indicators (последний год)
+    financial_year = Column(Integer)
+    revenue = Column(Float, index=True)
+    net_profit = Column(Float)
+    employee_count = Column(Integer, index=True)
+    avg_salary_all_employees = Column(Float)
+    # taxes (последний год)
+    tax_year = Column(Integer)
+    moscow_taxes = Column(Float, index=True)
+    profit_tax = Column(Float)
+    personal_income_tax = Column(Float)
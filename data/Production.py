@@ -8,7 +8,7 @@ class Production(SqlAlchemyBase):
     
     id = Column(Integer, primary_key=True)
     year = Column(Integer, nullable=False)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     manufactured_products = Column(Text)  # Производимая продукция
     standardized_products = Column(Text)  # Стандартизированная продукция
     product_names = Column(Text)  # Название (виды производимой продукции)
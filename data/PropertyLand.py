@@ -7,7 +7,7 @@ class PropertyLand(SqlAlchemyBase):
     __tablename__ = 'property_lands'
     
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     # Земельный участок
     land_cadastral_number = Column(String(50))  # Кадастровый номер ЗУ
     land_area = Column(Float)  # Площадь ЗУ
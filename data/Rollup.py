@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, Float, Index
+import sqlalchemy
+from .db_session import SqlAlchemyBase
+
+
+class FinancialRollup(SqlAlchemyBase):
+    __tablename__ = 'financial_rollups'
+    __table_args__ = (
+        Index('ix_financial_rollups_grain', 'district', 'main_industry', 'size_final', 'year'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    district = Column(String(100))  # Округ (addresses.district)
+    main_industry = Column(String(255))  # Основная отрасль (industries.main_industry)
+    size_final = Column(String(100))  # Размер предприятия за год (company_sizes.size_final)
+    year = Column(Integer, nullable=False)
+    records_count = Column(Integer, nullable=False, default=0)  # Количество строк financial_indicators
+    # Суммы показателей, тыс. руб. / чел.
+    revenue = Column(Float, default=0)
+    net_profit = Column(Float, default=0)
+    employee_count = Column(Float, default=0)
+    employee_count_moscow = Column(Float, default=0)
+    payroll_all_employees = Column(Float, default=0)
+    payroll_moscow_employees = Column(Float, default=0)
+
+
+class TaxRollup(SqlAlchemyBase):
+    __tablename__ = 'tax_rollups'
+    __table_args__ = (
+        Index('ix_tax_rollups_grain', 'district', 'main_industry', 'size_final', 'year'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    district = Column(String(100))
+    main_industry = Column(String(255))
+    size_final = Column(String(100))
+    year = Column(Integer, nullable=False)
+    records_count = Column(Integer, nullable=False, default=0)  # Количество строк taxes
+    # Суммы налогов, тыс. руб.
+    moscow_taxes = Column(Float, default=0)
+    profit_tax = Column(Float, default=0)
+    property_tax = Column(Float, default=0)
+    land_tax = Column(Float, default=0)
+    personal_income_tax = Column(Float, default=0)
+    transport_tax = Column(Float, default=0)
+    other_taxes = Column(Float, default=0)
+    excise_taxes = Column(Float, default=0)
@@ -7,7 +7,7 @@ class Support(SqlAlchemyBase):
     __tablename__ = 'supports'
     
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     support_data = Column(Text)  # Данные о мерах поддержки
     special_status = Column(String(255))  # Наличие особого статуса
     platform_final = Column(String(100))  # Площадка итог
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+import sqlalchemy
+from .db_session import SqlAlchemyBase
+
+
+class TableVersion(SqlAlchemyBase):
+    __tablename__ = 'table_versions'
+
+    table_name = Column(String(100), primary_key=True)  # Имя таблицы в БД (__tablename__), '*' - эпоха БД
+    version = Column(Integer, nullable=False, default=0)  # Увеличивается в транзакции, изменившей таблицу
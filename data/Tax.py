@@ -7,7 +7,7 @@ class Tax(SqlAlchemyBase):
     __tablename__ = 'taxes'
 
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     year = Column(Integer, nullable=False)
     moscow_taxes = Column(Float)  # Налоги, уплаченные в бюджет Москвы (без акцизов), тыс.руб.
     profit_tax = Column(Float)  # Налог на прибыль, тыс.руб.
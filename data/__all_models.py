@@ -1,3 +1,4 @@
 # Сюда импортируются все модели:
 from . import organization, FinancialIndicator, Tax, adresses, Okved, Contact
-from . import Industry, CompanySize, Support, InvestmentExport, PropertyLand, Production
\ No newline at end of file
+from . import Industry, CompanySize, Support, InvestmentExport, PropertyLand, Production
+from . import Rollup, OrganizationSummary, ChangeLog, TableVersion
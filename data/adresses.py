@@ -7,7 +7,7 @@ class Address(SqlAlchemyBase):
     __tablename__ = 'addresses'
     
     id = Column(Integer, primary_key=True)
-    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False)
+    organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=False, index=True)
     address_type = Column(String(50))  # 'Юридический', 'Производства' и тд
     full_address = Column(String(500))
     latitude = Column(Float)
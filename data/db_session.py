@@ -1,15 +1,43 @@
+import os
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 import sqlalchemy.ext.declarative as dec
 
 SqlAlchemyBase = dec.declarative_base()
 
+# Режим журнала SQLite: пусто - режим файла БД не меняется,
+# wal - читатели не блокируются записью (многопроцессный сервер, см. gunicorn.conf.py)
+JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', '').strip().lower()
+# Сколько секунд ждать снятия блокировки записи другим соединением
+BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '5'))
+
 __factory = None
+__engine = None
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'PRAGMA journal_mode={JOURNAL_MODE}')
+    if JOURNAL_MODE == 'wal':
+        # В WAL synchronous=NORMAL сохраняет целостность БД, fsync выполняется только при checkpoint
+        cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
+def _dispose_after_fork():
+    """Дочерний процесс не должен использовать соединения из пула родителя"""
+    if __engine is not None:
+        # close=False: соединения родителя остаются открытыми и принадлежат ему
+        __engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
 
 
 def global_init(db_file):
-    global __factory
+    global __factory, __engine
 
     if __factory:
         return __factory()
@@ -19,16 +47,27 @@ def global_init(db_file):
 
     conn_str = f'sqlite:///{db_file.strip()}?check_same_thread=False'
 
-    engine = sa.create_engine(conn_str, echo=False)
+    engine = sa.create_engine(conn_str, echo=False, connect_args={'timeout': BUSY_TIMEOUT})
+    if JOURNAL_MODE:
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
+    __engine = engine
     __factory = orm.sessionmaker(bind=engine)
 
     from . import __all_models
 
     SqlAlchemyBase.metadata.create_all(engine)
+    # create_all не добавляет новые индексы в уже существующие таблицы
+    for table in SqlAlchemyBase.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
     
     return __factory()
 
 
 def create_session() -> Session:
     global __factory
-    return __factory()
\ No newline at end of file
+    return __factory()
+
+
+def get_engine():
+    return __engine
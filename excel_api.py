@@ -343,67 +343,70 @@ def post_json(path: str, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
     return resp.status_code, body
 
 # ========= ЦЕПОЧКА ДЛЯ ОДНОЙ СТРОКИ =========
-def upsert_row(row: pd.Series):
+def build_row_payloads(row: pd.Series) -> Tuple[Dict[str, Any], List[Tuple[str, Dict[str, Any]]]]:
+    """Payload организации и список (эндпоинт, payload) дочерних записей строки.
+    organization_id дочерних записей проставляется в insert_row_payloads после создания организации."""
     # 1) organizations
     org = build_organization_payload(row)
-    if not org["inn"] or not org["name"]:
-        print("⛔ Пропуск: обязательные поля inn/name пусты")
-        return
-    st, body = post_json("/organizations", org)
-    if st not in (200, 201):
-        print("⛔ Не создана организация — остановка цепочки")
-        return
-
-    org_id = body["item"]["id"]
-
+    children = []
     # 2) financial-indicators (много)
-    for fi in build_financial_payloads(row, org_id):
-        post_json("/financial-indicators", fi)
-
+    children += [("/financial-indicators", fi) for fi in build_financial_payloads(row, None)]
     # 3) property-land (1)
-    post_json("/property-land", build_property_land_payload(row, org_id))
-
+    children.append(("/property-land", build_property_land_payload(row, None)))
     # 4) addresses (1)
-    post_json("/addresses", build_address_payload(row, org_id))
-
+    children.append(("/addresses", build_address_payload(row, None)))
     # 5) production (1)
-    post_json("/production", build_production_payload(row, org_id))
-
+    children.append(("/production", build_production_payload(row, None)))
     # 6) investment-export (много)
-    for inv in build_investment_export_payloads(row, org_id):
-        post_json("/investment-export", inv)
-
+    children += [("/investment-export", inv) for inv in build_investment_export_payloads(row, None)]
     # 7) support (1)
-    post_json("/support", build_support_payload(row, org_id))
-
+    children.append(("/support", build_support_payload(row, None)))
     # 8) company-sizes (много/или 1 без годовых полей)
-    for cs in build_company_sizes_payloads(row, org_id):
-        post_json("/company-sizes", cs)
-
+    children += [("/company-sizes", cs) for cs in build_company_sizes_payloads(row, None)]
     # 9) industries (1)
-    post_json("/industries", build_industries_payload(row, org_id))
-
+    children.append(("/industries", build_industries_payload(row, None)))
     # 10) okveds (0..2)
-    for okv in build_okveds_payloads(row, org_id):
-        post_json("/okveds", okv)
-
+    children += [("/okveds", okv) for okv in build_okveds_payloads(row, None)]
     # 11) taxes (много)
-    for tx in build_taxes_payloads(row, org_id):
-        post_json("/taxes", tx)
-
+    children += [("/taxes", tx) for tx in build_taxes_payloads(row, None)]
     # 12) contacts (0..1)
-    for c in build_contacts_payloads(row, org_id):
-        post_json("/contacts", c)
+    children += [("/contacts", c) for c in build_contacts_payloads(row, None)]
+    return org, children
+
+def insert_row_payloads(org: Dict[str, Any], children: List[Tuple[str, Dict[str, Any]]]) -> List[int]:
+    """Создает организацию и ее дочерние записи, возвращает коды ответов всех POST-запросов."""
+    if not org["inn"] or not org["name"]:
+        print("⛔ Пропуск: обязательные поля inn/name пусты")
+        return []
+    st, body = post_json("/organizations", org)
+    if st not in (200, 201):
+        print("⛔ Не создана организация — остановка цепочки")
+        return [st]
+
+    org_id = body["item"]["id"]
+    statuses = [st]
+    for path, payload in children:
+        child_st, _ = post_json(path, {**payload, "organization_id": org_id})
+        statuses.append(child_st)
+    return statuses
+
+def upsert_row(row: pd.Series):
+    return insert_row_payloads(*build_row_payloads(row))
 
 # ========= MAIN =========
+def read_excel_frame(excel_path: str) -> pd.DataFrame:
+    """Читает книгу как строки и нормализует заголовки колонок."""
+    df = pd.read_excel(excel_path, dtype=str)
+    df.columns = [str(c).strip().replace("\ufeff", "") for c in df.columns]
+    return df
+
 def excel_to_api(excel_path: str):
     print(excel_path)
     try:
-        df = pd.read_excel(excel_path, dtype=str)
+        df = read_excel_frame(excel_path)
     except Exception as e:
         print(f"Ошибка при чтении файла: {e}")
         return 0
-    df.columns = [str(c).strip().replace("\ufeff", "") for c in df.columns]
     if df.empty:
         print("Файл пуст")
         return 0
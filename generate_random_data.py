@@ -3,11 +3,16 @@
 Скрипт для генерации случайных данных в базу данных
 """
 
+import argparse
+import multiprocessing
 import os
 import random
+import time
 from datetime import datetime, timedelta
+import numpy as np
 from faker import Faker
 import sqlalchemy
+from sqlalchemy import insert, text
 from data import db_session
 from data.organization import Organization
 from data.FinancialIndicator import FinancialIndicator
@@ -21,6 +26,12 @@ from data.Support import Support
 from data.InvestmentExport import InvestmentExport
 from data.PropertyLand import PropertyLand
 from data.Production import Production
+from data.Rollup import FinancialRollup, TaxRollup
+from data.OrganizationSummary import OrganizationSummary
+import rollups
+import organization_summary
+import change_log
+import response_cache  # увеличивает версии таблиц: кеши ответов запущенного сервера устаревают
 
 # Настройка Faker для русского языка
 fake = Faker('ru_RU')
@@ -278,6 +289,12 @@ def clear_database(session):
     session.query(Tax).delete()
     session.query(FinancialIndicator).delete()
     session.query(Organization).delete()
+    # Производные таблицы и журнал изменений очищаются в той же транзакции:
+    # агрегаты и сводная таблица пересобираются после генерации, клиенты журнала получат resync_required
+    session.query(FinancialRollup).delete()
+    session.query(TaxRollup).delete()
+    session.query(OrganizationSummary).delete()
+    change_log.reset_change_log(session)
     
     session.commit()
     print("База данных очищена")
@@ -363,6 +380,8 @@ def generate_data():
             session.add(production)
         
         session.commit()
+        rollups.rebuild_rollups(session)
+        organization_summary.rebuild_summary(session)
         print("Все данные успешно сгенерированы!")
         
         # Выводим статистику
@@ -387,12 +406,356 @@ def generate_data():
     finally:
         session.close()
 
+
+# Массовая генерация (--bulk)
+#
+# Строковые значения берутся из заранее сгенерированных Faker пулов, числовые столбцы
+# генерируются NumPy сразу для пачки организаций, строки вставляются через Core executemany.
+# Организации делятся на пачки по диапазонам id; генератор случайных чисел пачки
+# инициализируется (seed, номер пачки), поэтому результат не зависит от числа процессов.
+# Пачки могут генерироваться в нескольких процессах, в SQLite пишет только основной процесс.
+
+BULK_POOL_SIZE = 2000
+BULK_BATCH_SIZE = 10000
+BULK_SEED = 42
+BULK_START_DATE = np.datetime64('2014-01-01')  # фиксированная дата вместо "сегодня" для воспроизводимости
+
+ORGANIZATION_TYPES = ['ООО', 'ОАО', 'ЗАО', 'ПАО', 'ИП']
+
+# Порядок вставки (сначала организации, затем дочерние таблицы)
+BULK_MODELS = [Organization, FinancialIndicator, Tax, Contact, Address, Okved, Industry,
+               CompanySize, Support, InvestmentExport, PropertyLand, Production]
+
+_worker_pools = None
+
+
+def build_pools(seed, size=BULK_POOL_SIZE):
+    """Пулы строковых значений Faker; одинаковы для одинакового seed"""
+    pool_fake = Faker('ru_RU')
+    pool_fake.seed_instance(seed)
+
+    companies = [pool_fake.company() for _ in range(size)]
+    domains = []
+    for company_name in companies:
+        domain = company_name.lower().replace(' ', '').replace('"', '').replace('ооо', '').replace('оао', '')
+        domains.append(domain if len(domain) >= 3 else pool_fake.word())
+
+    pools = {
+        'companies': companies,
+        'domains': domains,
+        'people': [pool_fake.name() for _ in range(size)],
+        'emails': [pool_fake.email() for _ in range(size)],
+        'streets': [pool_fake.street_address() for _ in range(size)],
+        'words': [pool_fake.word() for _ in range(size)],
+        'city_suffixes': [pool_fake.city_suffix() for _ in range(50)],
+        'countries': [pool_fake.country() for _ in range(200)],
+        'sentences': [pool_fake.sentence(nb_words=6) for _ in range(size // 4)],
+    }
+    for max_chars in (100, 150, 200, 500):
+        pools[f'text_{max_chars}'] = [pool_fake.text(max_nb_chars=max_chars) for _ in range(size // 4)]
+    return {name: np.array(values, dtype=object) for name, values in pools.items()}
+
+
+def _pick(rng, values, n):
+    """n случайных элементов списка или массива values"""
+    values = np.asarray(values, dtype=object)
+    return values[rng.integers(0, len(values), n)]
+
+
+def _maybe(rng, values, probability):
+    """values там, где выпало событие с вероятностью probability, иначе None"""
+    return np.where(rng.random(len(values)) < probability, values, None)
+
+
+def _uniform(rng, low, high, n):
+    return np.round(rng.uniform(low, high, n), 2)
+
+
+def _rows(columns):
+    """Словари строк из столбцов (массивы NumPy приводятся к типам Python)"""
+    columns = {name: values.tolist() if isinstance(values, np.ndarray) else list(values)
+               for name, values in columns.items()}
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def _bulk_inn(ids):
+    """Уникальный 10-значный ИНН: взаимно однозначное отображение id (множитель взаимно прост с 9*10^9)"""
+    return [str((org_id * 7919 + 123457) % 9000000000 + 1000000000) for org_id in ids.tolist()]
+
+
+def _bulk_dates(rng, n, max_days):
+    return (BULK_START_DATE + rng.integers(0, max_days, n)).astype(str)
+
+
+def generate_bulk_chunk(seed, chunk_index, first_id, count, pools=None):
+    """Строки всех таблиц для организаций с id first_id..first_id+count-1: {модель: [строки]}"""
+    pools = pools if pools is not None else _worker_pools
+    rng = np.random.default_rng([seed, chunk_index])
+    ids = np.arange(first_id, first_id + count)
+    n = count
+    years = np.array(CONFIG['years_range'])
+    chunk = {}
+
+    # Организации
+    company_index = rng.integers(0, len(pools['companies']), n)
+    names = [f'{company_type} "{company_name}"' for company_type, company_name
+             in zip(_pick(rng, ORGANIZATION_TYPES, n), pools['companies'][company_index])]
+    domains = pools['domains'][company_index]
+    chunk[Organization] = _rows({
+        'id': ids,
+        'inn': _bulk_inn(ids),
+        'name': names,
+        'full_name': names,
+        'spark_status': _pick(rng, ['Активная', 'Неактивная', 'В процессе ликвидации'], n),
+        'internal_status': _pick(rng, ['Работает', 'Приостановлена', 'Ликвидируется'], n),
+        'final_status': _pick(rng, ['Действующая', 'Ликвидированная', 'Недействующая'], n),
+        'registry_addition_date': _bulk_dates(rng, n, 3650),
+        'registration_date': _bulk_dates(rng, n, 3285),
+        'manager_name': _pick(rng, pools['people'], n),
+        'website': [f'https://{domain}.ru' for domain in domains],
+        'email': [f'info@{domain}.ru' for domain in domains],
+        'general_info': _pick(rng, pools['text_500'], n),
+        'head_organization': _maybe(rng, _pick(rng, pools['companies'], n), 0.3),
+        'head_organization_inn': _maybe(rng, rng.integers(1000000000, 9999999999, n).astype(str).astype(object), 0.3),
+        'head_organization_relation_type': _maybe(rng, _pick(rng, ['Дочерняя', 'Филиал', 'Представительство'], n), 0.3),
+    })
+
+    # Финансовые показатели: 1-3 разных года на организацию,
+    # id = (id организации - 1) * число лет + номер года + 1
+    years_count = rng.integers(1, 4, n)
+    year_order = rng.random((n, len(years))).argsort(axis=1)
+    org_positions, year_positions = np.nonzero(np.arange(len(years))[None, :] < years_count[:, None])
+    year_index = year_order[org_positions, year_positions]
+    m = len(org_positions)
+    revenue = rng.uniform(*CONFIG['revenue_range'], m)
+    employee_count = rng.integers(CONFIG['employee_range'][0], CONFIG['employee_range'][1] + 1, m)
+    employee_count_moscow = (employee_count * rng.uniform(0.3, 0.9, m)).astype(int)
+    chunk[FinancialIndicator] = _rows({
+        'id': (ids[org_positions] - 1) * len(years) + year_index + 1,
+        'organization_id': ids[org_positions],
+        'year': years[year_index],
+        'revenue': np.round(revenue, 2),
+        'net_profit': np.round(revenue * rng.uniform(-0.1, 0.3, m), 2),
+        'employee_count': employee_count,
+        'employee_count_moscow': employee_count_moscow,
+        'payroll_all_employees': np.round(revenue * rng.uniform(0.2, 0.6, m), 2),
+        'payroll_moscow_employees': np.round(revenue * rng.uniform(0.1, 0.4, m), 2),
+        'avg_salary_all_employees': np.round(revenue * rng.uniform(0.2, 0.6, m) / employee_count, 2),
+        'avg_salary_moscow_employees': np.round(revenue * rng.uniform(0.1, 0.4, m) / employee_count_moscow, 2),
+    })
+
+    # Остальные таблицы: одна строка на организацию, id совпадает с id организации
+    moscow_taxes = rng.uniform(10000, 500000, n)
+    chunk[Tax] = _rows({
+        'id': ids, 'organization_id': ids,
+        'year': _pick(rng, years, n).astype(int),
+        'moscow_taxes': np.round(moscow_taxes, 2),
+        'profit_tax': np.round(moscow_taxes * rng.uniform(0.2, 0.4, n), 2),
+        'property_tax': np.round(moscow_taxes * rng.uniform(0.1, 0.2, n), 2),
+        'land_tax': np.round(moscow_taxes * rng.uniform(0.05, 0.15, n), 2),
+        'personal_income_tax': np.round(moscow_taxes * rng.uniform(0.3, 0.5, n), 2),
+        'transport_tax': np.round(moscow_taxes * rng.uniform(0.01, 0.05, n), 2),
+        'other_taxes': np.round(moscow_taxes * rng.uniform(0.05, 0.15, n), 2),
+        'excise_taxes': np.round(moscow_taxes * rng.uniform(0, 0.1, n), 2),
+    })
+
+    chunk[Contact] = _rows({
+        'id': ids, 'organization_id': ids,
+        'contact_type': _pick(rng, ['Основной', 'Дополнительный', 'Технический', 'Коммерческий'], n),
+        'name': _pick(rng, pools['people'], n),
+        'phone': [f'+7{phone}' for phone in rng.integers(9000000000, 9999999999, n).tolist()],
+        'email': _pick(rng, pools['emails'], n),
+        'management_email': _pick(rng, pools['emails'], n),
+    })
+
+    districts = _pick(rng, CONFIG['moscow_districts'], n)
+    chunk[Address] = _rows({
+        'id': ids, 'organization_id': ids,
+        'address_type': _pick(rng, ['Юридический', 'Фактический', 'Почтовый'], n),
+        'full_address': [f'г. Москва, {district} район, {street}'
+                         for district, street in zip(districts, _pick(rng, pools['streets'], n))],
+        'latitude': np.round(55.5 + rng.uniform(-0.3, 0.3, n), 6),
+        'longitude': np.round(37.3 + rng.uniform(-0.5, 0.5, n), 6),
+        'district': districts,
+        'area': _pick(rng, pools['city_suffixes'], n),
+    })
+
+    chunk[Okved] = _rows({
+        'id': ids, 'organization_id': ids,
+        'okved_type': _pick(rng, ['Основной', 'Дополнительный'], n),
+        'code': _pick(rng, CONFIG['okved_codes'], n),
+        'description': _pick(rng, pools['sentences'], n),
+    })
+
+    main_industries = _pick(rng, CONFIG['industries'], n)
+    chunk[Industry] = _rows({
+        'id': ids, 'organization_id': ids,
+        'main_industry': main_industries,
+        'main_subindustry': [f'{word} {industry.lower()}' for word, industry
+                             in zip(_pick(rng, pools['words'], n), main_industries)],
+        'additional_industry': _maybe(rng, _pick(rng, CONFIG['industries'], n), 0.3),
+        'additional_subindustry': _maybe(rng, [f'{word} {industry.lower()}' for word, industry in zip(
+            _pick(rng, pools['words'], n), _pick(rng, CONFIG['industries'], n))], 0.3),
+        'industry_presentations': _pick(rng, pools['text_200'], n),
+        'industry_by_spark': main_industries,
+    })
+
+    sizes = _pick(rng, CONFIG['company_sizes'], n)
+    chunk[CompanySize] = _rows({
+        'id': ids, 'organization_id': ids,
+        'year': _pick(rng, years, n).astype(int),
+        'size_final': sizes, 'size_by_employees': sizes, 'size_by_revenue': sizes,
+    })
+
+    chunk[Support] = _rows({
+        'id': ids, 'organization_id': ids,
+        'support_data': _pick(rng, pools['text_100'], n),
+        'special_status': _pick(rng, ['Инновационная', 'Социально значимая', 'Экспортно-ориентированная', None], n),
+        'platform_final': _pick(rng, ['МСП', 'Крупный бизнес', 'Стартап'], n),
+        'moscow_support_received': rng.random(n) < 0.5,
+        'system_forming_enterprise': rng.random(n) < 0.5,
+        'sme_status': _pick(rng, CONFIG['company_sizes'], n),
+    })
+
+    chunk[InvestmentExport] = _rows({
+        'id': ids, 'organization_id': ids,
+        'year': _pick(rng, years, n).astype(int),
+        'moscow_investments': _uniform(rng, 100000, 5000000, n),
+        'export_volume': _uniform(rng, 0, 2000000, n),
+    })
+
+    def cadastral_numbers():
+        return [f'77:{a}:{b}:{c}' for a, b, c in zip(rng.integers(10000000, 99999999, n).tolist(),
+                                                   rng.integers(1000, 9999, n).tolist(),
+                                                   rng.integers(100, 999, n).tolist())]
+
+    chunk[PropertyLand] = _rows({
+        'id': ids, 'organization_id': ids,
+        'land_cadastral_number': cadastral_numbers(),
+        'land_area': _uniform(rng, 100, 10000, n),
+        'land_use_type': _pick(rng, ['Промышленное', 'Коммерческое', 'Складское', 'Производственное'], n),
+        'land_ownership_type': _pick(rng, ['Собственность', 'Аренда', 'Безвозмездное пользование'], n),
+        'land_owner': _pick(rng, pools['companies'], n),
+        'building_cadastral_number': cadastral_numbers(),
+        'building_area': _uniform(rng, 500, 50000, n),
+        'building_use_type': _pick(rng, ['Производственное', 'Офисное', 'Складское', 'Административное'], n),
+        'building_type_purpose': _pick(rng, ['Производство', 'Офисы', 'Склады', 'Лаборатории'], n),
+        'building_ownership_type': _pick(rng, ['Собственность', 'Аренда', 'Оперативное управление'], n),
+        'building_owner': _pick(rng, pools['companies'], n),
+        'production_area': _uniform(rng, 200, 20000, n),
+    })
+
+    first_countries = _pick(rng, pools['countries'], n)
+    second_countries = _pick(rng, pools['countries'], n)
+    chunk[Production] = _rows({
+        'id': ids, 'organization_id': ids,
+        'year': _pick(rng, years, n).astype(int),
+        'manufactured_products': _pick(rng, pools['text_200'], n),
+        'standardized_products': _pick(rng, pools['text_150'], n),
+        'product_names': _pick(rng, pools['text_100'], n),
+        'okpd2_products': _pick(rng, pools['text_100'], n),
+        'product_types_segments': _pick(rng, pools['text_150'], n),
+        'product_catalog': _pick(rng, pools['text_200'], n),
+        'government_order': rng.random(n) < 0.5,
+        'production_capacity_utilization': _pick(rng, ['0-25%', '25-50%', '50-75%', '75-100%'], n),
+        'export_supplies': rng.random(n) < 0.5,
+        'export_volume_previous_year': _uniform(rng, 0, 1000000, n),
+        'export_countries': [f'{first}, {second}' if both else first for first, second, both
+                             in zip(first_countries, second_countries, (rng.random(n) < 0.5).tolist())],
+        'tn_ved_code': ['.'.join(str(part) for part in parts)
+                        for parts in rng.integers(10, 100, (n, 4)).tolist()],
+    })
+    return chunk
+
+
+def _init_bulk_worker(pools):
+    global _worker_pools
+    _worker_pools = pools
+
+
+def _generate_bulk_task(task):
+    return generate_bulk_chunk(*task)
+
+
+def generate_bulk_data(organizations_count, seed=BULK_SEED, batch_size=BULK_BATCH_SIZE, workers=1, db_path=None):
+    """Массовая генерация: organizations_count организаций со всеми дочерними таблицами.
+
+    Данные определяются seed и batch_size (от числа процессов workers не зависят).
+    """
+    db_path = db_path or os.path.join(os.path.dirname(__file__), "db/database_test.db")
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    db_session.global_init(db_path)
+    session = db_session.create_session()
+
+    started = time.perf_counter()
+    pools = build_pools(seed)
+    tasks = [(seed, chunk_index, first_id, min(batch_size, organizations_count - first_id + 1))
+             for chunk_index, first_id in enumerate(range(1, organizations_count + 1, batch_size))]
+    counts = {model: 0 for model in BULK_MODELS}
+
+    pool = None
+    try:
+        clear_database(session)
+        # Данные можно сгенерировать заново, поэтому надежность записи не нужна
+        session.execute(text('PRAGMA synchronous=OFF'))
+
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, initializer=_init_bulk_worker, initargs=(pools,))
+            chunks = pool.imap(_generate_bulk_task, tasks)
+        else:
+            chunks = (generate_bulk_chunk(*task, pools=pools) for task in tasks)
+
+        for done, chunk in enumerate(chunks, 1):
+            for model in BULK_MODELS:
+                session.execute(insert(model.__table__), chunk[model])
+                counts[model] += len(chunk[model])
+            session.commit()
+            print(f"Пачка {done}/{len(tasks)}: организаций {counts[Organization]}, "
+                  f"{time.perf_counter() - started:.1f} с")
+
+        print("Пересборка агрегатов и сводной таблицы...")
+        rollups.rebuild_rollups(session)
+        organization_summary.rebuild_summary(session)
+        session.execute(text('PRAGMA synchronous=FULL'))
+
+        print(f"\nГотово за {time.perf_counter() - started:.1f} с (seed={seed}, batch_size={batch_size}, workers={workers})")
+        for model in BULK_MODELS:
+            print(f"{model.__tablename__}: {counts[model]}")
+        return counts
+
+    except Exception as e:
+        print(f"Ошибка при генерации данных: {e}")
+        session.rollback()
+        raise
+    finally:
+        if pool is not None:
+            pool.terminate()
+        session.close()
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генерация случайных данных в базу данных")
+    parser.add_argument('--bulk', action='store_true',
+                        help='массовая генерация (NumPy, пулы значений, executemany)')
+    parser.add_argument('--organizations', type=int, default=CONFIG['organizations_count'],
+                        help='количество организаций (--bulk)')
+    parser.add_argument('--seed', type=int, default=BULK_SEED, help='seed генератора (--bulk)')
+    parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE,
+                        help='организаций в пачке (--bulk)')
+    parser.add_argument('--workers', type=int, default=1, help='процессы для генерации пачек (--bulk)')
+    parser.add_argument('--db', default=None, help='файл БД (по умолчанию db/database_test.db)')
+    options = parser.parse_args()
+
     print("Запуск генерации случайных данных...")
     print("Это может занять несколько минут...")
     
     try:
-        generate_data()
+        if options.bulk:
+            generate_bulk_data(options.organizations, options.seed, options.batch_size,
+                               options.workers, options.db)
+        else:
+            generate_data()
         print("\nГенерация данных завершена успешно!")
     except Exception as e:
         print(f"\nОшибка: {e}")
@@ -0,0 +1,57 @@
+"""
+Настройки gunicorn для многопроцессного сервера на SQLite:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+SQLite переводится в режим WAL: читатели работают со снимком БД и не ждут записи,
+поэтому чтение масштабируется по всем ядрам воркерами-процессами. Запись в SQLite
+по-прежнему выполняется одним соединением за раз, ожидание блокировки - до SQLITE_BUSY_TIMEOUT секунд.
+
+Переменные окружения: WEB_CONCURRENCY (воркеры, по умолчанию по числу ядер),
+GUNICORN_THREADS, GUNICORN_BIND, GUNICORN_TIMEOUT, DATABASE_PATH.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Переменные читаются воркерами при импорте приложения (наследуются после fork)
+os.environ.setdefault('SQLITE_JOURNAL_MODE', 'wal')
+os.environ.setdefault('SQLITE_BUSY_TIMEOUT', '30')
+# Запись внутри воркера идет через один поток-писатель с групповым commit (write_queue)
+os.environ.setdefault('WRITE_QUEUE', '1')
+
+chdir = BASE_DIR
+# excel_api отправляет строки загружаемого файла POST-запросами на localhost:5000
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# Потоки покрывают ожидание ввода-вывода и позволяют загрузке Excel обращаться к API того же воркера
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Приложение (и соединения SQLite) создается в каждом воркере после fork:
+# у каждого воркера свой поток-писатель write_queue и свой пул соединений
+preload_app = False
+
+# Загрузка Excel выполняется синхронно в запросе
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+graceful_timeout = 30
+keepalive = 5
+
+# Перезапуск воркеров ограничивает рост памяти кешей процесса
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Схема БД и агрегаты создаются один раз до запуска воркеров, иначе воркеры
+    одновременно выполняют create_all и пересборку агрегатов. Инициализация идет
+    в отдельном процессе, чтобы у мастера не оставалось соединений SQLite."""
+    subprocess.run([sys.executable, '-c', 'from main import init_db; init_db()'],
+                   cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL)
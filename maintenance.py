@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Каскадное удаление организаций, очистка «осиротевших» дочерних записей
+и журнала изменений.
+
+Поиск сирот:              python maintenance.py orphans
+Удаление:                 python maintenance.py orphans --purge
+Очистка журнала:          python maintenance.py prune-changes [дней]
+"""
+
+import os
+import sys
+from sqlalchemy import exists
+from data import db_session
+from data import __all_models  # все модели нужны для разбора relationship у Organization
+from data.organization import Organization
+import rollups
+import organization_summary
+import change_log
+
+# Все дочерние таблицы организации (по relationship в модели Organization)
+CHILD_MODELS = [relationship.mapper.class_ for relationship in Organization.__mapper__.relationships]
+
+# Максимальное количество id в одном IN (...)
+DELETE_CHUNK_SIZE = 500
+
+
+def delete_organizations_cascade(session, organization_ids):
+    """Удаляет организации вместе со строками всех дочерних таблиц.
+
+    Удаление выполняется набором DELETE ... WHERE organization_id IN (...) внутри
+    текущей транзакции, агрегаты и сводная таблица обновляются там же.
+    Commit делает вызывающий код. Возвращает количество удаленных строк по таблицам.
+    """
+    organization_ids = sorted(set(organization_ids))
+    deleted = {model_class.__tablename__: 0 for model_class in CHILD_MODELS}
+    deleted[Organization.__tablename__] = 0
+
+    rollups.retract_organizations(session, organization_ids)
+    for start in range(0, len(organization_ids), DELETE_CHUNK_SIZE):
+        chunk = organization_ids[start:start + DELETE_CHUNK_SIZE]
+        for model_class in CHILD_MODELS:
+            query = session.query(model_class).filter(model_class.organization_id.in_(chunk))
+            change_log.record_changes_for_query(session, model_class, query.with_entities(model_class.id), 'delete')
+            deleted[model_class.__tablename__] += query.delete(synchronize_session=False)
+        query = session.query(Organization).filter(Organization.id.in_(chunk))
+        change_log.record_changes_for_query(session, Organization, query.with_entities(Organization.id), 'delete')
+        deleted[Organization.__tablename__] += query.delete(synchronize_session=False)
+    rollups.apply_organizations(session, organization_ids)
+    organization_summary.refresh_organizations(session, organization_ids)
+
+    return deleted
+
+
+def _orphans_query(session, model_class):
+    return session.query(model_class).filter(
+        ~exists().where(Organization.id == model_class.organization_id)
+    )
+
+
+def find_orphans(session):
+    """Количество дочерних строк без организации по таблицам"""
+    return {model_class.__tablename__: _orphans_query(session, model_class).count()
+            for model_class in CHILD_MODELS}
+
+
+def purge_orphans(session):
+    """Удаляет дочерние строки, ссылающиеся на несуществующие организации"""
+    organization_ids = set()
+    for model_class in CHILD_MODELS:
+        organization_ids.update(
+            row[0] for row in _orphans_query(session, model_class)
+            .with_entities(model_class.organization_id).distinct()
+        )
+
+    rollups.retract_organizations(session, organization_ids)
+    deleted = {}
+    for model_class in CHILD_MODELS:
+        query = _orphans_query(session, model_class)
+        change_log.record_changes_for_query(session, model_class, query.with_entities(model_class.id), 'delete')
+        deleted[model_class.__tablename__] = query.delete(synchronize_session=False)
+    rollups.apply_organizations(session, organization_ids)
+    session.commit()
+    return deleted
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ('orphans', 'prune-changes'):
+        print("Использование: python maintenance.py orphans [--purge] | prune-changes [дней]")
+        sys.exit(1)
+
+    db_path = os.path.join(os.path.dirname(__file__), "db/database_test.db")
+    db_session.global_init(db_path)
+    session = db_session.create_session()
+    try:
+        if sys.argv[1] == 'prune-changes':
+            days = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            removed = change_log.prune_change_log(session, retention_days=days)
+            session.commit()
+            print(f"Удалено записей журнала изменений: {removed}")
+            sys.exit(0)
+        if '--purge' in sys.argv:
+            result = purge_orphans(session)
+            print("Удалено осиротевших записей:")
+        else:
+            result = find_orphans(session)
+            print("Найдено осиротевших записей (для удаления добавьте --purge):")
+        for table_name, count in result.items():
+            print(f"- {table_name}: {count}")
+    finally:
+        session.close()
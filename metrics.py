@@ -0,0 +1,209 @@
+"""
+Метрики запросов: задержка по эндпоинтам, количество и время SQL-запросов,
+количество строк и размер ответов. Доступны по /metrics в текстовом формате Prometheus.
+
+SQL-запросы учитываются через события SQLAlchemy before/after_cursor_execute
+и относятся к текущему HTTP-запросу Flask. Если задана переменная окружения
+QUERY_TIMING_HEADERS=1, ответы получают заголовки X-Query-Count и Server-Timing.
+"""
+
+import os
+import threading
+import time
+from flask import g, request, has_request_context, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapper
+
+# Границы корзин гистограмм
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин (накопительная, как в Prometheus)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class EndpointStats:
+    """Накопленные метрики одного эндпоинта"""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries_per_request = Histogram(QUERY_COUNT_BUCKETS)
+        self.statuses = {}
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """Метрики всех эндпоинтов процесса"""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, method, status, seconds, queries, sql_seconds, rows, response_bytes):
+        with self._lock:
+            stats = self._endpoints.setdefault((endpoint, method), EndpointStats())
+            stats.latency.observe(seconds)
+            stats.queries_per_request.observe(queries)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.queries += queries
+            stats.sql_seconds += sql_seconds
+            stats.rows += rows
+            stats.response_bytes += response_bytes
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus"""
+        lines = []
+
+        def header(name, metric_type, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+
+        def histogram(name, labels, hist):
+            for bound, count in zip(hist.buckets, hist.counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.total}')
+            lines.append(f'{name}_sum{{{labels}}} {hist.sum:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {hist.total}')
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            header('http_requests_total', 'counter', 'Количество HTTP-запросов')
+            for (endpoint, method), stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_requests_total{{{_labels(endpoint, method)},status="{status}"}} {count}')
+
+            header('http_request_duration_seconds', 'histogram', 'Время обработки HTTP-запроса')
+            for (endpoint, method), stats in endpoints:
+                histogram('http_request_duration_seconds', _labels(endpoint, method), stats.latency)
+
+            header('db_queries_per_request', 'histogram', 'Количество SQL-запросов на один HTTP-запрос')
+            for (endpoint, method), stats in endpoints:
+                histogram('db_queries_per_request', _labels(endpoint, method), stats.queries_per_request)
+
+            counters = [
+                ('db_queries_total', 'Количество SQL-запросов', 'queries'),
+                ('db_query_duration_seconds_total', 'Суммарное время выполнения SQL', 'sql_seconds'),
+                ('db_rows_total', 'Загруженные ORM-объекты и строки, измененные DML', 'rows'),
+                ('http_response_bytes_total', 'Суммарный размер тел ответов', 'response_bytes'),
+            ]
+            for name, help_text, attribute in counters:
+                header(name, 'counter', help_text)
+                for (endpoint, method), stats in endpoints:
+                    value = getattr(stats, attribute)
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{{_labels(endpoint, method)}}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(endpoint, method):
+    endpoint = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+    return f'endpoint="{endpoint}",method="{method}"'
+
+
+registry = MetricsRegistry()
+
+
+# Учет SQL-запросов текущего HTTP-запроса
+
+# Подписчики на завершение SQL-запросов: функции (conn, cursor, statement, parameters, context, executemany, elapsed)
+_query_listeners = []
+
+
+def add_query_listener(listener):
+    """Вызывает listener после каждого успешно выполненного SQL-запроса со временем выполнения в секундах.
+
+    Время замеряется одной парой событий before/after_cursor_execute для всех подписчиков.
+    """
+    _query_listeners.append(listener)
+
+
+def _request_stats():
+    if has_request_context() and 'sql_queries' in g:
+        return g
+    return None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время начала хранится в контексте выполнения, а не в соединении: контекст живет одно выполнение,
+    # поэтому запрос, завершившийся ошибкой или прерванный query_guard, не оставляет следов в пуле
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _request_stats()
+    if stats is not None:
+        stats.sql_queries += 1
+        stats.sql_seconds += elapsed
+        if cursor.rowcount and cursor.rowcount > 0:
+            stats.sql_rows += cursor.rowcount
+    for listener in _query_listeners:
+        listener(conn, cursor, statement, parameters, context, executemany, elapsed)
+
+
+@event.listens_for(Mapper, 'load')
+def _on_load(target, context):
+    stats = _request_stats()
+    if stats is not None:
+        stats.sql_rows += 1
+
+
+def register_metrics(app):
+    """Подключает сбор метрик к приложению Flask и регистрирует /metrics"""
+    timing_headers = os.getenv('QUERY_TIMING_HEADERS', '').lower() in ['1', 'true', 'yes']
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_started = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+        g.sql_rows = 0
+
+    @app.after_request
+    def finish_request_metrics(response):
+        if 'request_started' not in g:
+            return response
+        elapsed = time.perf_counter() - g.request_started
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        response_bytes = 0 if response.direct_passthrough else (response.content_length or 0)
+        registry.record(endpoint, request.method, response.status_code, elapsed,
+                        g.sql_queries, g.sql_seconds, g.sql_rows, response_bytes)
+        if timing_headers:
+            response.headers['X-Query-Count'] = str(g.sql_queries)
+            response.headers['Server-Timing'] = (
+                f'db;dur={g.sql_seconds * 1000:.2f};desc="{g.sql_queries} queries", '
+                f'app;dur={(elapsed - g.sql_seconds) * 1000:.2f}, '
+                f'total;dur={elapsed * 1000:.2f}'
+            )
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        """Метрики в формате Prometheus"""
+        return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
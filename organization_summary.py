@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Денормализованная таблица organization_summary: одна строка на организацию
+с полями из organizations, addresses, industries, company_sizes, supports
+и последнего года financial_indicators / taxes.
+
+Строки пересчитываются при записи через CRUD API,
+полная пересборка: python organization_summary.py
+"""
+
+import os
+from sqlalchemy import select, insert, delete, bindparam
+from sqlalchemy.orm import aliased
+from data import db_session
+from data import __all_models  # запросы строятся при импорте: нужны все модели для разбора relationship у Organization
+from data.organization import Organization
+from data.FinancialIndicator import FinancialIndicator
+from data.Tax import Tax
+from data.adresses import Address
+from data.Industry import Industry
+from data.CompanySize import CompanySize
+from data.Support import Support
+from data.OrganizationSummary import OrganizationSummary
+
+# Максимальное количество id в одном IN (...)
+REFRESH_CHUNK_SIZE = 500
+
+
+def _first_row_id(model_class, *order_by):
+    """Коррелированный подзапрос: id первой строки дочерней таблицы для организации"""
+    inner = aliased(model_class)
+    order = [getattr(inner, name).desc() if desc else getattr(inner, name) for name, desc in order_by]
+    return select(inner.id).where(
+        inner.organization_id == Organization.id
+    ).order_by(*order).limit(1).scalar_subquery()
+
+
+def summary_select():
+    """SELECT, который строит строки organization_summary из исходных таблиц"""
+    first_address = _first_row_id(Address, ('id', False))
+    first_industry = _first_row_id(Industry, ('id', False))
+    first_support = _first_row_id(Support, ('id', False))
+    latest_size = _first_row_id(CompanySize, ('year', True), ('id', True))
+    latest_financial = _first_row_id(FinancialIndicator, ('year', True), ('id', True))
+    latest_tax = _first_row_id(Tax, ('year', True), ('id', True))
+
+    return select(
+        Organization.id.label('organization_id'),
+        Organization.inn, Organization.name, Organization.full_name,
+        Organization.spark_status, Organization.internal_status, Organization.final_status,
+        Organization.registration_date, Organization.manager_name,
+        Organization.website, Organization.email,
+        Address.district, Address.area, Address.full_address,
+        Industry.main_industry, Industry.main_subindustry,
+        CompanySize.size_final,
+        Support.sme_status, Support.special_status,
+        Support.moscow_support_received, Support.system_forming_enterprise,
+        FinancialIndicator.year.label('financial_year'),
+        FinancialIndicator.revenue, FinancialIndicator.net_profit,
+        FinancialIndicator.employee_count, FinancialIndicator.avg_salary_all_employees,
+        Tax.year.label('tax_year'),
+        Tax.moscow_taxes, Tax.profit_tax, Tax.personal_income_tax,
+    ).select_from(Organization) \
+        .outerjoin(Address, Address.id == first_address) \
+        .outerjoin(Industry, Industry.id == first_industry) \
+        .outerjoin(Support, Support.id == first_support) \
+        .outerjoin(CompanySize, CompanySize.id == latest_size) \
+        .outerjoin(FinancialIndicator, FinancialIndicator.id == latest_financial) \
+        .outerjoin(Tax, Tax.id == latest_tax)
+
+
+def _insert_from(query, target=OrganizationSummary):
+    columns = [c.name for c in query.selected_columns]
+    return insert(target).from_select(columns, query)
+
+
+# Таблицы, из которых строится сводная таблица: запись в другие таблицы ее не меняет
+SUMMARY_SOURCE_TABLES = frozenset(model_class.__tablename__ for model_class in (
+    Organization, Address, Industry, CompanySize, Support, FinancialIndicator, Tax
+))
+
+# Запросы пересчета строятся один раз (новые aliased() при каждой записи не давали попаданий
+# в кеш компиляции SQLAlchemy), при записи меняется только список id организаций
+_REFRESH_IDS = bindparam('organization_ids', expanding=True)
+_REFRESH_DELETE = delete(OrganizationSummary.__table__).where(
+    OrganizationSummary.__table__.c.organization_id.in_(_REFRESH_IDS)
+)
+_REFRESH_INSERT = _insert_from(summary_select().where(Organization.id.in_(_REFRESH_IDS)), OrganizationSummary.__table__)
+
+
+def refresh_organizations(session, organization_ids):
+    """Пересчитывает строки сводной таблицы для указанных организаций.
+
+    Удаленные организации удаляются и из сводной таблицы.
+    Вызывается внутри транзакции записи, commit делает вызывающий код.
+    """
+    organization_ids = sorted(organization_ids)
+    for start in range(0, len(organization_ids), REFRESH_CHUNK_SIZE):
+        chunk = organization_ids[start:start + REFRESH_CHUNK_SIZE]
+        session.execute(_REFRESH_DELETE, {'organization_ids': chunk})
+        session.execute(_REFRESH_INSERT, {'organization_ids': chunk})
+
+
+def rebuild_summary(session):
+    """Полная пересборка сводной таблицы"""
+    session.execute(delete(OrganizationSummary))
+    session.execute(_insert_from(summary_select()))
+    session.commit()
+
+
+def ensure_summary(session):
+    """Собирает сводную таблицу, если она пуста, а организации есть"""
+    if session.query(OrganizationSummary.id).first() is None and \
+            session.query(Organization.id).first() is not None:
+        rebuild_summary(session)
+        return True
+    return False
+
+
+if __name__ == "__main__":
+    db_path = os.path.join(os.path.dirname(__file__), "db/database_test.db")
+    db_session.global_init(db_path)
+    session = db_session.create_session()
+    try:
+        print("Пересборка organization_summary...")
+        rebuild_summary(session)
+        print(f"organization_summary: {session.query(OrganizationSummary).count()} строк")
+    finally:
+        session.close()
@@ -0,0 +1,151 @@
+"""
+Профилирование отдельных запросов к эндпоинтам CRUD API через cProfile.
+
+Профиль снимается, если:
+- в запросе передан ?__profile=1 и правильный X-Admin-Token (кеш ответов при этом не используется);
+- включена выборка PROFILE_SAMPLE_RATE=N - профилируется каждый N-й запрос.
+
+Профили сохраняются в PROFILE_DIR (по умолчанию logs/profiles) в формате pstats
+(.prof, открывается pstats, snakeviz и т.п.) вместе с описанием запроса (.json).
+Хранятся последние PROFILE_MAX_FILES профилей. Список и скачивание:
+GET /api/admin/profiles и GET /api/admin/profiles/<имя>.
+"""
+
+import cProfile
+import itertools
+import json
+import os
+import pstats
+import re
+import time
+from datetime import datetime
+from functools import wraps
+from io import StringIO
+from flask import g, request, make_response
+import admin_api
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(BASE_DIR, 'logs', 'profiles'))
+SAMPLE_RATE = int(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '200'))
+
+PROFILE_ARG = '__profile'
+NAME_PATTERN = re.compile(r'^[\w.-]+\.prof$')
+
+_request_counter = itertools.count(1)
+
+
+def _profile_mode():
+    """'explicit', 'sample' или None, если запрос не профилируется"""
+    if request.args.get(PROFILE_ARG) == '1' and admin_api.is_admin_request():
+        return 'explicit'
+    if SAMPLE_RATE > 0 and next(_request_counter) % SAMPLE_RATE == 0:
+        return 'sample'
+    return None
+
+
+def _slug(rule):
+    return re.sub(r'[^\w]+', '-', rule).strip('-') or 'root'
+
+
+def _prune():
+    names = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith('.prof'))
+    for name in names[:max(len(names) - MAX_FILES, 0)]:
+        for path in (name, name[:-len('.prof')] + '.json'):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, path))
+            except OSError:
+                pass
+
+
+def save_profile(profiler, mode, duration_ms, status_code):
+    """Сохраняет профиль и описание запроса, возвращает имя файла"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    now = datetime.now()
+    rule = request.url_rule.rule if request.url_rule else request.path
+    name = f"{now:%Y%m%d-%H%M%S-%f}_{request.method}_{_slug(rule)}.prof"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+    info = {
+        'name': name,
+        'time': now.isoformat(timespec='seconds'),
+        'endpoint': rule,
+        'method': request.method,
+        'path': request.full_path,
+        'mode': mode,
+        'duration_ms': round(duration_ms, 2),
+        'status': status_code
+    }
+    with open(os.path.join(PROFILE_DIR, name[:-len('.prof')] + '.json'), 'w', encoding='utf-8') as info_file:
+        json.dump(info, info_file, ensure_ascii=False)
+    _prune()
+    return name
+
+
+def profiled(view):
+    """Декоратор эндпоинта: снимает cProfile запроса при ?__profile=1 или по выборке"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        mode = _profile_mode()
+        if mode is None:
+            return view(*args, **kwargs)
+        if mode == 'explicit':
+            # Явно запрошенный профиль должен показывать выполнение запроса, а не попадание в кеш
+            g.bypass_response_cache = True
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+        try:
+            name = save_profile(profiler, mode, duration_ms, response.status_code)
+            if mode == 'explicit':
+                response.headers['X-Profile'] = name
+        except OSError:
+            pass  # профилирование не должно ломать запрос
+        return response
+    return wrapper
+
+
+def profile_endpoints(app, endpoints):
+    """Оборачивает зарегистрированные в app эндпоинты декоратором profiled"""
+    for endpoint in endpoints:
+        app.view_functions[endpoint] = profiled(app.view_functions[endpoint])
+
+
+def list_profiles():
+    """Описания сохраненных профилей, новые первыми"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name), encoding='utf-8') as info_file:
+                info = json.load(info_file)
+            info['size'] = os.path.getsize(os.path.join(PROFILE_DIR, info['name']))
+        except (OSError, ValueError, KeyError):
+            continue
+        profiles.append(info)
+    return profiles
+
+
+def profile_path(name):
+    """Путь к файлу профиля или None, если имя некорректно или файла нет"""
+    if not NAME_PATTERN.match(name):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def profile_text(path, sort='cumulative', limit=50):
+    """Текстовый отчет pstats по профилю"""
+    output = StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.sort_stats(sort).print_stats(limit)
+    return output.getvalue()
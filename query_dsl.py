@@ -0,0 +1,289 @@
+"""
+JSON-язык фильтров для POST /api/tables/<table>/query.
+
+Пример тела запроса:
+{
+    "filter": {"op": "and", "args": [
+        {"op": "eq", "field": "year", "value": 2023},
+        {"op": "in", "field": "district", "values": ["ЮАО", "ЦАО"]},
+        {"op": "between", "field": "revenue", "min": 1000, "max": 50000},
+        {"op": "not", "arg": {"op": "is_null", "field": "email"}}
+    ]},
+    "sort": [{"field": "revenue", "order": "desc"}],
+    "page": 1,
+    "per_page": 50
+}
+
+Операции: and, or, not, eq, in, between, like, is_null.
+Дерево проверяется по метаданным столбцов (column_registry) и компилируется
+в выражение SQLAlchemy с именованными параметрами. Скомпилированные планы
+кешируются по структуре запроса (без значений), поэтому повторные запросы
+дашбордов с другими значениями не разбираются и не компилируются заново.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from sqlalchemy import and_, or_, not_, asc, desc, bindparam
+
+# Ограничения на размер запроса
+MAX_NODES = 200
+MAX_IN_VALUES = 10000
+PLAN_CACHE_SIZE = 256
+
+LEAF_OPS = {'eq', 'in', 'between', 'like', 'is_null'}
+BOOL_OPS = {'and', 'or', 'not'}
+
+
+class QueryDSLError(ValueError):
+    """Ошибка в JSON-запросе фильтрации"""
+
+
+class CompiledPlan:
+    """Скомпилированный план: условие WHERE и ORDER BY с параметрами p0..pN"""
+
+    def __init__(self, where, order_by):
+        self.where = where
+        self.order_by = order_by
+
+    def apply(self, query, values):
+        """Применяет план к запросу с конкретными значениями параметров"""
+        if self.where is not None:
+            query = query.filter(self.where)
+        if self.order_by:
+            query = query.order_by(*self.order_by)
+        return query.params(**values)
+
+
+class PlanCache:
+    """LRU-кеш скомпилированных планов"""
+
+    def __init__(self, max_size=PLAN_CACHE_SIZE):
+        self.max_size = max_size
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return plan
+
+    def put(self, key, plan):
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_size:
+                self._plans.popitem(last=False)
+
+    def info(self):
+        with self._lock:
+            return {
+                'size': len(self._plans),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+plan_cache = PlanCache()
+
+
+def _coerce(value, column_info, field):
+    """Приводит значение к типу столбца"""
+    if value is None:
+        raise QueryDSLError(f"Пустое значение для поля '{field}', используйте is_null")
+    python_type = column_info['python_type']
+    try:
+        if python_type == 'bool':
+            if isinstance(value, str):
+                return value.lower() in ['true', '1', 'yes', 'да']
+            return bool(value)
+        if python_type == 'int':
+            if isinstance(value, float) and not value.is_integer():
+                return value
+            return int(value)
+        if python_type == 'float':
+            return float(value)
+        return str(value)
+    except (TypeError, ValueError):
+        raise QueryDSLError(f"Некорректное значение '{value}' для поля '{field}'")
+
+
+def _column_info(columns, field):
+    if field not in columns:
+        raise QueryDSLError(f"Неизвестное поле '{field}'")
+    return columns[field]
+
+
+def _normalize(node, columns, counter):
+    """Проверяет узел и разделяет его на структуру и список значений.
+
+    Возвращает (shape, values): shape - JSON-совместимая структура без значений,
+    values - значения параметров в порядке обхода shape.
+    """
+    counter[0] += 1
+    if counter[0] > MAX_NODES:
+        raise QueryDSLError(f'Слишком сложный фильтр (более {MAX_NODES} узлов)')
+    if not isinstance(node, dict) or 'op' not in node:
+        raise QueryDSLError('Каждый узел фильтра должен быть объектом с полем "op"')
+
+    op = node['op']
+
+    if op in ('and', 'or'):
+        args = node.get('args')
+        if not isinstance(args, list) or not args:
+            raise QueryDSLError(f"Операция '{op}' требует непустой список args")
+        children = []
+        for child in args:
+            shape, values = _normalize(child, columns, counter)
+            # and внутри and (or внутри or) раскрываем
+            if shape[0] == op:
+                children.extend(zip(shape[1], _split_values(shape[1], values)))
+            else:
+                children.append((shape, values))
+        children.sort(key=lambda item: json.dumps(item[0], ensure_ascii=False))
+        if len(children) == 1:
+            return children[0]
+        return [op, [shape for shape, _ in children]], [v for _, values in children for v in values]
+
+    if op == 'not':
+        if 'arg' not in node:
+            raise QueryDSLError("Операция 'not' требует поле arg")
+        shape, values = _normalize(node['arg'], columns, counter)
+        return ['not', shape], values
+
+    if op not in LEAF_OPS:
+        raise QueryDSLError(f"Неизвестная операция '{op}'")
+
+    field = node.get('field')
+    column_info = _column_info(columns, field)
+
+    if op == 'eq':
+        return ['eq', field], [_coerce(node.get('value'), column_info, field)]
+
+    if op == 'in':
+        values = node.get('values')
+        if not isinstance(values, list) or not values:
+            raise QueryDSLError(f"Операция 'in' для поля '{field}' требует непустой список values")
+        if len(values) > MAX_IN_VALUES:
+            raise QueryDSLError(f"Слишком много значений в 'in' (максимум {MAX_IN_VALUES})")
+        return ['in', field], [[_coerce(v, column_info, field) for v in values]]
+
+    if op == 'between':
+        if not column_info['supports_range']:
+            raise QueryDSLError(f"Поле '{field}' не поддерживает диапазон")
+        return ['between', field], [_coerce(node.get('min'), column_info, field),
+                                    _coerce(node.get('max'), column_info, field)]
+
+    if op == 'like':
+        if not column_info['supports_like']:
+            raise QueryDSLError(f"Поле '{field}' не поддерживает поиск по подстроке")
+        return ['like', field], [f"%{_coerce(node.get('value'), column_info, field)}%"]
+
+    # is_null: true -> IS NULL, false -> IS NOT NULL (часть структуры, а не значение)
+    return ['is_null', field, bool(node.get('value', True))], []
+
+
+def _values_count(shape):
+    op = shape[0]
+    if op in ('and', 'or'):
+        return sum(_values_count(child) for child in shape[1])
+    if op == 'not':
+        return _values_count(shape[1])
+    if op == 'between':
+        return 2
+    if op == 'is_null':
+        return 0
+    return 1
+
+
+def _split_values(shapes, values):
+    """Делит плоский список значений между дочерними узлами"""
+    result, position = [], 0
+    for shape in shapes:
+        count = _values_count(shape)
+        result.append(values[position:position + count])
+        position += count
+    return result
+
+
+def _compile(shape, model_class, counter):
+    op = shape[0]
+    if op in ('and', 'or'):
+        clauses = [_compile(child, model_class, counter) for child in shape[1]]
+        return and_(*clauses) if op == 'and' else or_(*clauses)
+    if op == 'not':
+        return not_(_compile(shape[1], model_class, counter))
+
+    column = getattr(model_class, shape[1])
+
+    def param(**kwargs):
+        name = f'p{counter[0]}'
+        counter[0] += 1
+        return bindparam(name, **kwargs)
+
+    if op == 'eq':
+        return column == param()
+    if op == 'in':
+        return column.in_(param(expanding=True))
+    if op == 'between':
+        return column.between(param(), param())
+    if op == 'like':
+        return column.like(param())
+    return column.is_(None) if shape[2] else column.isnot(None)
+
+
+def _normalize_sort(sort, columns):
+    if sort is None:
+        return []
+    if not isinstance(sort, list):
+        raise QueryDSLError('sort должен быть списком')
+    result = []
+    for key in sort:
+        if not isinstance(key, dict):
+            raise QueryDSLError('Каждый ключ сортировки должен быть объектом {"field", "order"}')
+        field = key.get('field')
+        _column_info(columns, field)
+        order = key.get('order', 'asc')
+        if order not in ('asc', 'desc'):
+            raise QueryDSLError(f"Неизвестный порядок сортировки '{order}'")
+        result.append([field, order])
+    return result
+
+
+def prepare_query(table_name, model_class, columns, body):
+    """Проверяет тело запроса и возвращает (plan, values, cached).
+
+    columns - метаданные столбцов по имени, включая id (TableMetadata.by_name).
+    """
+    if not isinstance(body, dict):
+        raise QueryDSLError('Тело запроса должно быть JSON-объектом')
+
+    shape, values = None, []
+    if body.get('filter') is not None:
+        shape, values = _normalize(body['filter'], columns, [0])
+    sort = _normalize_sort(body.get('sort'), columns)
+
+    structure = json.dumps([table_name, shape, sort], ensure_ascii=False, sort_keys=True)
+    key = hashlib.sha1(structure.encode('utf-8')).hexdigest()
+
+    plan = plan_cache.get(key)
+    cached = plan is not None
+    if plan is None:
+        where = _compile(shape, model_class, [0]) if shape is not None else None
+        order_by = [
+            desc(getattr(model_class, field)) if order == 'desc' else asc(getattr(model_class, field))
+            for field, order in sort
+        ]
+        plan = CompiledPlan(where, order_by)
+        plan_cache.put(key, plan)
+
+    return plan, {f'p{i}': value for i, value in enumerate(values)}, cached
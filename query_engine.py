@@ -0,0 +1,342 @@
+"""
+Общий движок запросов к таблицам: фильтры, сортировка, проекция, пагинация и сериализация.
+
+Маршруты api_crud_filters строят запросы через этот модуль. Метаданные столбцов берутся
+из реестра column_registry, который вычисляется один раз при импорте.
+
+Сравнение с прежними реализациями: python benchmark_query_engine.py
+"""
+
+from datetime import datetime
+from sqlalchemy import or_, asc, desc, exists
+from sqlalchemy.orm import load_only
+from data.organization import Organization
+from data.FinancialIndicator import FinancialIndicator
+from data.Tax import Tax
+from data.adresses import Address
+from data.Okved import Okved
+from data.Contact import Contact
+from data.Industry import Industry
+from data.CompanySize import CompanySize
+from data.Support import Support
+from data.InvestmentExport import InvestmentExport
+from data.PropertyLand import PropertyLand
+from data.Production import Production
+from data.OrganizationSummary import OrganizationSummary
+from data.Rollup import FinancialRollup, TaxRollup
+import column_registry
+
+# Словарь всех моделей для динамической работы
+MODELS = {
+    'organizations': Organization,
+    'financial-indicators': FinancialIndicator,
+    'taxes': Tax,
+    'addresses': Address,
+    'okveds': Okved,
+    'contacts': Contact,
+    'industries': Industry,
+    'company-sizes': CompanySize,
+    'support': Support,
+    'investment-export': InvestmentExport,
+    'property-land': PropertyLand,
+    'production': Production,
+    'organization-summary': OrganizationSummary
+}
+
+# Метаданные столбцов всех таблиц, вычисляются один раз при импорте.
+# Rollup-таблицы не доступны через MODELS, но /aggregate фильтрует их теми же функциями
+COLUMN_REGISTRY = column_registry.build_registry([*MODELS.values(), FinancialRollup, TaxRollup])
+
+# Параметры запроса, которые не являются фильтрами
+NON_FILTER_ARGS = ['page', 'per_page', 'sort_by', 'sort_order', 'dry_run', 'all', 'include_metadata', 'fields',
+                   '__profile']
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 1000
+
+
+def get_column_metadata(model_class):
+    """Метаданные столбцов модели из реестра (вычислены при старте)"""
+    return COLUMN_REGISTRY[model_class].json
+
+
+def build_filter_conditions(model_class, args):
+    """Строит список условий фильтрации по собственным столбцам модели"""
+    conditions = []
+    table_metadata = COLUMN_REGISTRY[model_class]
+    for column_name, model_column, filter_type in table_metadata.filter_columns:
+        # Точное значение
+        value = args.get(column_name)
+        if value is not None and value != '':
+            conditions.append(model_column == value)
+
+        # Диапазон для числовых полей
+        if filter_type == 'numeric':
+            min_val = args.get(f'{column_name}_min')
+            if min_val is not None and min_val != '':
+                conditions.append(model_column >= float(min_val))
+            max_val = args.get(f'{column_name}_max')
+            if max_val is not None and max_val != '':
+                conditions.append(model_column <= float(max_val))
+
+        # Поиск по подстроке для строковых полей
+        elif filter_type == 'text':
+            like_val = args.get(f'{column_name}_like')
+            if like_val is not None and like_val != '':
+                conditions.append(model_column.like(f"%{like_val}%"))
+
+        # Фильтрация по датам
+        elif filter_type == 'date':
+            from_val = args.get(f'{column_name}_from')
+            if from_val is not None and from_val != '':
+                try:
+                    conditions.append(model_column >= datetime.strptime(from_val, '%Y-%m-%d'))
+                except ValueError:
+                    pass
+            to_val = args.get(f'{column_name}_to')
+            if to_val is not None and to_val != '':
+                try:
+                    conditions.append(model_column <= datetime.strptime(to_val, '%Y-%m-%d'))
+                except ValueError:
+                    pass
+
+    # Общий поиск по всем текстовым полям
+    if args.get('search'):
+        search_term = f"%{args['search']}%"
+        search_conditions = [column.like(search_term) for column in table_metadata.text_columns]
+        if search_conditions:
+            conditions.append(or_(*search_conditions))
+
+    return conditions
+
+
+def get_related_model(prefix):
+    """Возвращает дочернюю модель (с organization_id) по имени таблицы или ключу MODELS"""
+    for table_name, model_class in MODELS.items():
+        if prefix in (table_name, model_class.__tablename__) and \
+                'organization_id' in model_class.__table__.columns:
+            return model_class
+    return None
+
+
+def build_related_filter_conditions(args):
+    """Фильтры организаций по дочерним таблицам.
+
+    Ключи вида financial_indicators.revenue_min=1000000 группируются по таблице,
+    условия одной таблицы объединяются в один коррелированный EXISTS по organization_id.
+    Неизвестная таблица или фильтр дочерней таблицы - ValueError: пропущенный фильтр
+    вернул бы все организации, а массовое удаление затронуло бы их все.
+    """
+    related_args = {}
+    for key, value in args.items():
+        if '.' not in key:
+            continue
+        prefix, column_key = key.split('.', 1)
+        related_args.setdefault(prefix, {})[column_key] = value
+
+    conditions = []
+    for prefix, child_args in related_args.items():
+        related_model = get_related_model(prefix)
+        if related_model is None:
+            raise ValueError(f"Неизвестная таблица '{prefix}' в фильтре по связанной таблице")
+        unknown = [key for key in child_args if key not in COLUMN_REGISTRY[related_model].filter_arg_names]
+        if unknown:
+            raise ValueError(f'Неизвестные фильтры таблицы {prefix}: {sorted(unknown)}')
+        child_conditions = build_filter_conditions(related_model, child_args)
+        if child_conditions:
+            conditions.append(exists().where(
+                related_model.organization_id == Organization.id,
+                *child_conditions
+            ))
+    return conditions
+
+
+def unknown_filter_args(model_class, args):
+    """Ключи args, которые не являются фильтрами модели (для организаций - и фильтрами дочерних таблиц).
+
+    build_filter_conditions такие ключи пропускает молча.
+    """
+    unknown = []
+    for key in args:
+        if key in COLUMN_REGISTRY[model_class].filter_arg_names:
+            continue
+        if model_class is Organization and '.' in key:
+            prefix, column_key = key.split('.', 1)
+            related_model = get_related_model(prefix)
+            if related_model is not None and column_key in COLUMN_REGISTRY[related_model].filter_arg_names:
+                continue
+        unknown.append(key)
+    return unknown
+
+
+def build_query_conditions(model_class, args):
+    """Все условия фильтрации запроса к модели (для организаций - с фильтрами по дочерним таблицам)"""
+    conditions = build_filter_conditions(model_class, args)
+    if model_class is Organization:
+        conditions.extend(build_related_filter_conditions(args))
+    return conditions
+
+
+def apply_filters_to_query(query, model_class, args):
+    """Применяет фильтры к запросу с учетом типов данных"""
+    conditions = build_query_conditions(model_class, args)
+    if conditions:
+        query = query.filter(*conditions)
+    return query
+
+
+def apply_sorting_to_query(query, model_class, args):
+    """Применяет сортировку к запросу (только по столбцам таблицы)"""
+    sort_field = args.get('sort_by')
+    if sort_field and sort_field in COLUMN_REGISTRY[model_class].by_name:
+        sort_column = getattr(model_class, sort_field)
+        if args.get('sort_order') == 'desc':
+            query = query.order_by(desc(sort_column))
+        else:
+            query = query.order_by(asc(sort_column))
+    return query
+
+
+def parse_fields(model_class, value):
+    """Список столбцов для проекции из параметра fields=a,b,c (id добавляется всегда)"""
+    if not value:
+        return None
+    by_name = COLUMN_REGISTRY[model_class].by_name
+    fields = ['id']
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in by_name:
+            raise ValueError(f"Неизвестное поле '{name}'")
+        fields.append(name)
+    return tuple(fields)
+
+
+def apply_projection_to_query(query, model_class, fields):
+    """Загружает из БД только столбцы проекции"""
+    if fields:
+        query = query.options(load_only(*[getattr(model_class, name) for name in fields]))
+    return query
+
+
+def serialize_item(item, model_class, fields=None):
+    """Сериализует объект модели в словарь (fields - только указанные столбцы)"""
+    table_metadata = COLUMN_REGISTRY[model_class]
+    item_dict = {}
+    for column_name in fields or table_metadata.column_names:
+        value = getattr(item, column_name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif value is not None and column_name in table_metadata.date_named_columns:
+            # Обработка строковых дат
+            try:
+                if isinstance(value, str) and value.strip():
+                    parsed_date = datetime.strptime(value, '%Y-%m-%d')
+                    value = parsed_date.isoformat()
+            except:
+                pass
+        item_dict[column_name] = value
+    return item_dict
+
+
+def _int_arg(args, name, default):
+    try:
+        return int(args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def page_args(args):
+    """(page, per_page) из параметров запроса; некорректные значения заменяются значениями по умолчанию"""
+    page = _int_arg(args, 'page', 1)
+    per_page = min(_int_arg(args, 'per_page', DEFAULT_PER_PAGE), MAX_PER_PAGE)
+    return page, per_page
+
+
+def paginate(query, model_class, page, per_page, fields=None):
+    """Выполняет запрос страницы и возвращает словарь с записями и метаданными пагинации"""
+    total = query.count()
+    offset = (page - 1) * per_page
+    items = [serialize_item(item, model_class, fields) for item in query.offset(offset).limit(per_page)]
+    pages = (total + per_page - 1) // per_page
+    return {
+        'items': items,
+        'total': total,
+        'pages': pages,
+        'current_page': page,
+        'per_page': per_page,
+        'has_next': page < pages,
+        'has_prev': page > 1
+    }
+
+
+def build_table_query(session, model_class, args, filters=True):
+    """Запрос к таблице по параметрам запроса: (query, page, per_page, fields).
+
+    filters=False - только пагинация, без фильтров и сортировки.
+    """
+    page, per_page = page_args(args)
+    fields = parse_fields(model_class, args.get('fields'))
+    query = session.query(model_class)
+    if filters:
+        query = apply_filters_to_query(query, model_class, args)
+        query = apply_sorting_to_query(query, model_class, args)
+    query = apply_projection_to_query(query, model_class, fields)
+    return query, page, per_page, fields
+
+
+def query_table(session, model_class, args, filters=True):
+    """Страница данных таблицы по параметрам запроса (фильтры, сортировка, fields, пагинация)"""
+    query, page, per_page, fields = build_table_query(session, model_class, args, filters)
+    return paginate(query, model_class, page, per_page, fields)
+
+
+def applied_filters(args):
+    """Параметры запроса, которые были применены как фильтры"""
+    return {k: v for k, v in args.items() if k not in NON_FILTER_ARGS}
+
+
+def table_stats(session, model_class):
+    """Количество записей, min/max числовых полей и до 100 уникальных значений текстовых полей"""
+    total_records = session.query(model_class).count()
+
+    # Статистика по числовым полям
+    numeric_stats = {}
+    for column in model_class.__table__.columns:
+        if column.type.python_type in [int, float]:
+            try:
+                min_val = session.query(getattr(model_class, column.name)).filter(
+                    getattr(model_class, column.name).isnot(None)
+                ).order_by(asc(getattr(model_class, column.name))).first()[0]
+
+                max_val = session.query(getattr(model_class, column.name)).filter(
+                    getattr(model_class, column.name).isnot(None)
+                ).order_by(desc(getattr(model_class, column.name))).first()[0]
+
+                numeric_stats[column.name] = {
+                    'min': min_val,
+                    'max': max_val,
+                    'type': column.type.python_type.__name__
+                }
+            except:
+                pass
+
+    # Уникальные значения для строковых полей (первые 100)
+    text_values = {}
+    for column in model_class.__table__.columns:
+        if column.type.python_type == str and column.name != 'id':
+            try:
+                unique_values = session.query(getattr(model_class, column.name)).filter(
+                    getattr(model_class, column.name).isnot(None),
+                    getattr(model_class, column.name) != ''
+                ).distinct().limit(100).all()
+                text_values[column.name] = [v[0] for v in unique_values]
+            except:
+                pass
+
+    return {
+        'total_records': total_records,
+        'numeric_stats': numeric_stats,
+        'text_values': text_values
+    }
@@ -0,0 +1,123 @@
+"""
+Разбор стоимости запроса GET /api/tables/<table>/data для /api/tables/<table>/explain.
+
+Запрос строится тем же query_engine.build_table_query с теми же аргументами,
+затем выполняются запрос количества и запрос страницы. Для каждого возвращаются
+SQL в том виде, в каком он ушел в SQLite, параметры, план EXPLAIN QUERY PLAN
+с использованными индексами, время выполнения и оценка объема прочитанных данных.
+
+SQLite не сообщает число прочитанных строк для отдельного запроса, поэтому
+объем работы измеряется шагами виртуальной машины (счетчик progress handler
+из query_guard, с точностью до query_guard.VM_STEP_GRANULARITY),
+а для таблиц с полным сканированием указывается их размер.
+"""
+
+import time
+from sqlalchemy import event, text
+import query_engine
+import query_guard
+import slow_queries
+
+# Таблицы, для которых в предупреждениях указывается размер
+TABLE_NAMES = {model_class.__tablename__ for model_class in query_engine.MODELS.values()}
+
+
+class _StatementCapture:
+    """SQL, параметры и время выполнения запросов, прошедших через соединение"""
+
+    def __init__(self):
+        self.statements = []
+        self._started = None
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started = time.perf_counter()
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append({
+            'sql': statement,
+            'params': list(parameters) if isinstance(parameters, (list, tuple)) else parameters,
+            'sql_ms': (time.perf_counter() - self._started) * 1000
+        })
+
+
+def _measure(session, run):
+    """Выполняет run() и возвращает (результат, выполненные запросы, шаги VM, полное время в мс)"""
+    connection = session.connection()
+    capture = _StatementCapture()
+    steps_before = query_guard.vm_steps(connection)
+
+    event.listen(connection, 'before_cursor_execute', capture.before)
+    event.listen(connection, 'after_cursor_execute', capture.after)
+    try:
+        started = time.perf_counter()
+        result = run()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        event.remove(connection, 'before_cursor_execute', capture.before)
+        event.remove(connection, 'after_cursor_execute', capture.after)
+    return result, capture.statements, query_guard.vm_steps(connection) - steps_before, elapsed_ms
+
+
+def _table_rows(session, table_name, cache):
+    """Количество строк в таблице"""
+    if table_name not in cache:
+        cache[table_name] = session.execute(text(f'SELECT count(*) FROM "{table_name}"')).scalar()
+    return cache[table_name]
+
+
+def _describe(session, label, result_rows, statements, vm_steps, elapsed_ms, table_rows_cache):
+    """Описание одного запроса: SQL, план, индексы, полные сканирования, время"""
+    dbapi_connection = session.connection().connection.dbapi_connection
+    queries = []
+    warnings = []
+    for statement in statements:
+        plan = slow_queries.explain(dbapi_connection, statement['sql'], statement['params'] or ())
+        scans = {}
+        # SCAN anon_1 и т.п. - проход по результату подзапроса, а не по таблице
+        for table_name in sorted(slow_queries.full_scans(plan) & TABLE_NAMES):
+            scans[table_name] = _table_rows(session, table_name, table_rows_cache)
+            warnings.append(f"{label}: полное сканирование таблицы {table_name} "
+                            f"({scans[table_name]} строк) - фильтр или сортировка не покрыты индексом")
+        queries.append({
+            'sql': statement['sql'],
+            'params': statement['params'],
+            'plan': plan,
+            'indexes_used': sorted(slow_queries.used_indexes(plan)),
+            'full_scans': scans,
+            'sql_ms': round(statement['sql_ms'], 3)
+        })
+    return {
+        'queries': queries,
+        'execution_ms': round(elapsed_ms, 3),
+        'rows_returned': result_rows,
+        'vm_steps': vm_steps,
+        'rows_examined_estimate': sum(size for query in queries
+                                      for size in query['full_scans'].values())
+    }, warnings
+
+
+def explain_table_query(session, model_class, args):
+    """Планы, SQL и время запросов количества и страницы для аргументов GET /data"""
+    query, page, per_page, fields = query_engine.build_table_query(session, model_class, args)
+    offset = (page - 1) * per_page
+    table_rows_cache = {}
+
+    total, count_statements, count_steps, count_ms = _measure(session, query.count)
+    items, page_statements, page_steps, page_ms = _measure(
+        session, lambda: query.offset(offset).limit(per_page).all()
+    )
+
+    count_info, count_warnings = _describe(session, 'count', 1, count_statements,
+                                           count_steps, count_ms, table_rows_cache)
+    count_info['total'] = total
+    page_info, page_warnings = _describe(session, 'page', len(items), page_statements,
+                                         page_steps, page_ms, table_rows_cache)
+    return {
+        'page': page,
+        'per_page': per_page,
+        'fields': list(fields) if fields else None,
+        'count_query': count_info,
+        'page_query': page_info,
+        'total_execution_ms': round(count_ms + page_ms, 3),
+        'warnings': count_warnings + page_warnings
+    }
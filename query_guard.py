@@ -0,0 +1,175 @@
+"""
+Ограничение стоимости SQL-запросов через progress handler SQLite.
+
+Progress handler вызывается каждые VM_STEP_GRANULARITY инструкций виртуальной машины
+SQLite и прерывает выполнение запроса, если он превысил бюджет эндпоинта: количество
+шагов VM или время выполнения одного запроса. Бюджет действует и на выборку строк
+после execute, до начала следующего запроса на том же соединении.
+
+Прерванный запрос превращается в структурированный ответ:
+422 - запрос слишком дорогой при любой нагрузке (превышен лимит шагов VM),
+503 - запрос не уложился во время (с заголовком Retry-After).
+В ответе перечислены параметры, которые стоит сузить.
+
+Переменные окружения:
+QUERY_GUARD=0 - отключить ограничения (подсчет шагов для /explain продолжает работать),
+QUERY_MAX_VM_STEPS, QUERY_TIMEOUT_MS - бюджет GET-эндпоинтов по умолчанию.
+"""
+
+import os
+import time
+from flask import g, jsonify, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+VM_STEP_GRANULARITY = 1000
+
+
+class Budget:
+    """Бюджет одного SQL-запроса: шаги VM SQLite и время в миллисекундах"""
+
+    def __init__(self, max_vm_steps, timeout_ms):
+        self.max_vm_steps = max_vm_steps
+        self.timeout_ms = timeout_ms
+
+    def to_dict(self):
+        return {'max_vm_steps': self.max_vm_steps, 'timeout_ms': self.timeout_ms}
+
+
+ENABLED = os.getenv('QUERY_GUARD', '1').lower() not in ['0', 'false', 'no']
+
+# Бюджет GET-эндпоинтов, не перечисленных в ENDPOINT_BUDGETS
+DEFAULT_BUDGET = Budget(int(os.getenv('QUERY_MAX_VM_STEPS', '200000000')),
+                        int(os.getenv('QUERY_TIMEOUT_MS', '5000')))
+
+# Бюджеты отдельных эндпоинтов ("МЕТОД правило"); запросы на запись ограничиваются
+# только если перечислены здесь
+ENDPOINT_BUDGETS = {
+    'GET /api/companies/search': Budget(20000000, 2000),
+    'POST /api/tables/<table_name>/query': DEFAULT_BUDGET,
+    'POST /api/tables/<table_name>/batch-get': DEFAULT_BUDGET,
+}
+
+
+class ConnectionGuard:
+    """Состояние progress handler одного соединения SQLite"""
+
+    def __init__(self):
+        self.budget = None
+        self.steps = 0
+        self.total_steps = 0
+        self.deadline = None
+        self.tripped = None
+
+    def start_statement(self, budget):
+        self.budget = budget
+        self.steps = 0
+        self.tripped = None
+        self.deadline = time.perf_counter() + budget.timeout_ms / 1000 if budget else None
+
+    def __call__(self):
+        self.steps += VM_STEP_GRANULARITY
+        self.total_steps += VM_STEP_GRANULARITY
+        if self.budget is None:
+            return 0
+        if self.steps > self.budget.max_vm_steps:
+            self.tripped = 'vm_steps'
+        elif time.perf_counter() > self.deadline:
+            self.tripped = 'timeout'
+        else:
+            return 0
+        if has_request_context():
+            g.query_guard_tripped = {'reason': self.tripped, 'vm_steps': self.steps,
+                                     'budget': self.budget.to_dict()}
+        return 1  # ненулевое значение прерывает запрос
+
+
+def _connection_guard(dbapi_connection, info):
+    guard = info.get('query_guard')
+    if guard is None:
+        guard = info['query_guard'] = ConnectionGuard()
+        dbapi_connection.set_progress_handler(guard, VM_STEP_GRANULARITY)
+    return guard
+
+
+def vm_steps(connection):
+    """Счетчик шагов VM соединения SQLAlchemy (растет монотонно)"""
+    return _connection_guard(connection.connection.dbapi_connection, connection.info).total_steps
+
+
+def request_budget():
+    """Бюджет текущего HTTP-запроса или None, если запрос не ограничивается"""
+    if not ENABLED or not has_request_context() or request.url_rule is None:
+        return None
+    budget = ENDPOINT_BUDGETS.get(f'{request.method} {request.url_rule.rule}')
+    if budget is None and request.method == 'GET':
+        budget = DEFAULT_BUDGET
+    return budget
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if conn.dialect.name != 'sqlite':
+        return
+    guard = _connection_guard(cursor.connection, conn.info)
+    guard.start_statement(g.get('query_budget') if has_request_context() else None)
+
+
+def _suggestions(args):
+    """Подсказки, как сузить запрос, по его параметрам"""
+    suggestions = []
+    if 'search' in args:
+        suggestions.append('Замените search (поиск по всем текстовым столбцам) '
+                           'на фильтр по конкретному столбцу: <столбец>_like=...')
+    like_args = [key for key in args if key.endswith('_like')]
+    if like_args:
+        suggestions.append(f"Используйте точные значения вместо {', '.join(like_args)} "
+                           f"или добавьте фильтры по индексированным столбцам")
+    if 'sort_by' in args:
+        suggestions.append('Уберите sort_by или отсортируйте по индексированному столбцу')
+    if not [key for key in args if key not in ('page', 'per_page', 'sort_by', 'sort_order', 'fields')]:
+        suggestions.append('Добавьте фильтры по конкретным столбцам (например, year, district, organization_id)')
+    suggestions.append('Проверить план запроса: GET /api/tables/<table>/explain с теми же параметрами')
+    return suggestions
+
+
+def interrupted_response():
+    """Ответ 422/503, если во время запроса сработало ограничение, иначе None"""
+    tripped = g.get('query_guard_tripped') if has_request_context() else None
+    if tripped is None:
+        return None
+
+    if tripped['reason'] == 'vm_steps':
+        status_code = 422
+        message = 'Запрос слишком дорогой: превышен лимит шагов SQLite. Сузьте фильтры'
+    else:
+        status_code = 503
+        message = 'Запрос прерван по времени выполнения. Сузьте фильтры или повторите позже'
+    response = jsonify({
+        'error': message,
+        'reason': tripped['reason'],
+        'vm_steps': tripped['vm_steps'],
+        'budget': tripped['budget'],
+        'endpoint': f'{request.method} {request.url_rule.rule}',
+        'suggestions': _suggestions(request.args)
+    })
+    response.status_code = status_code
+    if status_code == 503:
+        response.headers['Retry-After'] = '5'
+    return response
+
+
+def register_query_guard(app):
+    """Подключает ограничение стоимости запросов к приложению Flask"""
+
+    @app.before_request
+    def set_query_budget():
+        g.query_budget = request_budget()
+
+    @app.after_request
+    def replace_interrupted_response(response):
+        # Эндпоинты перехватывают ошибки сами (500 или частичный результат),
+        # поэтому итоговый ответ заменяется здесь
+        interrupted = interrupted_response()
+        g.pop('query_guard_tripped', None)
+        return interrupted or response
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Генератор книг Excel в формате реестра предприятий для загрузки через excel_api.
+
+Книга содержит все колонки, которые читает excel_api (организация, площадки, адрес,
+продукция, поддержка, отрасли, ОКВЭД, контакты), и годовые колонки с годом в конце
+названия ("Выручка предприятия, тыс. руб. 2022", "Налог на прибыль 2023") за years лет.
+Часть ячеек остается пустой, как в реальном реестре. Для одинакового seed
+книга одинакова; ИНН организаций - first_inn, first_inn + 1, ...
+
+Запуск:
+    python registry_workbook.py registry.xlsx --rows 1000 --years 5 [--last-year 2023] [--seed 42]
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+from generate_random_data import CONFIG, ORGANIZATION_TYPES, BULK_SEED, build_pools
+
+DEFAULT_YEARS = 3
+DEFAULT_LAST_YEAR = 2023
+DEFAULT_FIRST_INN = 5000000000
+
+# Годовые колонки: префикс -> (минимум, максимум); к названию добавляется " <год>"
+YEAR_COLUMNS = {
+    'Выручка предприятия, тыс. руб.': (1000, 10000000),
+    'Чистая прибыль (убыток), тыс. руб.': (-100000, 1000000),
+    'Среднесписочная численность персонала (всего по компании), чел': (5, 5000),
+    'Фонд оплаты труда всех сотрудников организации, тыс. руб': (1000, 2000000),
+    'Налоги в бюджет Москвы (без акцизов), тыс.руб.': (100, 500000),
+    'Налог на прибыль': (0, 200000),
+    'Налог на имущество, тыс.руб.': (0, 50000),
+    'Земельный налог, тыс.руб.': (0, 20000),
+    'НДФЛ, тыс.руб.': (0, 300000),
+    'Транспортный налог, тыс.руб.': (0, 5000),
+    'Прочие налоги, тыс.руб.': (0, 10000),
+    'Акцизы, тыс.руб.': (0, 10000),
+    'Объем инвестиций Москвы, тыс.руб.': (0, 1000000),
+    'Объем экспорта, тыс.руб.': (0, 1000000),
+}
+YEAR_SIZE_COLUMNS = ['Размер предприятия (итог)', 'Размер предприятия (по численности)',
+                     'Размер предприятия (по выручке)']
+
+# Доля пустых ячеек в необязательных колонках
+EMPTY_SHARE = 0.15
+
+STATUSES = ['Действующая', 'В процессе ликвидации', 'Реорганизация']
+PLATFORMS = ['Технопарк', 'Индустриальный парк', 'ОЭЗ', 'Собственная площадка']
+SME_STATUSES = ['Микропредприятие', 'Малое предприятие', 'Среднее предприятие', 'Не является МСП']
+OWNERSHIP_TYPES = ['Собственность', 'Аренда', 'Государственная собственность']
+RELATION_TYPES = ['Дочерняя организация', 'Филиал', 'Зависимое общество']
+YES_NO = ['Да', 'Нет']
+
+
+def registry_years(years=DEFAULT_YEARS, last_year=DEFAULT_LAST_YEAR):
+    return list(range(last_year - years + 1, last_year + 1))
+
+
+def generate_registry_frame(rows, years=DEFAULT_YEARS, last_year=DEFAULT_LAST_YEAR,
+                            seed=BULK_SEED, first_inn=DEFAULT_FIRST_INN, pools=None):
+    """DataFrame в формате реестра: rows организаций, годовые колонки за years лет"""
+    rng = np.random.default_rng(seed)
+    pools = pools if pools is not None else build_pools(seed)
+
+    def pick(values):
+        values = np.asarray(values, dtype=object)
+        return values[rng.integers(0, len(values), rows)]
+
+    def maybe(values):
+        return np.where(rng.random(rows) < EMPTY_SHARE, None, values)
+
+    def amounts(low, high):
+        return maybe(np.round(rng.uniform(low, high, rows), 1))
+
+    numbers = np.arange(rows)
+    companies = pick(pools['companies'])
+    org_types = pick(ORGANIZATION_TYPES)
+    names = [f'{org_type} "{company}"' for org_type, company in zip(org_types, companies)]
+    okved_main = pick(CONFIG['okved_codes'])
+    okved_production = pick(CONFIG['okved_codes'])
+    districts = pick(CONFIG['moscow_districts'])
+    exporting = pick(YES_NO)
+
+    columns = {
+        'ИНН': (first_inn + numbers).astype(str),
+        'Наименование организации': names,
+        'Полное наименование организации': [f'{name} (полное наименование)' for name in names],
+        'Статус СПАРК': pick(STATUSES),
+        'Статус внутренний': maybe(pick(STATUSES)),
+        'Статус ИТОГ': pick(STATUSES),
+        'Дата добавления в реестр': maybe(
+            (np.datetime64('2018-01-01') + rng.integers(0, 2000, rows)).astype(str)),
+        'Дата регистрации': (np.datetime64('1995-01-01') + rng.integers(0, 10000, rows)).astype(str),
+        'Руководитель': pick(pools['people']),
+        'Сайт': maybe([f'https://{domain}.ru' for domain in pick(pools['domains'])]),
+        'Электронная почта': maybe(pick(pools['emails'])),
+        'Общие сведения об организации': maybe(pick(pools['text_200'])),
+        'Головная организация': maybe(pick(pools['companies'])),
+        'ИНН головной организации': maybe((first_inn - 1 - rng.integers(0, 1000000, rows)).astype(str)),
+        'Тип связи с головной': maybe(pick(RELATION_TYPES)),
+
+        'Кадастровый номер ЗУ': maybe([f'77:{a:02d}:{b:07d}:{c}' for a, b, c in zip(
+            rng.integers(1, 20, rows), rng.integers(0, 9999999, rows), rng.integers(1, 9999, rows))]),
+        'Площадь ЗУ': amounts(0.1, 50),
+        'Вид разрешенного использования ЗУ': maybe(pick(['Производственная деятельность', 'Склады',
+                                                          'Деловое управление'])),
+        'Вид собственности ЗУ': maybe(pick(OWNERSHIP_TYPES)),
+        'Собственник ЗУ': maybe(pick(pools['companies'])),
+        'Кадастровый номер ОКСа': maybe([f'77:{a:02d}:{b:07d}:{c}' for a, b, c in zip(
+            rng.integers(1, 20, rows), rng.integers(0, 9999999, rows), rng.integers(1, 9999, rows))]),
+        'Площадь ОКСов': amounts(100, 100000),
+        'Вид использования ОКСов': maybe(pick(['Производство', 'Склад', 'Офис'])),
+        'Тип/назначение ОКСов': maybe(pick(['Нежилое здание', 'Сооружение', 'Помещение'])),
+        'Вид собственности ОКСов': maybe(pick(OWNERSHIP_TYPES)),
+        'Собственник ОКСов': maybe(pick(pools['companies'])),
+        'Производственная площадь': amounts(50, 50000),
+
+        'Юридический адрес': [f'г. Москва, {street}' for street in pick(pools['streets'])],
+        'Координаты (широта)': np.round(rng.uniform(55.55, 55.95, rows), 6),
+        'Координаты (долгота)': np.round(rng.uniform(37.35, 37.85, rows), 6),
+        'Округ': districts,
+        'Район': maybe(pick(pools['words'])),
+
+        'Производимая продукция': maybe(pick(pools['sentences'])),
+        'Стандартизированная продукция': maybe(pick(YES_NO)),
+        'Название (виды производимой продукции)': maybe(pick(pools['sentences'])),
+        'Перечень производимой продукции по кодам ОКПД 2': maybe(
+            [f'{a}.{b}; {a}.{c}' for a, b, c in zip(rng.integers(10, 33, rows), rng.integers(10, 99, rows),
+                                                     rng.integers(10, 99, rows))]),
+        'Сегменты/типы продукции': maybe(pick(pools['words'])),
+        'Каталог продукции': maybe([f'https://{domain}.ru/catalog' for domain in pick(pools['domains'])]),
+        'Наличие госзаказа': pick(YES_NO),
+        'Загрузка мощностей, %': maybe(rng.integers(20, 100, rows)),
+        'Наличие поставок продукции на экспорт': exporting,
+        'Объем экспорта (млн.руб.) за предыдущий календарный год': np.where(
+            exporting == 'Да', np.round(rng.uniform(1, 1000, rows), 1), None),
+        'Перечень государств куда экспортируется продукция': np.where(
+            exporting == 'Да', [f'{a}; {b}' for a, b in zip(pick(pools['countries']), pick(pools['countries']))],
+            None),
+        'Код ТН ВЭД': maybe(rng.integers(1000000000, 9999999999, rows).astype(str)),
+
+        'Поддержка (описание)': maybe(pick(pools['text_100'])),
+        'Специальный статус': maybe(pick(['Технологическая компания', 'Резидент ОЭЗ', 'Промышленный комплекс'])),
+        'Площадка итог': maybe(pick(PLATFORMS)),
+        'Получали поддержку от Москвы': pick(YES_NO),
+        'Системообразующее предприятие': pick(YES_NO),
+        'Статус МСП': pick(SME_STATUSES),
+
+        'Основная отрасль': pick(CONFIG['industries']),
+        'Подотрасль (Основная)': maybe(pick(pools['words'])),
+        'Дополнительная отрасль': maybe(pick(CONFIG['industries'])),
+        'Подотрасль (Дополнительная)': maybe(pick(pools['words'])),
+        'Отрасль по СПАРК': maybe(pick(CONFIG['industries'])),
+
+        'Основной ОКВЭД (СПАРК)': okved_main,
+        'Вид деятельности по основному ОКВЭД (СПАРК)': pick(pools['sentences']),
+        'Производственный ОКВЭД': maybe(okved_production),
+        'Вид деятельности по производственному ОКВЭД': maybe(pick(pools['sentences'])),
+
+        'Контакт сотрудника организации': maybe(pick(pools['people'])),
+        'Номер телефона': [f'+7 (495) {a:03d}-{b:02d}-{c:02d}' for a, b, c in zip(
+            rng.integers(100, 999, rows), rng.integers(10, 99, rows), rng.integers(10, 99, rows))],
+        'Почта руководства': maybe(pick(pools['emails'])),
+        'Тип контакта': maybe(pick(['general', 'management', 'sales'])),
+    }
+
+    for year in registry_years(years, last_year):
+        for prefix, (low, high) in YEAR_COLUMNS.items():
+            columns[f'{prefix} {year}'] = amounts(low, high)
+        for prefix in YEAR_SIZE_COLUMNS:
+            columns[f'{prefix} {year}'] = maybe(pick(CONFIG['company_sizes']))
+
+    return pd.DataFrame(columns)
+
+
+def write_registry_workbook(path, rows, years=DEFAULT_YEARS, last_year=DEFAULT_LAST_YEAR,
+                            seed=BULK_SEED, first_inn=DEFAULT_FIRST_INN, pools=None):
+    """Записывает книгу реестра в path и возвращает количество колонок"""
+    frame = generate_registry_frame(rows, years, last_year, seed, first_inn, pools)
+    frame.to_excel(path, index=False)
+    return len(frame.columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', help='файл .xlsx')
+    parser.add_argument('--rows', type=int, default=1000, help='количество организаций (строк)')
+    parser.add_argument('--years', type=int, default=DEFAULT_YEARS, help='количество лет в годовых колонках')
+    parser.add_argument('--last-year', type=int, default=DEFAULT_LAST_YEAR)
+    parser.add_argument('--seed', type=int, default=BULK_SEED)
+    parser.add_argument('--first-inn', type=int, default=DEFAULT_FIRST_INN, help='ИНН первой организации')
+    options = parser.parse_args()
+
+    column_count = write_registry_workbook(options.path, options.rows, options.years, options.last_year,
+                                           options.seed, options.first_inn)
+    print(f"Книга {options.path}: {options.rows} строк, {column_count} колонок")
+
+
+if __name__ == "__main__":
+    main()
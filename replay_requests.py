@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Воспроизведение записанных запросов (request_log) против запущенного экземпляра API.
+
+Записи из журнала (logs/recorded_requests.jsonl и т.п.) отправляются в исходном порядке
+--concurrency параллельными клиентами. Отчет по каждому маршруту ("МЕТОД правило"):
+количество, ошибки, p50/p95/p99 задержки при воспроизведении и p50/p95 задержки,
+записанной в журнале. Запросы с телом, которое не было сохранено (REQUEST_LOG_BODIES=0),
+пропускаются.
+
+Запуск:
+    python replay_requests.py logs/recorded_requests.jsonl --base-url http://localhost:5000
+        [--concurrency 8] [--limit 10000] [--methods GET,POST] [--output replay.json]
+
+Запросы на запись изменяют БД, поэтому воспроизводить журнал стоит на копии.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+import requests
+from benchmark_endpoints import percentile
+
+DEFAULT_BASE_URL = 'http://localhost:5000'
+DEFAULT_CONCURRENCY = 8
+TIMEOUT = 60
+
+
+def load_records(paths, methods=None, limit=None):
+    """Записи журналов, которые можно воспроизвести, и количество пропущенных"""
+    records, skipped = [], 0
+    for path in paths:
+        with open(path, encoding='utf-8') as log_file:
+            for line in log_file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    skipped += 1
+                    continue
+                if methods and record.get('method') not in methods:
+                    continue
+                if record.get('body_size') and 'body' not in record:
+                    skipped += 1
+                    continue
+                records.append(record)
+                if limit and len(records) >= limit:
+                    return records, skipped
+    return records, skipped
+
+
+def route_key(record):
+    return f"{record['method']} {record.get('route') or record['path']}"
+
+
+class Replayer:
+    """Отправка записей с отдельной сессией requests на каждый поток"""
+
+    def __init__(self, base_url, timeout=TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def send(self, record):
+        """(ключ маршрута, статус или None при сетевой ошибке, задержка в секундах)"""
+        url = self.base_url + record['path']
+        if record.get('args'):
+            url += '?' + urlencode(record['args'], doseq=True)
+        started = time.perf_counter()
+        try:
+            response = self._session().request(record['method'], url, json=record.get('body'),
+                                               timeout=self.timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = None
+        return route_key(record), status, time.perf_counter() - started
+
+
+def replay(records, base_url, concurrency):
+    """Воспроизводит записи и возвращает результаты и общее время в секундах"""
+    replayer = Replayer(base_url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(replayer.send, records))
+    return results, time.perf_counter() - started
+
+
+def summarize(records, results, elapsed):
+    recorded = {}
+    for record in records:
+        if record.get('latency_ms') is not None:
+            recorded.setdefault(route_key(record), []).append(record['latency_ms'])
+
+    by_route = {}
+    for key, status, seconds in results:
+        by_route.setdefault(key, []).append((status, seconds * 1000))
+
+    routes = {}
+    for key, samples in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        timings = [ms for _, ms in samples]
+        statuses = [status for status, _ in samples]
+        routes[key] = {
+            'count': len(samples),
+            'errors': sum(1 for status in statuses if status is None or status >= 500),
+            'statuses': sorted(set(str(status) for status in statuses)),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'recorded_p50_ms': round(percentile(recorded[key], 50), 3) if key in recorded else None,
+            'recorded_p95_ms': round(percentile(recorded[key], 95), 3) if key in recorded else None,
+        }
+    return {
+        'requests': len(results),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(results) / elapsed, 1) if elapsed else None,
+        'errors': sum(route['errors'] for route in routes.values()),
+        'routes': routes
+    }
+
+
+def _ms(value):
+    return f'{value:.1f}' if value is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('logs', nargs='+', help='файлы журнала запросов (JSONL)')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='параллельных клиентов')
+    parser.add_argument('--limit', type=int, help='воспроизвести не больше N записей')
+    parser.add_argument('--methods', help='только указанные методы, через запятую (например GET)')
+    parser.add_argument('--output', help='сохранить результат в JSON')
+    options = parser.parse_args()
+
+    methods = {method.strip().upper() for method in options.methods.split(',')} if options.methods else None
+    records, skipped = load_records(options.logs, methods, options.limit)
+    if not records:
+        print('Нет записей для воспроизведения')
+        sys.exit(1)
+    print(f"Записей: {len(records)}, пропущено (нет тела или некорректная строка): {skipped}, "
+          f"параллельно: {options.concurrency}")
+
+    results, elapsed = replay(records, options.base_url, options.concurrency)
+    summary = summarize(records, results, elapsed)
+    summary['skipped'] = skipped
+    summary['concurrency'] = options.concurrency
+
+    print(f"\nВсего: {summary['requests']} запросов за {summary['elapsed_seconds']} с "
+          f"({summary['throughput_rps']} запр/с), ошибок: {summary['errors']}")
+    print(f"{'маршрут':<50} {'кол-во':>7} {'ошибки':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'журнал p50':>11} {'журнал p95':>11}")
+    for key, route in summary['routes'].items():
+        print(f"{key[:50]:<50} {route['count']:>7} {route['errors']:>7} {_ms(route['p50_ms']):>8} "
+              f"{_ms(route['p95_ms']):>8} {_ms(route['p99_ms']):>8} "
+              f"{_ms(route['recorded_p50_ms']):>11} {_ms(route['recorded_p95_ms']):>11}")
+
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as output_file:
+            json.dump(summary, output_file, ensure_ascii=False, indent=2)
+        print(f"\nРезультат сохранен: {options.output}")
+
+
+if __name__ == "__main__":
+    main()
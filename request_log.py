@@ -0,0 +1,109 @@
+"""
+Запись выборки HTTP-запросов для воспроизведения нагрузки (replay_requests.py).
+
+Каждый REQUEST_LOG_SAMPLE_RATE-й запрос записывается JSON-строкой в REQUEST_LOG_FILE
+(по умолчанию logs/recorded_requests.jsonl, ротация по 50 МБ, 5 файлов): время, метод,
+путь, правило маршрута, параметры запроса, SHA-256 и размер тела, статус и задержка.
+Само тело сохраняется только при REQUEST_LOG_BODIES=1 и только для JSON до MAX_BODY_BYTES,
+без него воспроизвести можно лишь запросы без тела.
+
+Переменные окружения:
+REQUEST_LOG=1 - включить запись (по умолчанию выключена),
+REQUEST_LOG_SAMPLE_RATE=N - записывать каждый N-й запрос (по умолчанию каждый),
+REQUEST_LOG_FILE, REQUEST_LOG_BODIES.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from flask import g, request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ENABLED = os.getenv('REQUEST_LOG', '').lower() in ['1', 'true', 'yes']
+SAMPLE_RATE = max(int(os.getenv('REQUEST_LOG_SAMPLE_RATE', '1')), 1)
+LOG_PATH = os.getenv('REQUEST_LOG_FILE', os.path.join(BASE_DIR, 'logs', 'recorded_requests.jsonl'))
+RECORD_BODIES = os.getenv('REQUEST_LOG_BODIES', '').lower() in ['1', 'true', 'yes']
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+MAX_BODY_BYTES = 64 * 1024
+
+# Служебные маршруты не записываются: они не отражают пользовательскую нагрузку
+EXCLUDED_PREFIXES = ('/metrics', '/api/admin', '/static')
+
+_request_counter = itertools.count(1)
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _get_logger():
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+            handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES,
+                                          backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger('request_log')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+
+def _should_record():
+    if request.path.startswith(EXCLUDED_PREFIXES):
+        return False
+    return next(_request_counter) % SAMPLE_RATE == 0
+
+
+def build_record(response, latency_ms):
+    """Запись о запросе в формате журнала"""
+    body = request.get_data(cache=True)
+    record = {
+        'time': datetime.now().isoformat(timespec='milliseconds'),
+        'method': request.method,
+        'path': request.path,
+        'route': request.url_rule.rule if request.url_rule else None,
+        'args': {key: values for key, values in request.args.lists()},
+        'content_type': request.mimetype or None,
+        # Тело multipart-загрузки к этому моменту уже разобрано, хеш для него не считается
+        'body_size': request.content_length or len(body),
+        'body_sha256': hashlib.sha256(body).hexdigest() if body else None,
+        'status': response.status_code,
+        'latency_ms': round(latency_ms, 3)
+    }
+    if RECORD_BODIES and body and request.is_json and len(body) <= MAX_BODY_BYTES:
+        record['body'] = request.get_json(silent=True)
+    return record
+
+
+def register_request_log(app):
+    """Подключает запись выборки запросов к приложению Flask (если включена REQUEST_LOG)"""
+    if not ENABLED:
+        return
+
+    @app.before_request
+    def start_request_log():
+        if _should_record():
+            g.request_log_started = time.perf_counter()
+
+    @app.after_request
+    def write_request_log(response):
+        started = g.pop('request_log_started', None)
+        if started is None:
+            return response
+        try:
+            record = build_record(response, (time.perf_counter() - started) * 1000)
+            _get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+        except Exception:
+            pass  # запись журнала не должна ломать запрос
+        return response
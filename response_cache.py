@@ -0,0 +1,373 @@
+"""
+Кеш ответов GET-эндпоинтов с инвалидацией по версиям таблиц.
+
+У каждой таблицы БД есть счетчик версии в таблице table_versions той же БД. Его увеличивает
+транзакция любой сессии, изменившей таблицу (ORM-изменения, массовые UPDATE/DELETE,
+INSERT ... SELECT), поэтому запись в одном процессе (воркер gunicorn, generate_random_data.py)
+видна кешам всех остальных. Закешированный ответ хранит версии таблиц, от которых он зависит,
+и считается устаревшим, как только хотя бы одна из них изменилась.
+
+Хранилище подключаемое (set_backend), по умолчанию - LRU в памяти процесса.
+Ограничения задаются переменными окружения:
+RESPONSE_CACHE_SIZE - максимальное количество ответов (0 - кеш выключен),
+RESPONSE_CACHE_MAX_BYTES - максимальный суммарный размер ответов,
+RESPONSE_CACHE_TTL - время жизни ответа в секундах.
+
+Успешные ответы получают ETag из версий таблиц и ключа запроса. Запрос с
+совпадающим If-None-Match получает 304 без выполнения запроса эндпоинта (читаются
+только версии таблиц). ETag не зависит от процесса: все воркеры выдают один и тот же
+ETag и отвечают 304, пока таблицы не изменились, в том числе после перезапуска.
+
+Для тяжелых эндпоинтов (cached_response(..., coalesce=True)) одинаковые
+одновременные запросы объединяются: первый вычисляет ответ, остальные ждут
+его не дольше COALESCE_TIMEOUT секунд и получают тот же результат.
+"""
+
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import g, request, make_response
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import compression
+import query_guard
+from data import db_session
+from data.TableVersion import TableVersion
+
+# Строка table_versions со случайной эпохой БД: создается один раз для файла БД и входит в ETag.
+# Версии таблиц в замененном (восстановленном из копии) файле могут совпасть со старыми, эпоха - нет
+EPOCH_KEY = '*'
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+class TableVersions:
+    """Счетчики версий таблиц в самой БД (таблица table_versions), общие для всех процессов"""
+
+    def bump(self, connection, table_names):
+        """Увеличивает версии таблиц в текущей транзакции соединения connection"""
+        statement = sqlite_insert(TableVersion).values(
+            [{'table_name': name, 'version': 1} for name in sorted(table_names)]
+        )
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[TableVersion.table_name],
+            set_={'version': TableVersion.version + 1}
+        ))
+
+    def snapshot(self, table_names):
+        """Эпоха БД и версии указанных таблиц в виде кортежа (table_name, version)"""
+        names = sorted(set(table_names))
+        with db_session.get_engine().connect() as connection:
+            versions = self._read(connection, names)
+        if EPOCH_KEY not in versions:
+            versions[EPOCH_KEY] = self._create_epoch()
+        return ((EPOCH_KEY, versions[EPOCH_KEY]),) + tuple((name, versions.get(name, 0)) for name in names)
+
+    def _read(self, connection, names):
+        return dict(connection.execute(
+            select(TableVersion.table_name, TableVersion.version)
+            .where(TableVersion.table_name.in_([EPOCH_KEY, *names]))
+        ).all())
+
+    def _create_epoch(self):
+        # Эпоху могут одновременно создавать несколько процессов: сохраняется первая
+        with db_session.get_engine().begin() as connection:
+            connection.execute(sqlite_insert(TableVersion).values(
+                table_name=EPOCH_KEY, version=secrets.randbelow(2 ** 31)
+            ).on_conflict_do_nothing())
+            return self._read(connection, [])[EPOCH_KEY]
+
+
+table_versions = TableVersions()
+
+
+class CachedResponse:
+    """Тело и заголовки ответа вместе с версиями таблиц на момент вычисления"""
+
+    def __init__(self, versions, body, status_code, mimetype):
+        self.versions = versions
+        self.body = body
+        self.status_code = status_code
+        self.mimetype = mimetype
+        self.gzip_body = None  # сжатое тело, вычисляется при первом запросе с gzip
+        self.created_at = time.monotonic()
+
+
+class _Flight:
+    """Вычисление, которого ждут одинаковые запросы"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class SingleFlight:
+    """Объединение одновременных одинаковых вычислений (single-flight)"""
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, compute):
+        """Возвращает (результат compute(), получен ли он от другого запроса).
+
+        Если ведущий запрос не успел за timeout или завершился ошибкой,
+        ожидающий вычисляет результат сам.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+
+        if not leader:
+            finished = flight.done.wait(self.timeout)
+            with self._lock:
+                if finished and flight.result is not None:
+                    self.shared += 1
+                    return flight.result, True
+                if not finished:
+                    self.timeouts += 1
+            return compute(), False
+
+        try:
+            flight.result = compute()
+            return flight.result, False
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def info(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'timeout': self.timeout,
+                'leaders': self.leaders,
+                'shared': self.shared,
+                'timeouts': self.timeouts
+            }
+
+
+single_flight = SingleFlight(timeout=_env_int('COALESCE_TIMEOUT', 10))
+
+
+class MemoryCache:
+    """LRU-кеш ответов в памяти процесса с ограничением по количеству, размеру и TTL"""
+
+    def __init__(self, max_size=512, max_bytes=64 * 1024 * 1024, ttl=300):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, versions):
+        """Возвращает ответ, если он есть, не истек и вычислен для тех же версий таблиц"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.versions != versions or
+                                      time.monotonic() - entry.created_at > self.ttl):
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        if self.max_size <= 0 or len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while len(self._entries) > self.max_size or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+_backend = MemoryCache(
+    max_size=_env_int('RESPONSE_CACHE_SIZE', 512),
+    max_bytes=_env_int('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+    ttl=_env_int('RESPONSE_CACHE_TTL', 300),
+)
+
+
+def set_backend(backend):
+    """Подключает другое хранилище (объект с методами get, put, clear, info)"""
+    global _backend
+    _backend = backend
+
+
+def get_backend():
+    return _backend
+
+
+def info():
+    """Статистика кеша ответов и объединения запросов"""
+    return {**_backend.info(), 'coalescing': single_flight.info()}
+
+
+def cache_key(name, args, kwargs):
+    """Ключ: эндпоинт, его аргументы и нормализованные (отсортированные) параметры запроса"""
+    query_args = tuple(sorted(
+        (key, value) for key, value in request.args.items(multi=True) if value != ''
+    ))
+    return (name, args, tuple(sorted(kwargs.items())), query_args)
+
+
+def make_etag(key, versions):
+    return hashlib.sha1(repr((key, versions)).encode('utf-8')).hexdigest()
+
+
+def _matching_etag(etag):
+    """ETag из If-None-Match, совпавший с текущим (несжатым или сжатым) представлением"""
+    for candidate in (etag, etag + '-gzip'):
+        if request.if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+
+def _from_entry(entry, etag, cache_status):
+    """Собирает ответ из сохраненного (кешированного или общего) результата"""
+    response = make_response(entry.body, entry.status_code)
+    response.mimetype = entry.mimetype
+    response.headers['X-Cache'] = cache_status
+    if entry.status_code != 200:
+        return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    if compression.should_compress(response):
+        if entry.gzip_body is None:
+            entry.gzip_body = compression.compress_body(entry.body)
+        compression.set_gzip_body(response, entry.gzip_body)
+    return response
+
+
+def cached_response(dependencies, coalesce=False):
+    """Декоратор GET-эндпоинта: кеширует успешные ответы и отвечает 304 на If-None-Match.
+
+    dependencies(*args, **kwargs) возвращает имена таблиц БД (__tablename__),
+    от которых зависит ответ. coalesce=True объединяет одновременные одинаковые запросы.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if g.get('bypass_response_cache'):
+                return view(*args, **kwargs)
+            key = cache_key(view.__name__, args, kwargs)
+            # Версии берутся до выполнения запроса: запись, завершившаяся во время
+            # вычисления, сделает сохраненный ответ устаревшим
+            versions = table_versions.snapshot(dependencies(*args, **kwargs))
+            etag = make_etag(key, versions)
+
+            matched = _matching_etag(etag)
+            if matched:
+                response = make_response('', 304)
+                response.set_etag(matched)
+                response.headers['X-Cache'] = 'NOT-MODIFIED'
+                return response
+
+            entry = _backend.get(key, versions)
+            if entry is not None:
+                return _from_entry(entry, etag, 'HIT')
+
+            def compute():
+                response = make_response(view(*args, **kwargs))
+                # Прерванный по бюджету запрос не должен попасть в кеш как частичный ответ
+                response = query_guard.interrupted_response() or response
+                return CachedResponse(versions, response.get_data(),
+                                      response.status_code, response.mimetype)
+
+            shared = False
+            if coalesce:
+                entry, shared = single_flight.do((key, versions), compute)
+            else:
+                entry = compute()
+            if entry.status_code == 200 and not shared:
+                _backend.put(key, entry)
+            return _from_entry(entry, etag, 'COALESCED' if shared else 'MISS')
+        return wrapper
+    return decorator
+
+
+# Отслеживание изменившихся таблиц в сессиях SQLAlchemy
+
+def _mark_changed(session, table_names):
+    session.info.setdefault('changed_tables', set()).update(table_names)
+
+
+@event.listens_for(Session, 'after_flush')
+def _after_flush(session, flush_context):
+    _mark_changed(session, {
+        obj.__table__.name for obj in (*session.new, *session.dirty, *session.deleted)
+    })
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            _mark_changed(orm_execute_state.session, {table.name})
+
+
+@event.listens_for(Session, 'before_commit')
+def _before_commit(session):
+    # Версии увеличиваются в той же транзакции, что и данные: другие процессы
+    # увидят новые версии одновременно с изменениями, а откат отменит и то и другое
+    session.flush()
+    changed = session.info.pop('changed_tables', None)
+    if changed:
+        table_versions.bump(session.connection(), changed)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _after_rollback(session, previous_transaction):
+    # Откат точки сохранения не отменяет изменений внешней транзакции (write_queue)
+    if previous_transaction.nested:
+        return
+    session.info.pop('changed_tables', None)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Материализованные агрегаты (rollup) по финансовым показателям и налогам.
+
+Зерно агрегата: (district, main_industry, size_final, year).
+Таблицы обновляются инкрементально при записи через CRUD API
+(а значит и при загрузке Excel, которая идет через API),
+полная пересборка: python rollups.py
+"""
+
+import os
+from sqlalchemy import func, select, insert, delete, exists, bindparam, Integer
+from data import db_session
+from data.FinancialIndicator import FinancialIndicator
+from data.Tax import Tax
+from data.adresses import Address
+from data.Industry import Industry
+from data.CompanySize import CompanySize
+from data.Rollup import FinancialRollup, TaxRollup
+
+# Колонки зерна агрегата
+ROLLUP_GRAIN = ('district', 'main_industry', 'size_final', 'year')
+
+# Какие таблицы агрегируются, куда и по каким показателям
+ROLLUPS = {
+    'financial-indicators': {
+        'source': FinancialIndicator,
+        'rollup': FinancialRollup,
+        'measures': ['revenue', 'net_profit', 'employee_count', 'employee_count_moscow',
+                     'payroll_all_employees', 'payroll_moscow_employees'],
+    },
+    'taxes': {
+        'source': Tax,
+        'rollup': TaxRollup,
+        'measures': ['moscow_taxes', 'profit_tax', 'property_tax', 'land_tax',
+                     'personal_income_tax', 'transport_tax', 'other_taxes', 'excise_taxes'],
+    },
+}
+
+# Таблицы, изменение которых меняет содержимое агрегатов
+ROLLUP_SOURCE_TABLES = {'financial_indicators', 'taxes', 'addresses', 'industries', 'company_sizes'}
+
+# При массовых изменениях дешевле пересобрать агрегаты целиком, чем пересчитывать по организациям
+BULK_REBUILD_THRESHOLD = 1000
+
+
+def _contributions(spec):
+    """Запрос вклада строк исходной таблицы в ячейки агрегата: зерно, records_count и суммы показателей.
+
+    Строится на таблицах Core: сессия выполняет его и запросы на его основе без ORM-обработки.
+    """
+    source, measures = spec['source'].__table__.c, spec['measures']
+    address, industry, company_size = Address.__table__.c, Industry.__table__.c, CompanySize.__table__.c
+
+    district = select(address.district).where(
+        address.organization_id == source.organization_id
+    ).order_by(address.id).limit(1).scalar_subquery()
+    main_industry = select(industry.main_industry).where(
+        industry.organization_id == source.organization_id
+    ).order_by(industry.id).limit(1).scalar_subquery()
+    size_final = select(company_size.size_final).where(
+        company_size.organization_id == source.organization_id,
+        company_size.year == source.year
+    ).order_by(company_size.id).limit(1).scalar_subquery()
+
+    dims = [district.label('district'), main_industry.label('main_industry'),
+            size_final.label('size_final'), source.year.label('year')]
+    aggregates = [func.count().label('records_count')] + [
+        func.coalesce(func.sum(source[m]), 0).label(m) for m in measures
+    ]
+    return select(*dims, *aggregates).group_by(*[d.name for d in dims])
+
+
+def _incremental_statements(spec):
+    """Запросы инкрементального обновления агрегата для набора организаций.
+
+    UPDATE ... FROM прибавляет вклад организаций (умноженный на :sign) к существующим ячейкам,
+    INSERT добавляет недостающие ячейки, DELETE убирает опустевшие. Ключи зерна могут быть NULL,
+    поэтому ячейки сопоставляются через IS, а не через уникальный индекс и ON CONFLICT.
+    """
+    source, table, measures = spec['source'].__table__, spec['rollup'].__table__, spec['measures']
+    delta = _contributions(spec).where(
+        source.c.organization_id.in_(bindparam('organization_ids', expanding=True))
+    ).subquery('delta')
+    same_cell = [table.c[name].is_not_distinct_from(delta.c[name]) for name in ROLLUP_GRAIN]
+    sign = bindparam('sign', type_=Integer)
+
+    update_cells = table.update().where(*same_cell).values(
+        records_count=table.c.records_count + sign * delta.c.records_count,
+        **{m: func.coalesce(table.c[m], 0) + sign * delta.c[m] for m in measures}
+    )
+    insert_missing = table.insert().from_select(
+        list(ROLLUP_GRAIN) + ['records_count'] + measures,
+        select(delta).where(~exists().where(*same_cell))
+    )
+    delete_empty = table.delete().where(table.c.records_count <= 0)
+    return update_cells, insert_missing, delete_empty
+
+
+# Запросы строятся один раз: при каждой записи меняются только параметры
+INCREMENTAL_STATEMENTS = [_incremental_statements(spec) for spec in ROLLUPS.values()]
+
+
+def _apply_organizations(session, organization_ids, sign):
+    """Прибавляет (sign=+1) или вычитает (sign=-1) вклад организаций во все агрегаты"""
+    if not organization_ids:
+        return
+    organization_ids = sorted(organization_ids)
+    for update_cells, insert_missing, delete_empty in INCREMENTAL_STATEMENTS:
+        session.execute(update_cells, {'organization_ids': organization_ids, 'sign': sign})
+        if sign > 0:
+            session.execute(insert_missing, {'organization_ids': organization_ids})
+        else:
+            session.execute(delete_empty)
+
+
+def retract_organizations(session, organization_ids):
+    """Вычитает вклад организаций из агрегатов (вызывается до изменения данных)"""
+    if len(organization_ids) > BULK_REBUILD_THRESHOLD:
+        return  # после изменения агрегаты будут пересобраны целиком
+    _apply_organizations(session, organization_ids, -1)
+
+
+def apply_organizations(session, organization_ids):
+    """Добавляет вклад организаций в агрегаты (вызывается после изменения данных)"""
+    if len(organization_ids) > BULK_REBUILD_THRESHOLD:
+        rebuild_rollups(session, commit=False)
+        return
+    _apply_organizations(session, organization_ids, +1)
+
+
+def rebuild_rollups(session, commit=True):
+    """Полная пересборка агрегатов из исходных таблиц"""
+    for spec in ROLLUPS.values():
+        rollup_model, measures = spec['rollup'], spec['measures']
+        session.execute(delete(rollup_model))
+        session.execute(insert(rollup_model).from_select(
+            list(ROLLUP_GRAIN) + ['records_count'] + measures, _contributions(spec)
+        ))
+    if commit:
+        session.commit()
+
+
+def ensure_rollups(session):
+    """Собирает агрегаты, если таблицы агрегатов пусты, а исходные данные есть"""
+    for spec in ROLLUPS.values():
+        if session.query(spec['rollup'].id).first() is None and \
+                session.query(spec['source'].id).first() is not None:
+            rebuild_rollups(session)
+            return True
+    return False
+
+
+if __name__ == "__main__":
+    db_path = os.path.join(os.path.dirname(__file__), "db/database_test.db")
+    db_session.global_init(db_path)
+    session = db_session.create_session()
+    try:
+        print("Пересборка агрегатов...")
+        rebuild_rollups(session)
+        for spec in ROLLUPS.values():
+            print(f"{spec['rollup'].__tablename__}: {session.query(spec['rollup']).count()} ячеек")
+    finally:
+        session.close()
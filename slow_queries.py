@@ -0,0 +1,184 @@
+"""
+Журнал медленных SQL-запросов.
+
+Запросы дольше SLOW_QUERY_THRESHOLD_MS миллисекунд (по умолчанию 500) записываются
+в SLOW_QUERY_LOG (по умолчанию logs/slow_queries.log, ротация по 10 МБ, 5 файлов)
+в виде JSON-строк: SQL, параметры, эндпоинт и аргументы фильтра, план EXPLAIN QUERY PLAN.
+summarize() группирует записи по нормализованной форме запроса для /api/admin/slow-queries.
+"""
+
+import glob
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from flask import request, has_request_context
+import metrics
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '500'))
+LOG_PATH = os.getenv('SLOW_QUERY_LOG', os.path.join(BASE_DIR, 'logs', 'slow_queries.log'))
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Длинные значения параметров обрезаются
+MAX_PARAM_LENGTH = 200
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _get_logger():
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+            handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES,
+                                          backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger('slow_queries')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+
+def normalize_sql(statement):
+    """Форма запроса без значений: литералы и списки IN заменяются на ?"""
+    shape = re.sub(r"'(?:[^']|'')*'", '?', statement)
+    shape = re.sub(r'\b\d+(?:\.\d+)?\b', '?', shape)
+    shape = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(?)', shape)
+    shape = re.sub(r'__\[POSTCOMPILE_\w+\]', '(?)', shape)
+    return re.sub(r'\s+', ' ', shape).strip()
+
+
+def _short(value):
+    text = repr(value)
+    return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + '...'
+
+
+def _params(parameters):
+    if isinstance(parameters, dict):
+        return {key: _short(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_short(value) for value in parameters]
+    return _short(parameters)
+
+
+def explain(dbapi_connection, statement, parameters):
+    """План запроса SQLite (список строк detail)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def _request_info():
+    if not has_request_context():
+        return {'endpoint': None, 'method': None, 'args': None, 'body': None}
+    return {
+        'endpoint': request.url_rule.rule if request.url_rule else request.path,
+        'method': request.method,
+        'args': request.args.to_dict(flat=False),
+        'body': request.get_json(silent=True) if request.is_json else None
+    }
+
+
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany, elapsed):
+    duration_ms = elapsed * 1000
+    if duration_ms < THRESHOLD_MS:
+        return
+
+    plan = None
+    if not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        try:
+            plan = explain(cursor.connection, statement, parameters)
+        except Exception as e:
+            plan = [f'EXPLAIN не выполнен: {e}']
+
+    record = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'duration_ms': round(duration_ms, 2),
+        'sql': statement,
+        'shape': normalize_sql(statement),
+        'params': None if executemany else _params(parameters),
+        'plan': plan,
+        **_request_info()
+    }
+    try:
+        _get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+    except Exception:
+        pass  # журнал не должен ломать запрос
+
+
+# Время запроса замеряет metrics
+metrics.add_query_listener(_log_slow_query)
+
+
+def read_records():
+    """Записи из текущего и ротированных файлов журнала"""
+    for path in sorted(glob.glob(LOG_PATH + '*')):
+        with open(path, encoding='utf-8') as log_file:
+            for line in log_file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def full_scans(plan):
+    """Таблицы, которые читаются полным сканированием (SCAN без индекса)"""
+    tables = set()
+    for detail in plan or []:
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if match and 'INDEX' not in detail:
+            tables.add(match.group(1))
+    return tables
+
+
+def used_indexes(plan):
+    """Индексы, которые использует план (включая INTEGER PRIMARY KEY)"""
+    indexes = set()
+    for detail in plan or []:
+        match = re.search(r'USING (?:COVERING )?INDEX (\w+)', detail)
+        if match:
+            indexes.add(match.group(1))
+        elif 'USING INTEGER PRIMARY KEY' in detail or 'USING ROWID' in detail:
+            indexes.add('INTEGER PRIMARY KEY')
+    return indexes
+
+
+def summarize(limit=50):
+    """Медленные запросы, сгруппированные по форме и отсортированные по суммарному времени"""
+    groups = {}
+    for record in read_records():
+        shape = record.get('shape') or normalize_sql(record.get('sql', ''))
+        group = groups.setdefault(shape, {
+            'shape': shape, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'endpoints': set(), 'full_scans': set(),
+            'last_seen': None, 'example': None
+        })
+        group['count'] += 1
+        group['total_ms'] += record.get('duration_ms', 0)
+        group['max_ms'] = max(group['max_ms'], record.get('duration_ms', 0))
+        if record.get('endpoint'):
+            group['endpoints'].add(f"{record.get('method')} {record['endpoint']}")
+        group['full_scans'].update(full_scans(record.get('plan')))
+        if group['last_seen'] is None or record.get('time', '') >= group['last_seen']:
+            group['last_seen'] = record.get('time')
+            group['example'] = {key: record.get(key) for key in ('sql', 'params', 'args', 'body', 'plan')}
+
+    result = sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)[:limit]
+    for group in result:
+        group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+        group['total_ms'] = round(group['total_ms'], 2)
+        group['endpoints'] = sorted(group['endpoints'])
+        group['full_scans'] = sorted(group['full_scans'])
+    return {'threshold_ms': THRESHOLD_MS, 'log_path': LOG_PATH, 'shapes': len(groups), 'queries': result}
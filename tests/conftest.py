@@ -0,0 +1,26 @@
+"""
+Общие фикстуры pytest: приложение на временной копии тестовой БД.
+
+db_session хранит одну фабрику сессий на процесс, поэтому приложение создается
+фабрикой main.create_app один раз за запуск тестов на копии db/database_test.db,
+а сама тестовая БД не изменяется.
+"""
+
+import os
+import shutil
+import pytest
+import main
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp('db') / 'database_test.db'
+    shutil.copy(os.path.join(BASE_DIR, 'db', 'database_test.db'), db_path)
+    return main.create_app(str(db_path))
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
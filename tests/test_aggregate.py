@@ -0,0 +1,74 @@
+"""
+Проверка /api/tables/<table>/aggregate: чтение из rollup-таблиц и из исходной таблицы
+должно давать одинаковый результат, неизвестные фильтры отклоняются.
+"""
+
+import pytest
+import rollups
+from data import db_session
+from data.Rollup import FinancialRollup
+
+AGGREGATE_URL = '/api/tables/financial-indicators/aggregate'
+
+
+def aggregate(client, query):
+    response = client.get(f'{AGGREGATE_URL}?{query}')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_rollup_and_table_paths_match(client):
+    rollup = aggregate(client, 'group_by=year')
+    # Фильтр по столбцу исходной таблицы, не отсекающий строк, переводит запрос на исходную таблицу
+    table = aggregate(client, 'group_by=year&organization_id_min=0')
+    assert rollup['source'] == 'rollup' and table['source'] == 'table'
+    assert len(rollup['groups']) == len(table['groups'])
+    for rollup_group, table_group in zip(rollup['groups'], table['groups']):
+        assert rollup_group.keys() == table_group.keys()
+        for key, value in rollup_group.items():
+            assert type(value) is type(table_group[key]), key
+            assert value == pytest.approx(table_group[key]), key
+    assert all(isinstance(group['employee_count'], int) for group in rollup['groups'])
+
+
+def test_grain_like_filter_is_applied(client):
+    everything = aggregate(client, 'group_by=district')
+    district = everything['groups'][0]['district']
+    filtered = aggregate(client, f'group_by=district&district_like={district}')
+    assert filtered['source'] == 'rollup'
+    assert {group['district'] for group in filtered['groups']} == {district}
+
+
+def test_unknown_filter_is_rejected(client):
+    for query in ['distrct=X', 'district_like=X&revenue_min=1', 'group_by=district&revenue_min=1']:
+        response = client.get(f'{AGGREGATE_URL}?{query}')
+        assert response.status_code == 400, query
+
+
+def test_incremental_rollups_match_rebuild(client):
+    organizations = client.get('/api/tables/organizations/data?per_page=3').get_json()['items']
+    first, second, third = [organization['id'] for organization in organizations]
+
+    response = client.post('/api/tables/financial-indicators/data',
+                           json={'organization_id': first, 'year': 2030, 'revenue': 5, 'employee_count': 3})
+    assert response.status_code == 201
+    item_id = response.get_json()['item']['id']
+    assert client.put(f'/api/tables/financial-indicators/data/{item_id}',
+                      json={'organization_id': second, 'revenue': 7}).status_code == 200
+    assert client.post('/api/tables/addresses/data',
+                       json={'organization_id': second, 'district': 'X'}).status_code == 201
+    assert client.delete(f'/api/tables/organizations/data/{third}').status_code == 200
+
+    session = db_session.create_session()
+    try:
+        def cells():
+            return sorted(
+                (cell.district or '', cell.main_industry or '', cell.size_final or '', cell.year,
+                 cell.records_count, round(cell.revenue, 2), round(cell.employee_count, 2))
+                for cell in session.query(FinancialRollup)
+            )
+        incremental = cells()
+        rollups.rebuild_rollups(session)
+        assert incremental == cells()
+    finally:
+        session.close()
@@ -0,0 +1,76 @@
+"""
+Проверка POST /api/batch: ссылки "$имя" на созданные в пакете записи, откат всего пакета
+при ошибке операции и failed_index - в отдельной сессии и через поток-писатель (WRITE_QUEUE=1).
+"""
+
+import pytest
+import write_queue
+from data import db_session
+from data.organization import Organization
+
+BATCH_URL = '/api/batch'
+
+
+@pytest.fixture(params=['session', 'write_queue'])
+def batch_client(request, client, monkeypatch):
+    if request.param == 'write_queue':
+        # Пакет выполняется в одной точке сохранения группового commit писателя
+        monkeypatch.setattr(write_queue, '_writer', write_queue.WriteQueue(timeout=5))
+    return client
+
+
+def organizations_by_inn(inn):
+    session = db_session.create_session()
+    try:
+        return session.query(Organization).filter(Organization.inn == inn).count()
+    finally:
+        session.close()
+
+
+def organization_count():
+    session = db_session.create_session()
+    try:
+        return session.query(Organization).count()
+    finally:
+        session.close()
+
+
+def test_references_resolve_to_created_ids(batch_client):
+    inn = '9900000201' if write_queue._writer is None else '9900000202'
+    response = batch_client.post(BATCH_URL, json={'operations': [
+        {'op': 'create', 'table': 'organizations', 'ref': 'org', 'data': {'inn': inn, 'name': 'Пакетная'}},
+        {'op': 'create', 'table': 'taxes', 'ref': 'tax', 'data': {'organization_id': '$org', 'year': 2033}},
+        {'op': 'update', 'table': 'taxes', 'id': '$tax', 'data': {'profit_tax': 7}},
+    ]})
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    organization_id, tax_id = body['references']['org'], body['references']['tax']
+    assert body['results'][0]['item']['id'] == organization_id
+    assert body['results'][1]['item']['organization_id'] == organization_id
+    assert (body['results'][2]['item']['id'], body['results'][2]['item']['profit_tax']) == (tax_id, 7)
+    assert [result['status'] for result in body['results']] == [201, 201, 200]
+
+    tax = batch_client.get(f'/api/tables/taxes/data/{tax_id}').get_json()['item']
+    assert (tax['organization_id'], tax['profit_tax']) == (organization_id, 7)
+
+
+def test_failed_operation_rolls_back_whole_batch(batch_client):
+    before = organization_count()
+    response = batch_client.post(BATCH_URL, json={'operations': [
+        {'op': 'create', 'table': 'organizations', 'ref': 'org', 'data': {'inn': '9900000299', 'name': 'Откат'}},
+        {'op': 'create', 'table': 'taxes', 'data': {'organization_id': '$org', 'year': 2033}},
+        {'op': 'update', 'table': 'organizations', 'id': 999999999, 'data': {'name': 'Нет такой'}},
+        {'op': 'create', 'table': 'organizations', 'data': {'inn': '9900000298'}},
+    ]})
+    assert response.status_code == 404
+    assert response.get_json()['failed_index'] == 2
+    assert organization_count() == before
+    assert organizations_by_inn('9900000299') == 0
+
+    response = batch_client.post(BATCH_URL, json={'operations': [
+        {'op': 'create', 'table': 'organizations', 'data': {'inn': '9900000299', 'name': 'Откат'}},
+        {'op': 'create', 'table': 'taxes', 'data': {'organization_id': '$missing', 'year': 2033}},
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['failed_index'] == 1
+    assert organization_count() == before
@@ -0,0 +1,50 @@
+"""
+Проверка POST /api/tables/<table>/batch-get: поиск по списку id и ИНН, лимит ключей, разбор тела.
+"""
+
+import api_crud_filters
+
+BATCH_GET_URL = '/api/tables/{}/batch-get'
+
+
+def test_ids_found_and_missing(client):
+    items = client.get('/api/tables/taxes/data?per_page=2').get_json()['items']
+    first, second = items[0]['id'], items[1]['id']
+
+    response = client.post(BATCH_GET_URL.format('taxes'), json={'ids': [second, '999999', first, second]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert set(body['items']) == {str(first), str(second)}
+    assert body['items'][str(first)]['id'] == first
+    assert body['missing'] == [999999]
+    assert (body['requested'], body['found']) == (3, 2)
+
+
+def test_inns_only_for_organizations(client):
+    organization = client.get('/api/tables/organizations/data?per_page=1').get_json()['items'][0]
+    response = client.post(BATCH_GET_URL.format('organizations'),
+                           json={'inns': [f" {organization['inn']} ", '0000000000']})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['key'] == 'inn'
+    assert body['items'][organization['inn']]['inn'] == organization['inn']
+    assert body['missing'] == ['0000000000']
+
+    response = client.post(BATCH_GET_URL.format('taxes'), json={'inns': [organization['inn']]})
+    assert response.status_code == 400
+
+
+def test_key_limit(client, monkeypatch):
+    monkeypatch.setattr(api_crud_filters, 'BATCH_GET_MAX_KEYS', 3)
+    assert client.post(BATCH_GET_URL.format('taxes'), json={'ids': [1, 2, 3]}).status_code == 200
+    response = client.post(BATCH_GET_URL.format('taxes'), json={'ids': [1, 2, 3, 4]})
+    assert response.status_code == 400
+    assert '3' in response.get_json()['error']
+    response = client.post(BATCH_GET_URL.format('organizations'), json={'inns': ['1', '2', '3', '4']})
+    assert response.status_code == 400
+
+
+def test_malformed_body_is_rejected(client):
+    for body in [{'ids': '12'}, {'inns': '7701'}, {'ids': ['x']}, {'ids': [None]}, {}, [1, 2]]:
+        response = client.post(BATCH_GET_URL.format('organizations'), json=body)
+        assert response.status_code == 400, body
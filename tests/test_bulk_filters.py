@@ -0,0 +1,60 @@
+"""
+Проверка фильтров массовых операций PATCH/DELETE /api/tables/<table>/data:
+неизвестные ключи и фильтры без условий не должны приводить к изменению всей таблицы.
+"""
+
+DATA_URL = '/api/tables/{}/data'
+
+
+def total(client, table_name):
+    return client.get(DATA_URL.format(table_name) + '?per_page=1').get_json()['total']
+
+
+def test_id_max_is_rejected(client):
+    organizations = total(client, 'organizations')
+    response = client.delete(DATA_URL.format('organizations') + '?id_max=20')
+    assert response.status_code == 400
+    assert 'id_max' in response.get_json()['error']
+    assert total(client, 'organizations') == organizations
+
+
+def test_typo_in_filter_is_rejected(client):
+    response = client.patch(DATA_URL.format('taxes') + '?yaer=2021&dry_run=true', json={'other_taxes': 0})
+    assert response.status_code == 400
+    assert 'yaer' in response.get_json()['error']
+
+    response = client.delete(DATA_URL.format('organizations') + '?final_stat=X&dry_run=true')
+    assert response.status_code == 400
+
+    response = client.delete(DATA_URL.format('organizations') + '?taxes.yaer=2021&dry_run=true')
+    assert response.status_code == 400
+
+
+def test_known_filters_are_applied(client):
+    response = client.delete(DATA_URL.format('taxes') + '?year=2021&dry_run=true')
+    assert response.status_code == 200
+    assert response.get_json()['affected'] < total(client, 'taxes')
+
+    response = client.delete(DATA_URL.format('organizations') + '?taxes.year_min=2100&dry_run=true')
+    assert response.status_code == 200
+    assert response.get_json()['affected'] == 0
+
+
+def test_filters_without_conditions_require_all(client):
+    # Пустые значения не дают ни одного условия
+    taxes = total(client, 'taxes')
+    response = client.delete(DATA_URL.format('taxes') + '?year=')
+    assert response.status_code == 400
+    response = client.patch(DATA_URL.format('taxes'), json={'other_taxes': 0})
+    assert response.status_code == 400
+    assert total(client, 'taxes') == taxes
+
+    response = client.delete(DATA_URL.format('taxes') + '?year=&all=true&dry_run=true')
+    assert response.status_code == 200
+    assert response.get_json()['affected'] == taxes
+
+
+def test_search_without_text_columns_is_rejected(client):
+    # У taxes нет текстовых столбцов: search не дал бы ни одного условия
+    response = client.delete(DATA_URL.format('taxes') + '?search=x&dry_run=true')
+    assert response.status_code == 400
@@ -0,0 +1,63 @@
+"""
+Проверка журнала изменений после замены всех данных (generate_random_data.py).
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import change_log
+from data import db_session
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_reset_requires_resync(client):
+    organization_id = client.get('/api/tables/organizations/data?per_page=1').get_json()['items'][0]['id']
+    assert client.post('/api/tables/taxes/data', json={'organization_id': organization_id, 'year': 2050}).status_code == 201
+    synced = client.get('/api/changes?since=0').get_json()['current_version']
+
+    session = db_session.create_session()
+    try:
+        change_log.reset_change_log(session)
+        session.commit()
+    finally:
+        session.close()
+
+    for query in [f'since={synced}', f'since={synced}&tables=taxes', 'since=0']:
+        body = client.get(f'/api/changes?{query}').get_json()
+        assert body['resync_required'], query
+        assert body['changes'] == [], query
+
+    reset_version = client.get(f'/api/changes?since={synced}').get_json()['current_version']
+    assert reset_version > synced
+    assert client.post('/api/tables/taxes/data', json={'organization_id': organization_id, 'year': 2051}).status_code == 201
+    body = client.get(f'/api/changes?since={reset_version}').get_json()
+    assert not body['resync_required']
+    assert [change['table'] for change in body['changes']] == ['taxes']
+
+
+def generate(db_path):
+    subprocess.run([sys.executable, 'generate_random_data.py', '--bulk', '--organizations', '20',
+                    '--db', str(db_path)], cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL)
+
+
+def test_generation_clears_derived_tables_and_change_log(tmp_path):
+    db_path = tmp_path / 'generated.db'
+    generate(db_path)
+    connection = sqlite3.connect(db_path)
+    connection.execute("INSERT INTO change_log (table_name, row_id, operation, changed_at) "
+                       "VALUES ('taxes', 1, 'update', '2026-01-01 00:00:00')")
+    connection.commit()
+    connection.close()
+
+    generate(db_path)
+
+    connection = sqlite3.connect(db_path)
+    try:
+        assert connection.execute('SELECT operation FROM change_log').fetchall() == [(change_log.RESET_OPERATION,)]
+        assert connection.execute('SELECT count(*) FROM organization_summary').fetchone()[0] == 20
+        records = connection.execute('SELECT count(*) FROM financial_indicators').fetchone()[0]
+        assert connection.execute('SELECT sum(records_count) FROM financial_rollups').fetchone()[0] == records
+    finally:
+        connection.close()
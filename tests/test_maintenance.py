@@ -0,0 +1,112 @@
+"""
+Проверка каскадного удаления организаций и очистки «осиротевших» записей (maintenance.py):
+дочерние строки всех таблиц удаляются, агрегаты и сводная таблица остаются согласованными.
+"""
+
+import maintenance
+import organization_summary
+import rollups
+from data import db_session
+from data.organization import Organization
+from data.OrganizationSummary import OrganizationSummary
+from data.Tax import Tax
+from data.adresses import Address
+from query_engine import MODELS
+
+# Поля дочерних строк, от которых зависят агрегаты и сводная таблица
+CHILD_VALUES = {
+    'addresses': {'district': 'Каскадный'},
+    'industries': {'main_industry': 'Каскадная'},
+    'company-sizes': {'year': 2031, 'size_final': 'Малое'},
+    'financial-indicators': {'year': 2031, 'revenue': 10, 'employee_count': 2},
+    'taxes': {'year': 2031, 'profit_tax': 3},
+    'investment-export': {'year': 2031},
+    'production': {'year': 2031},
+}
+
+
+def create_organization_with_children(client, inn):
+    response = client.post('/api/tables/organizations/data', json={'inn': inn, 'name': 'Каскадная'})
+    assert response.status_code == 201
+    organization_id = response.get_json()['item']['id']
+    for table_name, model_class in MODELS.items():
+        if model_class in maintenance.CHILD_MODELS:
+            data = {'organization_id': organization_id, **CHILD_VALUES.get(table_name, {})}
+            assert client.post(f'/api/tables/{table_name}/data', json=data).status_code == 201, table_name
+    return organization_id
+
+
+def child_counts(session, organization_id):
+    return {model_class.__tablename__: session.query(model_class).filter(
+        model_class.organization_id == organization_id).count() for model_class in maintenance.CHILD_MODELS}
+
+
+def derived_state(session):
+    """Содержимое rollup-таблиц и сводной таблицы без id (суммы округлены: порядок сложения разный)"""
+    session.expire_all()
+    state = {}
+    for model_class in [spec['rollup'] for spec in rollups.ROLLUPS.values()] + [OrganizationSummary]:
+        columns = [c.name for c in model_class.__table__.columns if c.name != 'id']
+        state[model_class.__tablename__] = sorted((
+            tuple(round(value, 2) if isinstance(value, float) else value
+                  for value in (getattr(row, name) for name in columns))
+            for row in session.query(model_class)
+        ), key=repr)
+    return state
+
+
+def assert_derived_tables_consistent(session):
+    incremental = derived_state(session)
+    rollups.rebuild_rollups(session)
+    organization_summary.rebuild_summary(session)
+    assert incremental == derived_state(session)
+
+
+def test_organization_delete_removes_all_child_tables(client):
+    assert len(maintenance.CHILD_MODELS) == 11
+    single = create_organization_with_children(client, '9900000101')
+    bulk = create_organization_with_children(client, '9900000102')
+
+    session = db_session.create_session()
+    try:
+        for organization_id in (single, bulk):
+            assert set(child_counts(session, organization_id).values()) == {1}
+        assert session.query(OrganizationSummary).filter(OrganizationSummary.organization_id == bulk).count() == 1
+
+        response = client.delete(f'/api/tables/organizations/data/{single}')
+        assert response.status_code == 200
+        assert response.get_json()['deleted_related'] == {
+            model_class.__tablename__: 1 for model_class in maintenance.CHILD_MODELS
+        }
+        response = client.delete('/api/tables/organizations/data?inn=9900000102')
+        assert response.status_code == 200
+        assert response.get_json()['affected'] == 1
+
+        session.expire_all()
+        for organization_id in (single, bulk):
+            assert set(child_counts(session, organization_id).values()) == {0}
+            assert session.get(Organization, organization_id) is None
+            assert session.query(OrganizationSummary).filter(
+                OrganizationSummary.organization_id == organization_id).count() == 0
+        assert_derived_tables_consistent(session)
+    finally:
+        session.close()
+
+
+def test_purge_orphans(app):
+    session = db_session.create_session()
+    try:
+        missing_id = (session.query(Organization.id).order_by(Organization.id.desc()).limit(1).scalar() or 0) + 1000
+        session.add_all([Tax(organization_id=missing_id, year=2032, profit_tax=5),
+                         Address(organization_id=missing_id, district='Сиротский')])
+        session.commit()
+        rollups.rebuild_rollups(session)
+
+        orphans = maintenance.find_orphans(session)
+        assert orphans['taxes'] >= 1 and orphans['addresses'] >= 1
+        deleted = maintenance.purge_orphans(session)
+        assert deleted == orphans
+        assert set(maintenance.find_orphans(session).values()) == {0}
+        assert_derived_tables_consistent(session)
+    finally:
+        session.close()
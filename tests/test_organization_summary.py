@@ -0,0 +1,45 @@
+"""
+Проверка инкрементального пересчета organization_summary при записи через CRUD API.
+"""
+
+import organization_summary
+from data import db_session
+from data.OrganizationSummary import OrganizationSummary
+
+
+def summary_rows(session):
+    columns = [c.name for c in OrganizationSummary.__table__.columns if c.name != 'id']
+    session.expire_all()
+    return sorted(tuple(getattr(row, name) for name in columns) for row in session.query(OrganizationSummary))
+
+
+def test_incremental_summary_matches_rebuild(client):
+    response = client.post('/api/tables/organizations/data', json={'inn': '9900000001', 'name': 'Сводная'})
+    assert response.status_code == 201
+    organization_id = response.get_json()['item']['id']
+    assert client.post('/api/tables/financial-indicators/data',
+                       json={'organization_id': organization_id, 'year': 2030, 'revenue': 5}).status_code == 201
+    assert client.post('/api/tables/addresses/data',
+                       json={'organization_id': organization_id, 'district': 'X'}).status_code == 201
+
+    session = db_session.create_session()
+    try:
+        incremental = summary_rows(session)
+        organization_summary.rebuild_summary(session)
+        assert incremental == summary_rows(session)
+    finally:
+        session.close()
+
+    items = client.get(f'/api/tables/organization-summary/data?organization_id={organization_id}').get_json()['items']
+    assert (items[0]['district'], items[0]['revenue']) == ('X', 5.0)
+
+
+def test_write_outside_summary_sources_skips_refresh(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(organization_summary, 'refresh_organizations', lambda *args: calls.append(args))
+    organization_id = client.get('/api/tables/organizations/data?per_page=1').get_json()['items'][0]['id']
+    assert client.post('/api/tables/contacts/data', json={'organization_id': organization_id}).status_code == 201
+    assert calls == []
+    assert client.post('/api/tables/taxes/data',
+                       json={'organization_id': organization_id, 'year': 2040}).status_code == 201
+    assert len(calls) == 1
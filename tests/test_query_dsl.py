@@ -0,0 +1,98 @@
+"""
+Проверка POST /api/tables/<table>/query: JSON-фильтр дает тот же результат, что и прямой запрос,
+ошибки в дереве - 400, разные по структуре запросы не делят скомпилированный план.
+"""
+
+import query_dsl
+from data import db_session
+from data.FinancialIndicator import FinancialIndicator
+
+QUERY_URL = '/api/tables/financial-indicators/query'
+
+
+def query_ids(client, body):
+    response = client.post(QUERY_URL, json={**body, 'per_page': 1000})
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    return {item['id'] for item in data['items']}, data['plan_cached']
+
+
+def expected_ids(*conditions):
+    session = db_session.create_session()
+    try:
+        return {row_id for row_id, in session.query(FinancialIndicator.id).filter(*conditions)}
+    finally:
+        session.close()
+
+
+def test_filter_tree_matches_direct_query(client):
+    body = {'filter': {'op': 'and', 'args': [
+        {'op': 'in', 'field': 'year', 'values': [2021, '2023']},
+        {'op': 'not', 'arg': {'op': 'between', 'field': 'revenue', 'min': 0, 'max': 1100000}},
+        {'op': 'is_null', 'field': 'net_profit', 'value': False}
+    ]}}
+    ids, _ = query_ids(client, body)
+    expected = expected_ids(FinancialIndicator.year.in_([2021, 2023]),
+                            ~FinancialIndicator.revenue.between(0, 1100000),
+                            FinancialIndicator.net_profit.isnot(None))
+    assert expected and ids == expected
+
+
+def test_same_structure_reuses_plan_with_new_values(client):
+    def body(year, revenue):
+        # Порядок аргументов and не влияет на план: значения p0..pN следуют нормализованной структуре
+        return {'filter': {'op': 'and', 'args': [
+            {'op': 'between', 'field': 'revenue', 'min': revenue, 'max': 10 ** 9},
+            {'op': 'eq', 'field': 'year', 'value': year}
+        ]}}
+
+    first, _ = query_ids(client, body(2019, 0))
+    reordered = {'filter': {'op': 'and', 'args': list(reversed(body(2020, 1200000)['filter']['args']))}}
+    second, cached = query_ids(client, reordered)
+    assert cached
+    assert first == expected_ids(FinancialIndicator.year == 2019)
+    assert second == expected_ids(FinancialIndicator.year == 2020, FinancialIndicator.revenue >= 1200000)
+
+
+def test_different_structures_do_not_share_plan(client):
+    leaves = [{'op': 'eq', 'field': 'year', 'value': 2022},
+              {'op': 'eq', 'field': 'employee_count', 'value': 2022}]
+    bodies = [
+        {'filter': leaves[0]},
+        {'filter': leaves[1]},
+        {'filter': {'op': 'not', 'arg': leaves[0]}},
+        {'filter': {'op': 'or', 'args': leaves}},
+        {'filter': {'op': 'and', 'args': leaves}},
+        {'filter': leaves[0], 'sort': [{'field': 'revenue', 'order': 'desc'}]},
+        {'filter': {'op': 'is_null', 'field': 'year', 'value': True}},
+        {'filter': {'op': 'is_null', 'field': 'year', 'value': False}},
+    ]
+    for body in bodies:
+        assert not query_ids(client, body)[1], body
+
+    # Тот же фильтр для другой таблицы компилируется для ее модели
+    response = client.post('/api/tables/taxes/query', json={'filter': leaves[0]})
+    assert response.status_code == 200 and not response.get_json()['plan_cached']
+
+    or_ids, _ = query_ids(client, bodies[3])
+    and_ids, _ = query_ids(client, bodies[4])
+    assert or_ids == expected_ids(FinancialIndicator.year == 2022) | expected_ids(FinancialIndicator.employee_count == 2022)
+    assert and_ids == expected_ids(FinancialIndicator.year == 2022, FinancialIndicator.employee_count == 2022)
+
+
+def test_invalid_query_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(query_dsl, 'MAX_IN_VALUES', 3)
+    invalid = [
+        {'filter': {'op': 'gt', 'field': 'year', 'value': 2020}},
+        {'filter': {'op': 'eq', 'field': 'yaer', 'value': 2020}},
+        {'filter': {'op': 'like', 'field': 'year', 'value': '20'}},
+        {'filter': {'op': 'eq', 'field': 'year', 'value': 'двадцать'}},
+        {'filter': {'op': 'and', 'args': []}},
+        {'filter': {'op': 'in', 'field': 'year', 'values': [2019, 2020, 2021, 2022]}},
+        {'filter': {'op': 'eq', 'field': 'year', 'value': 2020}, 'sort': [{'field': 'year', 'order': 'up'}]},
+        ['year', 2020],
+    ]
+    for body in invalid:
+        response = client.post(QUERY_URL, json=body)
+        assert response.status_code == 400, body
+        assert 'error' in response.get_json()
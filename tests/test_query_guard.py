@@ -0,0 +1,67 @@
+"""
+Проверка ограничения стоимости запросов (query_guard.py): превышение бюджета дает 422 или 503,
+а прерванный ответ не попадает в кеш ответов.
+"""
+
+import pytest
+from flask import Flask, jsonify
+from sqlalchemy import text
+import query_guard
+import response_cache
+from data import db_session
+
+DATA_URL = '/api/tables/taxes/data?search=1&per_page=100'
+# Агрегат по исходной таблице: фильтр по сумме не укладывается в зерно rollup-таблицы
+AGGREGATE_URL = '/api/tables/financial-indicators/aggregate?group_by=year&revenue_min=1'
+# Запрос на сотни тысяч шагов VM независимо от объема тестовой БД
+HEAVY_QUERY = text('WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 100000) '
+                   'SELECT count(*) FROM n')
+
+
+# Progress handler вызывается каждые VM_STEP_GRANULARITY шагов, поэтому бюджет срабатывает на первом вызове
+@pytest.mark.parametrize('budget, status_code, reason', [
+    (query_guard.Budget(max_vm_steps=0, timeout_ms=60000), 422, 'vm_steps'),
+    (query_guard.Budget(max_vm_steps=10 ** 12, timeout_ms=0), 503, 'timeout'),
+])
+@pytest.mark.parametrize('url', [DATA_URL, AGGREGATE_URL])
+def test_interrupted_response_is_not_cached(client, monkeypatch, budget, status_code, reason, url):
+    response_cache.get_backend().clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(query_guard, 'DEFAULT_BUDGET', budget)
+        response = client.get(url)
+    assert response.status_code == status_code
+    body = response.get_json()
+    assert body['reason'] == reason and body['budget'] == budget.to_dict()
+    assert body['suggestions']
+    assert ('Retry-After' in response.headers) == (status_code == 503)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    assert client.get(url).headers['X-Cache'] == 'HIT'
+
+
+def test_partial_result_of_interrupted_query_is_not_cached(app, monkeypatch):
+    # Эндпоинт, который, как /stats, перехватывает ошибку запроса и отдает частичный результат с кодом 200
+    partial_app = Flask('partial_result')
+    query_guard.register_query_guard(partial_app)
+
+    @partial_app.route('/partial')
+    @response_cache.cached_response(lambda: ['taxes'])
+    def partial():
+        session = db_session.create_session()
+        try:
+            return jsonify({'count': session.execute(HEAVY_QUERY).scalar()})
+        except Exception:
+            return jsonify({'count': None})
+        finally:
+            session.close()
+
+    client = partial_app.test_client()
+    with monkeypatch.context() as patch:
+        patch.setattr(query_guard, 'DEFAULT_BUDGET', query_guard.Budget(max_vm_steps=10000, timeout_ms=60000))
+        assert client.get('/partial').status_code == 422
+
+    response = client.get('/partial')
+    assert (response.status_code, response.headers['X-Cache']) == (200, 'MISS')
+    assert response.get_json() == {'count': 100000}
@@ -0,0 +1,56 @@
+"""
+Проверка фильтров организаций по дочерним таблицам (financial_indicators.year=2023 и т.п.):
+GET /data и массовое удаление выбирают одни и те же организации, неизвестный ключ - 400.
+"""
+
+from data import db_session
+from data.organization import Organization
+from data.FinancialIndicator import FinancialIndicator
+
+DATA_URL = '/api/tables/organizations/data'
+
+
+def organizations_with_year(year):
+    # В тестовой БД есть показатели без организации, они в выборку не попадают
+    session = db_session.create_session()
+    try:
+        return {organization_id for organization_id, in session.query(Organization.id).join(
+            FinancialIndicator, FinancialIndicator.organization_id == Organization.id
+        ).filter(FinancialIndicator.year == year).distinct()}
+    finally:
+        session.close()
+
+
+def test_related_filter_matches_child_rows(client):
+    expected = organizations_with_year(2023)
+    assert expected
+
+    body = client.get(f'{DATA_URL}?financial_indicators.year=2023&per_page=1000').get_json()
+    assert {item['id'] for item in body['items']} == expected
+    assert body['total'] == len(expected)
+
+    # Ключ MODELS и имя таблицы в БД равнозначны, условия одной таблицы объединяются в один EXISTS
+    body = client.get(f'{DATA_URL}?financial-indicators.year_min=2023&financial-indicators.year_max=2023'
+                      f'&per_page=1000').get_json()
+    assert {item['id'] for item in body['items']} == expected
+
+    response = client.delete(f'{DATA_URL}?financial_indicators.year=2023&dry_run=true')
+    assert response.status_code == 200
+    assert response.get_json()['affected'] == len(expected)
+
+
+def test_related_filter_without_matches(client):
+    body = client.get(f'{DATA_URL}?financial_indicators.year=1800').get_json()
+    assert body['total'] == 0 and body['items'] == []
+
+    response = client.delete(f'{DATA_URL}?financial_indicators.year=1800&dry_run=true')
+    assert response.status_code == 200
+    assert response.get_json()['affected'] == 0
+
+
+def test_unknown_related_filter_is_rejected(client):
+    for query in ['financial_indicators.yaer=2023', 'financial_indicators.search=x', 'no_such_table.year=2023']:
+        response = client.get(f'{DATA_URL}?{query}')
+        assert response.status_code == 400, query
+        response = client.delete(f'{DATA_URL}?{query}&dry_run=true')
+        assert response.status_code == 400, query
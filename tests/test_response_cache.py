@@ -0,0 +1,163 @@
+"""
+Проверка кеша ответов (response_cache.py): версии таблиц хранятся в БД,
+поэтому запись из другого процесса делает закешированный ответ устаревшим,
+а ETag совпадает во всех процессах и меняется после записи. Объединение одинаковых
+одновременных запросов (SingleFlight): ведомый получает результат ведущего или по таймауту
+вычисляет его сам.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import response_cache
+from data import db_session
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_URL = '/api/tables/organizations/data?per_page=5'
+
+# Переименование первой организации в отдельном процессе со своим подключением к БД
+RENAME_SCRIPT = '''
+import sys
+from data import db_session
+db_session.global_init(sys.argv[1])
+import response_cache
+from data.organization import Organization
+session = db_session.create_session()
+organization = session.query(Organization).order_by(Organization.id).first()
+organization.name = sys.argv[2]
+session.commit()
+'''
+
+# ETag того же запроса, выданный приложением в отдельном процессе (другой воркер)
+ETAG_SCRIPT = '''
+import sys
+from main import create_app
+print(create_app(sys.argv[1]).test_client().get(sys.argv[2]).headers['ETag'])
+'''
+
+
+def run_in_other_process(script, *args):
+    return subprocess.run([sys.executable, '-c', script, db_session.get_engine().url.database, *args],
+                          cwd=BASE_DIR, check=True, capture_output=True, text=True).stdout.splitlines()
+
+
+def rename_in_other_process(name):
+    run_in_other_process(RENAME_SCRIPT, name)
+
+
+def test_write_in_other_process_invalidates_cache(client):
+    client.get(DATA_URL)
+    response = client.get(DATA_URL)
+    assert response.headers['X-Cache'] == 'HIT'
+
+    rename_in_other_process('Переименована в другом процессе')
+    response = client.get(DATA_URL)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['items'][0]['name'] == 'Переименована в другом процессе'
+
+
+def test_matching_etag_gets_not_modified(client):
+    response = client.get(DATA_URL)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    response = client.get(DATA_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['X-Cache'] == 'NOT-MODIFIED'
+    assert response.headers['ETag'] == etag and response.get_data() == b''
+
+    # Другие параметры запроса - другой ETag
+    response = client.get(DATA_URL + '&page=2', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+
+
+def test_write_changes_etag(client):
+    etag = client.get(DATA_URL).headers['ETag']
+    organization_id = client.get(DATA_URL).get_json()['items'][0]['id']
+    response = client.put(f'/api/tables/organizations/data/{organization_id}', json={'name': 'Новое имя'})
+    assert response.status_code == 200
+
+    response = client.get(DATA_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['items'][0]['name'] == 'Новое имя'
+    assert client.get(DATA_URL, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_gzip_representation_has_own_etag(client):
+    url = '/api/tables/organizations/data?per_page=20'
+    plain = client.get(url)
+    compressed = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == compressed.headers['ETag']
+
+
+def test_etag_is_shared_between_processes(client):
+    etag = client.get(DATA_URL).headers['ETag']
+    assert run_in_other_process(ETAG_SCRIPT, DATA_URL)[-1] == etag
+
+
+class WatchedEvent(threading.Event):
+    """Event, сообщающий о начале ожидания: ведомый запрос гарантированно ждет ведущего"""
+
+    def __init__(self):
+        super().__init__()
+        self.waiting = threading.Event()
+
+    def wait(self, timeout=None):
+        self.waiting.set()
+        return super().wait(timeout)
+
+
+def start_leader(flight, key, release):
+    started = threading.Event()
+    results = []
+
+    def compute():
+        started.set()
+        release.wait(5)
+        return 'ведущий'
+
+    thread = threading.Thread(target=lambda: results.append(flight.do(key, compute)))
+    thread.start()
+    assert started.wait(5)
+    return thread, results
+
+
+def test_single_flight_shares_leader_result():
+    flight = response_cache.SingleFlight(timeout=5)
+    release = threading.Event()
+    leader, leader_results = start_leader(flight, 'key', release)
+    done = flight._flights['key'].done = WatchedEvent()
+
+    follower_results = []
+    follower = threading.Thread(target=lambda: follower_results.append(flight.do('key', lambda: 'ведомый')))
+    follower.start()
+    assert done.waiting.wait(5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert leader_results == [('ведущий', False)]
+    assert follower_results == [('ведущий', True)]
+    assert flight.info() == {'in_flight': 0, 'timeout': 5, 'leaders': 1, 'shared': 1, 'timeouts': 0}
+
+
+def test_single_flight_follower_computes_after_timeout():
+    flight = response_cache.SingleFlight(timeout=0.05)
+    release = threading.Event()
+    leader, leader_results = start_leader(flight, 'key', release)
+    try:
+        assert flight.do('key', lambda: 'ведомый') == ('ведомый', False)
+    finally:
+        release.set()
+        leader.join(5)
+
+    assert leader_results == [('ведущий', False)]
+    assert flight.info() == {'in_flight': 0, 'timeout': 0.05, 'leaders': 1, 'shared': 0, 'timeouts': 1}
@@ -0,0 +1,87 @@
+"""
+Проверка потока-писателя write_queue: сбой группы не останавливает писатель,
+ожидание результата ограничено таймаутом, а запрос API, не дождавшийся записи, получает 503.
+"""
+
+import threading
+import pytest
+import write_queue
+from data import db_session
+
+
+def count_rows(session):
+    return session.connection().exec_driver_sql('SELECT count(*) FROM organizations').scalar()
+
+
+def test_session_failure_keeps_writer_alive(app, monkeypatch):
+    writer = write_queue.WriteQueue(timeout=5)
+    create_session = db_session.create_session
+    failures = [RuntimeError('нет соединения с БД')]
+
+    def failing_create_session():
+        if failures:
+            raise failures.pop()
+        return create_session()
+
+    monkeypatch.setattr(db_session, 'create_session', failing_create_session)
+    with pytest.raises(RuntimeError, match='нет соединения'):
+        writer.submit(count_rows)
+
+    assert writer.submit(count_rows) > 0
+    assert writer.info()['failed_batches'] == 1
+
+
+def test_submit_times_out_and_cancels_pending_operation(app):
+    writer = write_queue.WriteQueue(max_wait_ms=0, timeout=0.2)
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def blocking(session):
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    blocker = threading.Thread(target=lambda: ran.append(writer.submit(blocking, timeout=5)))
+    blocker.start()
+    assert started.wait(5)
+    try:
+        with pytest.raises(write_queue.WriteQueueTimeout, match='отменена'):
+            writer.submit(lambda session: ran.append('pending'))
+    finally:
+        release.set()
+        blocker.join(5)
+
+    assert ran == ['done']
+    assert writer.submit(count_rows) > 0
+    assert writer.info()['timeouts'] == 1
+
+
+def test_api_write_timeout_returns_503(client, monkeypatch):
+    writer = write_queue.WriteQueue(max_wait_ms=0, timeout=0.2)
+    monkeypatch.setattr(write_queue, '_writer', writer)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking(session):
+        started.set()
+        release.wait(5)
+
+    blocker = threading.Thread(target=writer.submit, args=(blocking,), kwargs={'timeout': 5})
+    blocker.start()
+    assert started.wait(5)
+    try:
+        response = client.post('/api/tables/organizations/data', json={'inn': '9900000501', 'name': 'Очередь'})
+    finally:
+        release.set()
+        blocker.join(5)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    body = response.get_json()
+    assert (body['reason'], body['cancelled']) == ('write_queue_timeout', True)
+    assert client.get('/api/tables/organizations/data?inn=9900000501').get_json()['total'] == 0
+
+    # Следующий запрос выполняется как обычно
+    response = client.post('/api/tables/organizations/data', json={'inn': '9900000501', 'name': 'Очередь'})
+    assert response.status_code == 201
@@ -0,0 +1,52 @@
+"""
+Проверка приложения в pre-fork сервере: импорт main не создает приложение и не трогает БД,
+а дочерний процесс после fork не использует соединения из пула родителя.
+"""
+
+import os
+import subprocess
+import sys
+from data import db_session
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Запросы проверки: путь -> ожидаемый статус
+CHECK_REQUESTS = {
+    '/api/tables': 200,
+    '/api/tables/organizations/data?per_page=1': 200,
+    '/metrics': 200,
+}
+
+
+def request_statuses(app):
+    client = app.test_client()
+    return {path: client.get(path).status_code for path in CHECK_REQUESTS}
+
+
+def test_import_main_has_no_side_effects(tmp_path):
+    db_path = tmp_path / 'not_created.db'
+    script = 'import main; from data import db_session; print(db_session.get_engine())'
+    result = subprocess.run([sys.executable, '-c', script], cwd=BASE_DIR, check=True, capture_output=True,
+                            text=True, env={**os.environ, 'DATABASE_PATH': str(db_path)})
+    assert result.stdout.strip() == 'None'
+    assert not db_path.exists()
+
+
+def test_child_after_fork_gets_own_connections(app):
+    assert request_statuses(app) == CHECK_REQUESTS
+    assert db_session.get_engine().pool.checkedin() > 0
+
+    pid = os.fork()
+    if pid == 0:
+        # Дочерний процесс: код возврата 0 - проверка пройдена, исключения не должны попасть в pytest
+        try:
+            inherited = db_session.get_engine().pool.checkedin()
+            ok = inherited == 0 and request_statuses(app) == CHECK_REQUESTS
+        except BaseException:
+            ok = False
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    # Пул родителя после fork остается рабочим
+    assert request_statuses(app) == CHECK_REQUESTS
@@ -0,0 +1,240 @@
+"""
+Последовательная запись в SQLite через поток-писатель с групповым commit.
+
+При WRITE_QUEUE=1 операции записи CRUD API (создание, изменение и удаление записей,
+массовые операции, пакеты /api/batch и, через них, загрузка Excel) выполняются не в потоке
+запроса, а в одном потоке-писателе процесса. Писатель берет из очереди до WRITE_QUEUE_MAX_BATCH
+операций, дожидаясь следующих не дольше WRITE_QUEUE_MAX_WAIT_MS, и выполняет их в одной
+транзакции BEGIN IMMEDIATE: каждая операция - в своей точке сохранения (SAVEPOINT), ошибка
+откатывает только ее. Группа фиксируется одним commit, после чего каждый запрос получает
+свой результат или исключение.
+
+Запросы на запись одного процесса не конкурируют за блокировку SQLite, а блокировка записи
+берется в начале транзакции, поэтому в режиме WAL не возникает ошибок повышения блокировки
+читающей транзакции. Чтение выполняется в потоках запросов как раньше. Писатель один на процесс:
+между воркерами gunicorn блокировку по-прежнему разделяет SQLite (ожидание - SQLITE_BUSY_TIMEOUT).
+
+Запрос ждет результата не дольше WRITE_QUEUE_TIMEOUT секунд: операция, которую писатель
+еще не начал, отменяется, иначе результат операции неизвестен (WriteQueueTimeout).
+Ответ такого запроса заменяется на 503 с заголовком Retry-After (register_write_queue).
+
+Без WRITE_QUEUE операция выполняется в отдельной сессии в потоке запроса с commit сразу после нее.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from flask import g, jsonify, has_request_context
+from data import db_session
+
+ENABLED = os.getenv('WRITE_QUEUE', '').lower() in ['1', 'true', 'yes']
+MAX_BATCH = int(os.getenv('WRITE_QUEUE_MAX_BATCH', '64'))
+MAX_WAIT_MS = float(os.getenv('WRITE_QUEUE_MAX_WAIT_MS', '2'))
+TIMEOUT = float(os.getenv('WRITE_QUEUE_TIMEOUT', '60'))
+
+logger = logging.getLogger('write_queue')
+
+
+class WriteQueueTimeout(TimeoutError):
+    """Операция записи не завершилась за отведенное время (cancelled - операция не выполнялась)"""
+
+    def __init__(self, message, cancelled):
+        super().__init__(message)
+        self.cancelled = cancelled
+
+
+class WriteQueue:
+    """Очередь операций записи и поток-писатель, выполняющий их группами"""
+
+    def __init__(self, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, timeout=TIMEOUT):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.operations = 0
+        self.failed_operations = 0
+        self.failed_commits = 0
+        self.failed_batches = 0
+        self.timeouts = 0
+        self.largest_batch = 0
+
+    def _ensure_writer(self):
+        # Потоки не переживают fork: в воркере писатель запускается заново с новой очередью
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+                self._thread.start()
+
+    def submit(self, operation, timeout=None):
+        """Выполняет operation(session) в потоке-писателе и возвращает ее результат после commit.
+
+        Исключение операции (или commit ее группы) пробрасывается в вызывающий поток.
+        Через timeout (по умолчанию self.timeout) секунд ожидания - WriteQueueTimeout.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        self._ensure_writer()
+        future = Future()
+        self._queue.put((operation, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.timeouts += 1
+            if future.cancel():
+                raise WriteQueueTimeout(f'Операция записи не начата за {timeout:g} с и отменена', True)
+            raise WriteQueueTimeout(f'Операция записи не завершилась за {timeout:g} с, результат неизвестен', False)
+
+    def _next_batch(self, batch):
+        """Добавляет в batch операции из очереди (ждет первую), отмененные по таймауту пропускаются"""
+        deadline = None
+        while len(batch) < self.max_batch:
+            if deadline is None:
+                item = self._queue.get()
+                deadline = time.perf_counter() + self.max_wait
+            else:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if item[1].set_running_or_notify_cancel():
+                batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = []
+            try:
+                self._run_batch(self._next_batch(batch))
+            except Exception as e:
+                # Поток не должен завершаться: иначе все следующие submit() ждут до таймаута
+                self.failed_batches += 1
+                logger.exception('Группа операций write_queue не выполнена')
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _run_batch(self, batch):
+        if not batch:
+            return
+        session = db_session.create_session()
+        results = []
+        try:
+            # Блокировка записи берется сразу; SAVEPOINT внутри явной транзакции не фиксирует изменения
+            session.connection().exec_driver_sql('BEGIN IMMEDIATE')
+            for operation, future in batch:
+                savepoint = session.begin_nested()
+                try:
+                    result = operation(session)
+                    savepoint.commit()
+                    results.append((future, result, None))
+                except Exception as e:
+                    savepoint.rollback()
+                    self.failed_operations += 1
+                    results.append((future, None, e))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self.failed_commits += 1
+            # Группа не зафиксирована: ошибку получают все операции, которые еще не завершились ошибкой
+            results = [(future, None, error or e) for future, _, error in results]
+            results += [(future, None, e) for _, future in batch[len(results):]]
+        finally:
+            session.close()
+
+        self.batches += 1
+        self.operations += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def info(self):
+        return {
+            'enabled': True,
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000,
+            'pending': self._queue.qsize(),
+            'batches': self.batches,
+            'operations': self.operations,
+            'avg_batch': round(self.operations / self.batches, 2) if self.batches else 0,
+            'largest_batch': self.largest_batch,
+            'failed_operations': self.failed_operations,
+            'failed_commits': self.failed_commits,
+            'failed_batches': self.failed_batches,
+            'timeout': self.timeout,
+            'timeouts': self.timeouts
+        }
+
+
+_writer = WriteQueue() if ENABLED else None
+
+
+def execute_write(operation):
+    """Выполняет operation(session) и фиксирует транзакцию; возвращает результат операции.
+
+    При включенной очереди - в потоке-писателе с групповым commit,
+    иначе - в отдельной сессии в текущем потоке.
+    """
+    if _writer is not None:
+        try:
+            return _writer.submit(operation)
+        except WriteQueueTimeout as e:
+            # Эндпоинты перехватывают ошибки сами, ответ заменяется в register_write_queue
+            if has_request_context():
+                g.write_queue_timeout = e
+            raise
+
+    session = db_session.create_session()
+    try:
+        result = operation(session)
+        session.commit()
+        return result
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def info():
+    """Статистика очереди записи"""
+    return _writer.info() if _writer is not None else {'enabled': False}
+
+
+def timeout_response():
+    """Ответ 503, если операция записи текущего запроса не дождалась потока-писателя, иначе None"""
+    error = g.get('write_queue_timeout') if has_request_context() else None
+    if error is None:
+        return None
+    response = jsonify({
+        'error': str(error),
+        'reason': 'write_queue_timeout',
+        # Отмененную операцию можно безопасно повторить, иначе сначала стоит проверить результат
+        'cancelled': error.cancelled
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+
+def register_write_queue(app):
+    """Подключает к приложению Flask ответ 503 на превышение WRITE_QUEUE_TIMEOUT"""
+
+    @app.after_request
+    def replace_timed_out_response(response):
+        timed_out = timeout_response()
+        g.pop('write_queue_timeout', None)
+        return timed_out or response
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+WSGI-точка входа для pre-fork серверов:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Приложение создается фабрикой main.create_app при импорте модуля (БД - DATABASE_PATH).
+В gunicorn.conf.py preload_app выключен, поэтому каждый воркер импортирует wsgi уже
+после fork и открывает собственные соединения SQLite. Если приложение все же создано
+до fork (preload_app = True), db_session сбрасывает унаследованный пул соединений
+в дочернем процессе (проверяется в tests/test_wsgi.py).
+"""
+
+import os
+from main import create_app
+
+app = create_app(os.getenv('DATABASE_PATH'))